@@ -0,0 +1,3 @@
+"""
+Benchmarks for the DeepDiff MCP server (see run.py).
+"""
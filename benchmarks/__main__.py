@@ -0,0 +1,9 @@
+"""
+Run the DeepDiff MCP benchmarks: python -m benchmarks run --help
+"""
+import sys
+
+from .run import main
+
+if __name__ == "__main__":
+    sys.exit(main())
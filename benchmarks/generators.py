@@ -0,0 +1,206 @@
+"""
+Synthetic data for the DeepDiff MCP benchmarks.
+
+Every generator is seeded, so two runs (or two versions of the server)
+benchmark exactly the same objects and files. Pairs are made of an object and
+a copy with a fraction of its leaves changed.
+"""
+import copy
+import csv
+import os
+import random
+from typing import Any, Dict, List, Tuple
+
+DEFAULT_SEED = 1234
+
+# Fraction of the leaves changed in the second object of a pair
+DEFAULT_CHANGE_RATE = 0.01
+
+
+def _value(rng: random.Random, index: int) -> Any:
+    kind = index % 4
+    if kind == 0:
+        return index
+    if kind == 1:
+        return rng.random()
+    if kind == 2:
+        return f"value-{rng.randrange(10 ** 6)}"
+    return index % 3 == 0
+
+
+def wide_dict(keys: int, seed: int = DEFAULT_SEED) -> Dict[str, Any]:
+    """A flat dictionary with many keys of mixed scalar types."""
+    rng = random.Random(seed)
+    return {f"key_{i}": _value(rng, i) for i in range(keys)}
+
+
+def deep_nesting(
+    depth: int, breadth: int = 3, seed: int = DEFAULT_SEED
+) -> Dict[str, Any]:
+    """
+    A tree of dictionaries and lists, breadth children per level.
+
+    Levels alternate between dictionaries and lists, and the leaves are
+    scalars, so the tree has about breadth ** depth leaves.
+    """
+    rng = random.Random(seed)
+    counter = iter(range(10 ** 9))
+
+    def build(level: int) -> Any:
+        if level == depth:
+            return _value(rng, next(counter))
+        if level % 2:
+            return [build(level + 1) for _ in range(breadth)]
+        return {f"node_{i}": build(level + 1) for i in range(breadth)}
+
+    return {"root": build(0)}
+
+
+def record_list(items: int, seed: int = DEFAULT_SEED) -> List[Dict[str, Any]]:
+    """A list of small records, as found in API responses and table exports."""
+    rng = random.Random(seed)
+    return [
+        {
+            "id": i,
+            "name": f"item-{i}",
+            "price": round(rng.uniform(1, 1000), 2),
+            "tags": rng.sample(["a", "b", "c", "d", "e"], 2),
+        }
+        for i in range(items)
+    ]
+
+
+def mutate(
+    obj: Any, rate: float = DEFAULT_CHANGE_RATE, seed: int = DEFAULT_SEED
+) -> Any:
+    """
+    Copy an object and change about rate of its scalar leaves.
+
+    Numbers are incremented, strings suffixed and booleans flipped, so the
+    types stay the same and every change is reported as values_changed.
+    """
+    rng = random.Random(seed + 1)
+    result = copy.deepcopy(obj)
+
+    def change(value: Any) -> Any:
+        if isinstance(value, bool):
+            return not value
+        if isinstance(value, (int, float)):
+            return value + 1
+        if isinstance(value, str):
+            return value + "-changed"
+        return value
+
+    def walk(node: Any) -> None:
+        keys = node.keys() if isinstance(node, dict) else range(len(node))
+        for key in keys:
+            child = node[key]
+            if isinstance(child, (dict, list)):
+                walk(child)
+            elif rng.random() < rate:
+                node[key] = change(child)
+
+    walk(result)
+    return result
+
+
+def reorder(items: List[Any], swaps: int, seed: int = DEFAULT_SEED) -> List[Any]:
+    """Copy a list and swap that many random pairs of items."""
+    rng = random.Random(seed + 2)
+    result = list(items)
+    for _ in range(swaps):
+        i, j = rng.randrange(len(result)), rng.randrange(len(result))
+        result[i], result[j] = result[j], result[i]
+    return result
+
+
+def wide_pair(keys: int, rate: float = DEFAULT_CHANGE_RATE) -> Tuple[Dict, Dict]:
+    """A wide dictionary and a mutated copy."""
+    t1 = wide_dict(keys)
+    return t1, mutate(t1, rate)
+
+
+def deep_pair(
+    depth: int, breadth: int = 3, rate: float = DEFAULT_CHANGE_RATE
+) -> Tuple[Dict, Dict]:
+    """A deep tree and a mutated copy."""
+    t1 = deep_nesting(depth, breadth)
+    return t1, mutate(t1, rate)
+
+
+def reordered_pair(items: int, rate: float = DEFAULT_CHANGE_RATE) -> Tuple[List, List]:
+    """
+    A list of records and a copy with items swapped and some fields changed.
+
+    About a tenth of the items are moved, which is the case ignore_order is
+    meant for.
+    """
+    t1 = record_list(items)
+    return t1, reorder(mutate(t1, rate), max(1, items // 20))
+
+
+def _table_rows(rows: int, seed: int) -> Any:
+    rng = random.Random(seed)
+    for i in range(rows):
+        yield [i, f"name-{i}", rng.randrange(18, 90), round(rng.uniform(0, 10 ** 5), 2)]
+
+
+def write_table_pair(
+    directory: str,
+    rows: int,
+    file_format: str = "csv",
+    rate: float = DEFAULT_CHANGE_RATE,
+) -> Tuple[str, str]:
+    """
+    Write two tables of rows records, the second with about rate of them changed.
+
+    The files are named after their size and reused by later runs, since
+    writing a million-row Excel file takes minutes.
+
+    Args:
+        directory: Directory to write to
+        rows: Number of data rows
+        file_format: "csv" or "xlsx"
+        rate: Fraction of the rows whose last column is changed
+
+    Returns:
+        Paths of the two files
+    """
+    if file_format not in ("csv", "xlsx"):
+        raise ValueError(f"Unsupported table format: {file_format}")
+    header = ["id", "name", "age", "balance"]
+    paths = tuple(
+        os.path.join(directory, f"table_{rows}_{name}.{file_format}")
+        for name in ("a", "b")
+    )
+    if all(os.path.exists(path) for path in paths):
+        return paths
+
+    changes = random.Random(DEFAULT_SEED + 3)
+    tables = (
+        _table_rows(rows, DEFAULT_SEED),
+        (
+            row[:-1] + [row[-1] + 1] if changes.random() < rate else row
+            for row in _table_rows(rows, DEFAULT_SEED)
+        ),
+    )
+    for path, table in zip(paths, tables):
+        # Written under another name first, so an interrupted run leaves no
+        # truncated file behind for the next one to reuse
+        partial = os.path.join(directory, "partial_" + os.path.basename(path))
+        if file_format == "csv":
+            with open(partial, "w", newline="") as handle:
+                writer = csv.writer(handle)
+                writer.writerow(header)
+                writer.writerows(table)
+        else:
+            from openpyxl import Workbook
+
+            workbook = Workbook(write_only=True)
+            sheet = workbook.create_sheet()
+            sheet.append(header)
+            for row in table:
+                sheet.append(row)
+            workbook.save(partial)
+        os.replace(partial, path)
+    return paths
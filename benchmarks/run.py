@@ -0,0 +1,430 @@
+"""
+Benchmarks for the DeepDiff MCP tools.
+
+Every scenario calls one tool with synthetic data (see generators.py) in two
+modes: "direct" awaits the DeepDiffMCP method, which measures the executor and
+DeepDiff, and "client" goes through an in-memory FastMCP Client, which adds
+argument validation, JSON serialization and the MCP protocol. The difference
+between the two is the protocol overhead.
+
+Results are written as JSON, and two result files can be compared to find
+regressions between versions:
+
+    python -m benchmarks run --size medium --output before.json
+    python -m benchmarks run --size medium --output after.json
+    python -m benchmarks compare before.json after.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import deepdiff
+from fastmcp import Client
+
+import deepdiff_mcp
+from deepdiff_mcp import create_server
+from deepdiff_mcp.budget import _resident_bytes
+from deepdiff_mcp.operations import create_delta
+
+from . import generators
+
+MODES = ("direct", "client")
+
+# Sizes of the synthetic data; "large" is meant for dedicated machines
+SIZES: Dict[str, Dict[str, int]] = {
+    "small": {"keys": 1_000, "depth": 6, "items": 300, "rows": 1_000},
+    "medium": {"keys": 20_000, "depth": 9, "items": 2_000, "rows": 100_000},
+    "large": {"keys": 200_000, "depth": 11, "items": 10_000, "rows": 1_000_000},
+}
+
+# Relative slowdown of the median latency reported as a regression
+DEFAULT_THRESHOLD = 0.1
+
+Arguments = Dict[str, Any]
+
+
+def _leaf_path(tree: Any) -> str:
+    """Get the path of the first leaf of a tree, for extract_path."""
+    path = "root"
+    while isinstance(tree, (dict, list)):
+        key = next(iter(tree)) if isinstance(tree, dict) else 0
+        path += f"[{key!r}]"
+        tree = tree[key]
+    return path
+
+
+def _compare_wide(size: Dict[str, int], data_dir: str) -> Arguments:
+    t1, t2 = generators.wide_pair(size["keys"])
+    return {"t1": t1, "t2": t2}
+
+
+def _compare_deep(size: Dict[str, int], data_dir: str) -> Arguments:
+    t1, t2 = generators.deep_pair(size["depth"])
+    return {"t1": t1, "t2": t2}
+
+
+def _compare_reordered(size: Dict[str, int], data_dir: str) -> Arguments:
+    t1, t2 = generators.reordered_pair(size["items"])
+    return {"t1": t1, "t2": t2, "ignore_order": True}
+
+
+def _compare_csv(size: Dict[str, int], data_dir: str) -> Arguments:
+    file1, file2 = generators.write_table_pair(data_dir, size["rows"], "csv")
+    return {"file1_path": file1, "file2_path": file2, "key_columns": ["id"]}
+
+
+def _compare_xlsx(size: Dict[str, int], data_dir: str) -> Arguments:
+    file1, file2 = generators.write_table_pair(data_dir, size["rows"], "xlsx")
+    return {"file1_path": file1, "file2_path": file2, "key_columns": ["id"]}
+
+
+def _search_deep(size: Dict[str, int], data_dir: str) -> Arguments:
+    return {"obj": generators.deep_nesting(size["depth"]), "item": "value-1"}
+
+
+def _grep_records(size: Dict[str, int], data_dir: str) -> Arguments:
+    return {"obj": generators.record_list(size["items"]), "item": "item-1"}
+
+
+def _hash_deep(size: Dict[str, int], data_dir: str) -> Arguments:
+    return {"obj": generators.deep_nesting(size["depth"])}
+
+
+def _apply_delta_deep(size: Dict[str, int], data_dir: str) -> Arguments:
+    t1, t2 = generators.deep_pair(size["depth"])
+    return {"obj": t1, "delta_dict": create_delta(t1, t2)}
+
+
+def _extract_deep(size: Dict[str, int], data_dir: str) -> Arguments:
+    obj = generators.deep_nesting(size["depth"])
+    return {"obj": obj, "path": _leaf_path(obj)}
+
+
+# Scenario name: (tool, function building the tool's arguments)
+SCENARIOS: Dict[str, Tuple[str, Callable[[Dict[str, int], str], Arguments]]] = {
+    "compare_wide": ("compare", _compare_wide),
+    "compare_deep": ("compare", _compare_deep),
+    "compare_reordered": ("compare", _compare_reordered),
+    "compare_files_csv": ("compare_files", _compare_csv),
+    "compare_files_xlsx": ("compare_files", _compare_xlsx),
+    "get_deep_distance_reordered": ("get_deep_distance", _compare_reordered),
+    "search_deep": ("search", _search_deep),
+    "grep_records": ("grep", _grep_records),
+    "hash_object_deep": ("hash_object", _hash_deep),
+    "create_delta_deep": ("create_delta", _compare_deep),
+    "apply_delta_deep": ("apply_delta", _apply_delta_deep),
+    "extract_path_deep": ("extract_path", _extract_deep),
+}
+
+
+class _PeakMemory:
+    """Sample this process' resident memory in a thread and keep the peak."""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.peak = _resident_bytes() or 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, _resident_bytes() or 0)
+
+    def __enter__(self) -> "_PeakMemory":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _resident_bytes() or 0)
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def measure(
+    call: Callable[[], Awaitable[Any]],
+    repeat: int,
+    warmup: int = 1,
+    concurrency: int = 4,
+) -> Dict[str, Any]:
+    """
+    Measure the latency, throughput and peak memory of a call.
+
+    Latencies are measured on calls made one after the other; throughput on
+    repeat calls made concurrency at a time.
+
+    Args:
+        call: Coroutine function making one call
+        repeat: Number of measured calls
+        warmup: Number of calls made first and not measured
+        concurrency: Number of calls in flight when measuring throughput
+
+    Returns:
+        Dictionary with "latency_ms" statistics, "throughput" in calls per
+        second and "peak_rss_mb", the resident memory peak of this process
+    """
+    with _PeakMemory() as memory:
+        for _ in range(warmup):
+            await call()
+
+        latencies = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            await call()
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def limited() -> None:
+            async with semaphore:
+                await call()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(limited() for _ in range(repeat)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "latency_ms": {
+            "min": min(latencies),
+            "p50": _percentile(latencies, 0.5),
+            "p90": _percentile(latencies, 0.9),
+            "p99": _percentile(latencies, 0.99),
+            "max": max(latencies),
+            "mean": statistics.fmean(latencies),
+        },
+        "throughput": repeat / elapsed,
+        "peak_rss_mb": memory.peak / (1024 * 1024),
+    }
+
+
+async def run_benchmarks(
+    size: str = "small",
+    scenarios: Optional[List[str]] = None,
+    modes: Optional[List[str]] = None,
+    repeat: int = 5,
+    warmup: int = 1,
+    concurrency: int = 4,
+    data_dir: Optional[str] = None,
+    executor: str = "thread",
+    workers: Optional[int] = None,
+    cache: bool = False,
+) -> Dict[str, Any]:
+    """
+    Run benchmark scenarios and collect their results.
+
+    Args:
+        size: Key of SIZES
+        scenarios: Names of the scenarios to run (default: all of them)
+        modes: Modes to run each scenario in (default: MODES)
+        repeat: Number of measured calls per scenario and mode
+        warmup: Number of unmeasured calls made first
+        concurrency: Number of concurrent calls when measuring throughput
+        data_dir: Directory for the generated CSV and Excel files (default:
+            a directory in the system's temporary directory, kept between
+            runs so large files are generated once)
+        executor: Worker pool of the benchmarked server, "thread" or "process"
+        workers: Number of pool workers
+        cache: Whether to keep the server's result and parsed file caches,
+            which make every call after the first one a cache hit
+
+    Returns:
+        Dictionary with the "environment" and the list of "results"
+
+    Raises:
+        ValueError: If a size, scenario or mode is unknown
+    """
+    if size not in SIZES:
+        raise ValueError(f"Unknown size: {size}. Expected one of: {', '.join(SIZES)}")
+    scenarios = scenarios or list(SCENARIOS)
+    modes = modes or list(MODES)
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    unknown += [mode for mode in modes if mode not in MODES]
+    if unknown:
+        raise ValueError(f"Unknown scenarios or modes: {', '.join(unknown)}")
+    default_dir = os.path.join(tempfile.gettempdir(), "deepdiff-mcp-benchmarks")
+    data_dir = data_dir or default_dir
+    os.makedirs(data_dir, exist_ok=True)
+
+    cache_options = {} if cache else {"cache_size": 0, "file_cache_size": 0}
+    server = create_server(
+        "DeepDiff MCP benchmarks", executor=executor, workers=workers, **cache_options
+    )
+    results = []
+    try:
+        async with Client(server.mcp) as client:
+            for name in scenarios:
+                tool, build = SCENARIOS[name]
+                arguments = build(SIZES[size], data_dir)
+                calls = {
+                    "direct": lambda: getattr(server, tool)(**arguments),
+                    "client": lambda: client.call_tool(tool, arguments),
+                }
+                medians = {}
+                for mode in modes:
+                    print(f"{name} ({mode})...", file=sys.stderr)
+                    result = await measure(calls[mode], repeat, warmup, concurrency)
+                    medians[mode] = result["latency_ms"]["p50"]
+                    if mode == "client" and "direct" in medians:
+                        overhead = medians["client"] - medians["direct"]
+                        result["protocol_overhead_ms"] = overhead
+                    entry = {"scenario": name, "tool": tool, "mode": mode}
+                    results.append({**entry, **result})
+    finally:
+        server.executor.shutdown()
+
+    return {
+        "environment": {
+            "deepdiff_mcp": deepdiff_mcp.__version__,
+            "deepdiff": deepdiff.__version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "executor": executor,
+            "workers": server.executor.workers,
+            "cache": cache,
+            "size": size,
+            "repeat": repeat,
+            "concurrency": concurrency,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": results,
+    }
+
+
+def compare_results(
+    before: Dict[str, Any],
+    after: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> List[Dict[str, Any]]:
+    """
+    Compare two benchmark runs scenario by scenario.
+
+    Args:
+        before: Results of the reference run
+        after: Results of the new run
+        threshold: Relative increase of the median latency counted as a
+            regression (0.1 for 10%)
+
+    Returns:
+        One entry per scenario and mode found in both runs, with the median
+        latencies, their "change" (relative) and whether it is a "regression"
+    """
+    reference = {
+        (entry["scenario"], entry["mode"]): entry for entry in before["results"]
+    }
+    comparison = []
+    for entry in after["results"]:
+        previous = reference.get((entry["scenario"], entry["mode"]))
+        if previous is None:
+            continue
+        old, new = previous["latency_ms"]["p50"], entry["latency_ms"]["p50"]
+        change = (new - old) / old if old else 0.0
+        comparison.append({
+            "scenario": entry["scenario"],
+            "mode": entry["mode"],
+            "before_p50_ms": old,
+            "after_p50_ms": new,
+            "change": change,
+            "regression": change > threshold,
+        })
+    return comparison
+
+
+def _print_results(report: Dict[str, Any]) -> None:
+    print(f"{'scenario':<30}{'mode':<8}{'p50 ms':>10}{'p99 ms':>10}"
+          f"{'calls/s':>10}{'rss MB':>10}")
+    for entry in report["results"]:
+        latency = entry["latency_ms"]
+        print(f"{entry['scenario']:<30}{entry['mode']:<8}{latency['p50']:>10.2f}"
+              f"{latency['p99']:>10.2f}{entry['throughput']:>10.2f}"
+              f"{entry['peak_rss_mb']:>10.1f}")
+
+
+def _print_comparison(comparison: List[Dict[str, Any]]) -> None:
+    print(f"{'scenario':<30}{'mode':<8}{'before ms':>11}{'after ms':>11}{'change':>9}")
+    for entry in comparison:
+        flag = "  REGRESSION" if entry["regression"] else ""
+        print(f"{entry['scenario']:<30}{entry['mode']:<8}{entry['before_p50_ms']:>11.2f}"
+              f"{entry['after_p50_ms']:>11.2f}{entry['change']:>+9.1%}{flag}")
+
+
+def parse_args(args: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="DeepDiff MCP benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the benchmarks")
+    run.add_argument("--size", default="small", choices=list(SIZES),
+                     help="Size of the synthetic data")
+    run.add_argument("--scenario", action="append", choices=list(SCENARIOS),
+                     help="Scenario to run (repeatable; default: all)")
+    run.add_argument("--mode", action="append", choices=list(MODES),
+                     help="Mode to run (repeatable; default: all)")
+    run.add_argument("--repeat", type=int, default=5,
+                     help="Number of measured calls per scenario")
+    run.add_argument("--warmup", type=int, default=1,
+                     help="Number of unmeasured calls made first")
+    run.add_argument("--concurrency", type=int, default=4,
+                     help="Number of concurrent calls when measuring throughput")
+    run.add_argument("--executor", default="thread", choices=["thread", "process"],
+                     help="Worker pool of the benchmarked server")
+    run.add_argument("--workers", type=int, default=None,
+                     help="Number of pool workers (default: number of CPUs)")
+    run.add_argument("--cache", action="store_true",
+                     help="Keep the server's result and parsed file caches")
+    run.add_argument("--data-dir", default=None,
+                     help="Directory for the generated CSV and Excel files")
+    run.add_argument("--output", default=None, help="JSON file to write the results to")
+
+    compare = commands.add_parser("compare", help="Compare two result files")
+    compare.add_argument("before", help="Results of the reference run")
+    compare.add_argument("after", help="Results of the new run")
+    compare.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                         help="Relative slowdown reported as a regression")
+    return parser.parse_args(args)
+
+
+def main(args: Optional[List[str]] = None) -> int:
+    """Run the benchmarks or compare two result files."""
+    parsed = parse_args(args)
+    if parsed.command == "compare":
+        with open(parsed.before) as before, open(parsed.after) as after:
+            comparison = compare_results(json.load(before), json.load(after),
+                                         parsed.threshold)
+        _print_comparison(comparison)
+        # A non-zero status lets CI fail on regressions
+        return 1 if any(entry["regression"] for entry in comparison) else 0
+
+    # Tool calls log to the client; keep that traffic but not its printing
+    logging.getLogger("fastmcp").setLevel(logging.WARNING)
+    report = asyncio.run(run_benchmarks(
+        size=parsed.size,
+        scenarios=parsed.scenario,
+        modes=parsed.mode,
+        repeat=parsed.repeat,
+        warmup=parsed.warmup,
+        concurrency=parsed.concurrency,
+        data_dir=parsed.data_dir,
+        executor=parsed.executor,
+        workers=parsed.workers,
+        cache=parsed.cache,
+    ))
+    _print_results(report)
+    if parsed.output:
+        with open(parsed.output, "w") as handle:
+            json.dump(report, handle, indent=2)
+    return 0
@@ -3,7 +3,25 @@ DeepDiff MCP Server
 
 This package provides an MCP server that exposes DeepDiff functionality.
 """
+from .budget import Budget, BudgetExceededError
+from .cache import ResultCache
+from .executor import ExecutorBusyError, ToolExecutor
 from .server import DeepDiffMCP, create_server
+from .shared import SharedObjectStore, SharedResultCache
+from .store import ObjectStore
+from .supervisor import Supervisor
 
 __version__ = "0.1.0"
-__all__ = ["DeepDiffMCP", "create_server"]
+__all__ = [
+    "Budget",
+    "BudgetExceededError",
+    "DeepDiffMCP",
+    "ExecutorBusyError",
+    "ObjectStore",
+    "ResultCache",
+    "SharedObjectStore",
+    "SharedResultCache",
+    "Supervisor",
+    "ToolExecutor",
+    "create_server",
+]
@@ -0,0 +1,271 @@
+"""
+Resource budgets for DeepDiff MCP tool calls.
+
+A pathological comparison (large lists with ignore_order, for instance) can
+run for hours, and nothing stops it when the client gives up. Every tool call
+runs under a Budget: a timeout, a memory ceiling and a maximum number of
+visited nodes, set for the whole server, per tool and per call. The executor
+enforces the timeout and cancels the call when the client cancels it;
+comparisons and hashes stop cooperatively, through a DeepDiff custom operator
+that checks the budget at every node they visit.
+"""
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+BUDGET_KEYS = ("timeout", "max_memory_mb", "max_nodes")
+
+# Checking the clock at every node would slow comparisons down; memory and
+# cancellation (which may be a call to a manager process) even more so
+_CLOCK_INTERVAL = 64
+_SLOW_CHECK_INTERVAL = 1024
+
+
+class BudgetExceededError(RuntimeError):
+    """Raised when a tool call runs out of its budget or is cancelled."""
+
+
+class Budget:
+    """Limits for one tool call; None means unlimited."""
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        max_memory_mb: Optional[float] = None,
+        max_nodes: Optional[int] = None,
+    ):
+        """
+        Initialize the budget.
+
+        Args:
+            timeout: Seconds a call may run, once it left the queue
+            max_memory_mb: Growth of the worker process' resident memory
+                allowed during the call, in MB. With a thread pool, calls
+                running at the same time share (and count) that growth.
+            max_nodes: Number of nodes comparisons and hashes may visit
+
+        Raises:
+            ValueError: If a limit is not positive
+        """
+        for name, value in zip(BUDGET_KEYS, (timeout, max_memory_mb, max_nodes)):
+            if value is not None and value <= 0:
+                raise ValueError(f"{name} must be positive")
+        self.timeout = timeout
+        self.max_memory_mb = max_memory_mb
+        self.max_nodes = max_nodes
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, Budget) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        limits = ", ".join(f"{name}={value}" for name, value in self.to_dict().items())
+        return f"Budget({limits})"
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any limit is set."""
+        return bool(self.to_dict())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the limits that are set."""
+        values = (self.timeout, self.max_memory_mb, self.max_nodes)
+        limits = zip(BUDGET_KEYS, values)
+        return {name: value for name, value in limits if value is not None}
+
+    @classmethod
+    def from_dict(cls, limits: Optional[Dict[str, Any]]) -> "Budget":
+        """
+        Build a budget from a dictionary such as a tool's budget argument.
+
+        Raises:
+            ValueError: If a key is unknown or a limit is not positive
+        """
+        limits = limits or {}
+        unknown = set(limits) - set(BUDGET_KEYS)
+        if unknown:
+            raise ValueError(
+                f"Unknown budget limits: {', '.join(sorted(unknown))}. "
+                f"Expected any of: {', '.join(BUDGET_KEYS)}"
+            )
+        return cls(**limits)
+
+    def merge(self, other: Optional["Budget"]) -> "Budget":
+        """Combine two budgets, keeping the tightest of each limit."""
+        if other is None:
+            return self
+
+        def tightest(first: Any, second: Any) -> Any:
+            if first is None or second is None:
+                return second if first is None else first
+            return min(first, second)
+
+        return Budget(
+            timeout=tightest(self.timeout, other.timeout),
+            max_memory_mb=tightest(self.max_memory_mb, other.max_memory_mb),
+            max_nodes=tightest(self.max_nodes, other.max_nodes),
+        )
+
+
+def parse_tool_budget(spec: str) -> Tuple[str, Budget]:
+    """
+    Parse a per-tool budget given on the command line.
+
+    Args:
+        spec: "TOOL:LIMIT=VALUE[,LIMIT=VALUE...]", e.g.
+            "compare:timeout=30,max_nodes=1000000"
+
+    Returns:
+        The tool name and its budget
+
+    Raises:
+        ValueError: If the specification is malformed
+    """
+    tool, separator, limits = spec.partition(":")
+    if not separator or not tool or not limits:
+        raise ValueError(
+            f"Invalid tool budget {spec!r}; expected TOOL:LIMIT=VALUE[,...]"
+        )
+    values: Dict[str, Any] = {}
+    for limit in limits.split(","):
+        name, separator, value = limit.partition("=")
+        if not separator:
+            raise ValueError(f"Invalid limit {limit!r} in tool budget {spec!r}")
+        name = name.strip()
+        try:
+            values[name] = int(value) if name == "max_nodes" else float(value)
+        except ValueError:
+            raise ValueError(f"Invalid value for {name} in tool budget {spec!r}")
+    return tool, Budget.from_dict(values)
+
+
+def _resident_bytes() -> Optional[int]:
+    """Get the resident memory of this process, if the platform tells."""
+    try:
+        with open("/proc/self/statm") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is None:
+        return None
+    # Peak rather than current memory; kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class BudgetTracker:
+    """State of a running call: what it used of its budget so far."""
+
+    def __init__(self, budget: Budget, cancelled: Any = None):
+        """
+        Start tracking a call.
+
+        Args:
+            budget: Limits of the call
+            cancelled: Optional event (threading or manager) set when the call
+                is cancelled or timed out by the executor
+        """
+        self.budget = budget
+        self.cancelled = cancelled
+        self.nodes = 0
+        self.deadline = time.monotonic() + budget.timeout if budget.timeout else None
+        self.max_memory_bytes = (
+            budget.max_memory_mb * 1024 * 1024 if budget.max_memory_mb else None
+        )
+        self.start_memory = _resident_bytes() if self.max_memory_bytes else None
+
+    def tick(self) -> None:
+        """
+        Count one visited node and check the budget.
+
+        Raises:
+            BudgetExceededError: If a limit was reached or the call was cancelled
+        """
+        self.nodes += 1
+        if self.budget.max_nodes is not None and self.nodes > self.budget.max_nodes:
+            raise BudgetExceededError(
+                f"Call visited more than {self.budget.max_nodes} nodes (max_nodes)"
+            )
+        if self.nodes % _CLOCK_INTERVAL:
+            return
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise BudgetExceededError(
+                f"Call ran for more than {self.budget.timeout} seconds (timeout)"
+            )
+        if self.nodes % _SLOW_CHECK_INTERVAL:
+            return
+        if self.cancelled is not None and self.cancelled.is_set():
+            raise BudgetExceededError("Call was cancelled")
+        if self.start_memory is not None:
+            memory = _resident_bytes()
+            limit = self.start_memory + self.max_memory_bytes
+            if memory is not None and memory > limit:
+                raise BudgetExceededError(
+                    f"Call used more than {self.budget.max_memory_mb} MB "
+                    "(max_memory_mb)"
+                )
+
+
+_local = threading.local()
+
+
+def current_tracker() -> Optional[BudgetTracker]:
+    """Get the budget tracker of the call running in this thread, if any."""
+    return getattr(_local, "tracker", None)
+
+
+def run_with_budget(
+    budget: Budget,
+    cancelled: Any,
+    func: Callable[..., Any],
+    *args: Any,
+    **kwargs: Any,
+) -> Any:
+    """
+    Run a tool body with a budget tracker installed for its thread.
+
+    It is a module-level function so that process pools can run it.
+    """
+    previous = current_tracker()
+    _local.tracker = BudgetTracker(budget, cancelled)
+    try:
+        return func(*args, **kwargs)
+    finally:
+        _local.tracker = previous
+
+
+class BudgetOperator:
+    """
+    DeepDiff custom operator checking a call's budget.
+
+    DeepDiff asks its custom operators whether they match every node it
+    compares, including in the comparisons it runs to pair items with
+    ignore_order, and lets them normalize every value it hashes. This
+    operator never matches and never changes a value; it only counts nodes.
+    """
+
+    def __init__(self, tracker: BudgetTracker):
+        self.tracker = tracker
+
+    def match(self, level: Any) -> bool:
+        self.tracker.tick()
+        return False
+
+    def give_up_diffing(self, level: Any, diff_instance: Any) -> bool:
+        return False
+
+    def normalize_value_for_hashing(self, parent: Any, obj: Any) -> Any:
+        self.tracker.tick()
+        return obj
+
+
+def budget_operators() -> List[BudgetOperator]:
+    """Get the custom operators enforcing the current call's budget, if any."""
+    tracker = current_tracker()
+    return [BudgetOperator(tracker)] if tracker is not None else []
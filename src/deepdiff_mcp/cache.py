@@ -0,0 +1,171 @@
+"""
+Result cache for DeepDiff MCP tools.
+
+Agents often repeat the same call with the same payload while they iterate.
+Results are cached under a content hash of the tool name and its arguments,
+in an LRU bounded both by number of entries and by bytes.
+"""
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_CACHE_SIZE = 256
+DEFAULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+
+def make_cache_key(*parts: Any) -> Optional[str]:
+    """
+    Build a stable content hash of the given values.
+
+    Values are pickled, so equal payloads produce the same key and values that
+    merely look alike (a list and a tuple, 1 and 1.0) do not.
+
+    Args:
+        *parts: Values forming the key; dictionaries of options should be
+            passed sorted so argument order does not matter
+
+    Returns:
+        Hex digest, or None if the values cannot be pickled and the call
+        should not be cached
+    """
+    try:
+        data = pickle.dumps(parts, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return None
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def file_signature(file_path: str) -> Optional[Tuple[str, int, int]]:
+    """
+    Identify a file's current contents without reading it.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        (real path, modification time in ns, size), or None if the file
+        cannot be stat'ed
+    """
+    try:
+        real_path = os.path.realpath(file_path)
+        stat = os.stat(real_path)
+    except OSError:
+        return None
+    return real_path, stat.st_mtime_ns, stat.st_size
+
+
+class ResultCache:
+    """LRU cache bounded by number of entries and total bytes."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_CACHE_SIZE,
+        max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached results; 0 disables caching
+            max_bytes: Maximum total size of the cached results, in bytes
+        """
+        if max_entries < 0:
+            raise ValueError("max_entries must not be negative")
+        if max_bytes < 0:
+            raise ValueError("max_bytes must not be negative")
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether results are cached at all."""
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Optional[str], default: Any = None) -> Any:
+        """
+        Get a cached result.
+
+        Results are stored pickled, so every hit returns a fresh copy that the
+        caller may modify.
+
+        Args:
+            key: Key built with make_cache_key
+            default: Value returned on a miss
+
+        Returns:
+            The cached result, or default
+        """
+        if key is None or not self.enabled:
+            return default
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return pickle.loads(data)
+
+    def put(self, key: Optional[str], value: Any) -> bool:
+        """
+        Cache a result, evicting the least recently used ones as needed.
+
+        Args:
+            key: Key built with make_cache_key
+            value: Result to cache
+
+        Returns:
+            True if the result was cached
+        """
+        if key is None or not self.enabled:
+            return False
+        try:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return False
+        if len(data) > self.max_bytes:
+            return False
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = data
+            self._bytes += len(data)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+        return True
+
+    def clear(self) -> None:
+        """Remove all cached results."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Get hit, miss and eviction counters and the current size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
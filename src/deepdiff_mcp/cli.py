@@ -2,10 +2,25 @@
 Command-line interface for the DeepDiff MCP server.
 """
 import argparse
+import asyncio
 import sys
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
+from .budget import Budget, parse_tool_budget
+from .cache import DEFAULT_CACHE_MAX_BYTES, DEFAULT_CACHE_SIZE
+from .executor import EXECUTOR_KINDS
+from .file_utils import DEFAULT_FILE_CACHE_MAX_BYTES, DEFAULT_FILE_CACHE_SIZE
 from .server import create_server
+from .store import DEFAULT_OBJECT_TTL, DEFAULT_STORE_MAX_BYTES
+from .supervisor import DEFAULT_GRACEFUL_TIMEOUT, Supervisor
+
+
+def _tool_budget(spec: str) -> Tuple[str, Budget]:
+    """Parse a --tool-budget value for argparse."""
+    try:
+        return parse_tool_budget(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
 
 
 def parse_args(args: Optional[List[str]] = None) -> argparse.Namespace:
@@ -48,14 +63,254 @@ def parse_args(args: Optional[List[str]] = None) -> argparse.Namespace:
         help="Path to serve on (for HTTP transport)"
     )
     
-    return parser.parse_args(args)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of workers running tool calls (default: number of CPUs)"
+    )
+    
+    parser.add_argument(
+        "--executor",
+        type=str,
+        default="thread",
+        choices=list(EXECUTOR_KINDS),
+        help="Worker pool type; use process to run diffs on several cores"
+    )
+    
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=None,
+        help="Maximum number of concurrent calls per tool (default: workers)"
+    )
+    
+    parser.add_argument(
+        "--max-queue",
+        type=int,
+        default=None,
+        help="Maximum number of queued calls per tool before rejecting "
+        "(default: unbounded)"
+    )
+    
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_CACHE_SIZE,
+        help="Maximum number of cached tool results; 0 disables the result cache"
+    )
+    
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=DEFAULT_CACHE_MAX_BYTES // (1024 * 1024),
+        help="Maximum total size of the cached tool results, in MB"
+    )
+    
+    parser.add_argument(
+        "--file-cache-size",
+        type=int,
+        default=DEFAULT_FILE_CACHE_SIZE,
+        help="Maximum number of parsed files kept in memory per worker; 0 disables it"
+    )
+    
+    parser.add_argument(
+        "--file-cache-max-mb",
+        type=int,
+        default=DEFAULT_FILE_CACHE_MAX_BYTES // (1024 * 1024),
+        help="Maximum total size of the parsed files kept in memory per worker, in MB"
+    )
+    
+    parser.add_argument(
+        "--file-cache-dir",
+        type=str,
+        default=None,
+        help="Directory where parsed files are persisted across restarts"
+    )
+    
+    parser.add_argument(
+        "--object-store-max-mb",
+        type=int,
+        default=DEFAULT_STORE_MAX_BYTES // (1024 * 1024),
+        help="Maximum total size of the objects stored with put_object, in MB"
+    )
+    
+    parser.add_argument(
+        "--object-ttl",
+        type=float,
+        default=DEFAULT_OBJECT_TTL,
+        help="Seconds a stored object is kept after its last use"
+    )
+    
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=None,
+        help="Seconds a tool call may run before it is stopped (default: unlimited)"
+    )
+    
+    parser.add_argument(
+        "--max-memory-mb",
+        type=float,
+        default=None,
+        help="Memory a tool call may add to its worker, in MB (default: unlimited)"
+    )
+    
+    parser.add_argument(
+        "--max-nodes",
+        type=int,
+        default=None,
+        help="Number of nodes a comparison or hash may visit (default: unlimited)"
+    )
+    
+    parser.add_argument(
+        "--tool-budget",
+        type=_tool_budget,
+        action="append",
+        metavar="TOOL:LIMIT=VALUE[,...]",
+        help="Limits for one tool, e.g. compare:timeout=30,max_nodes=1000000 "
+        "(repeatable)"
+    )
+    
+    parser.add_argument(
+        "--metrics-path",
+        type=str,
+        default="/metrics",
+        help="Path of the Prometheus metrics endpoint (for HTTP and SSE transports); "
+        "an empty string disables it"
+    )
+    
+    parser.add_argument(
+        "--profile-slowest",
+        type=int,
+        default=0,
+        help="Profile tool calls and keep the profiles of this many slowest ones "
+        "(see the server_stats tool; default: 0, no profiling)"
+    )
+    
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=1,
+        help="Number of server processes sharing the port (for HTTP transport); "
+        "requests are served statelessly when it is more than 1"
+    )
+    
+    parser.add_argument(
+        "--shared-dir",
+        type=str,
+        default=None,
+        help="Directory where the result cache and object store are shared by the "
+        "server processes (default: in memory, or a temporary directory with "
+        "--processes)"
+    )
+    
+    parser.add_argument(
+        "--max-worker-memory-mb",
+        type=float,
+        default=None,
+        help="Resident memory above which a server process is replaced, in MB "
+        "(with --processes; default: never)"
+    )
+    
+    parser.add_argument(
+        "--graceful-timeout",
+        type=float,
+        default=DEFAULT_GRACEFUL_TIMEOUT,
+        help="Seconds a replaced server process may take to finish its requests "
+        "(with --processes)"
+    )
+    
+    parser.add_argument(
+        "--no-warmup",
+        action="store_true",
+        help="Import DeepDiff and pandas in the first tool call using them, instead of "
+        "in the background once a client has connected"
+    )
+    
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Print the import time of the slowest packages and the time a stdio "
+        "server with the other options takes to complete a handshake, then exit"
+    )
+    
+    parsed_args = parser.parse_args(args)
+    if parsed_args.processes < 1:
+        parser.error("--processes must be at least 1")
+    if parsed_args.processes > 1 and parsed_args.transport != "http":
+        parser.error("--processes requires the http transport")
+    return parsed_args
+
+
+def profile_startup(server_args: List[str]) -> None:
+    """Print where the server's startup time goes."""
+    from .lazy import import_times, time_handshake
+    
+    total, packages = import_times()
+    print(f"Import time: {total * 1000:.0f} ms")
+    for package, seconds in packages:
+        print(f"  {package:<24} {seconds * 1000:8.1f} ms")
+    
+    handshake, first_call = asyncio.run(time_handshake(server_args))
+    print(f"Stdio handshake: {handshake * 1000:.0f} ms")
+    print(f"First compare call: {first_call * 1000:.0f} ms")
 
 
 def main(args: Optional[List[str]] = None) -> int:
     """Run the DeepDiff MCP server."""
     parsed_args = parse_args(args)
     
-    server = create_server(name=parsed_args.name)
+    if parsed_args.profile_startup:
+        server_args = [
+            arg for arg in (sys.argv[1:] if args is None else args)
+            if arg != "--profile-startup"
+        ]
+        profile_startup(server_args)
+        return 0
+    
+    server_options = dict(
+        name=parsed_args.name,
+        workers=parsed_args.workers,
+        executor=parsed_args.executor,
+        max_concurrency=parsed_args.max_concurrency,
+        max_queue=parsed_args.max_queue,
+        cache_size=parsed_args.cache_size,
+        cache_max_bytes=parsed_args.cache_max_mb * 1024 * 1024,
+        file_cache_size=parsed_args.file_cache_size,
+        file_cache_max_bytes=parsed_args.file_cache_max_mb * 1024 * 1024,
+        file_cache_dir=parsed_args.file_cache_dir,
+        object_store_max_bytes=parsed_args.object_store_max_mb * 1024 * 1024,
+        object_ttl=parsed_args.object_ttl,
+        budget=Budget(
+            timeout=parsed_args.timeout,
+            max_memory_mb=parsed_args.max_memory_mb,
+            max_nodes=parsed_args.max_nodes,
+        ),
+        tool_budgets=dict(parsed_args.tool_budget or []),
+        metrics_path=parsed_args.metrics_path or None,
+        profile_slowest=parsed_args.profile_slowest,
+        warm_up=not parsed_args.no_warmup,
+    )
+    
+    if parsed_args.processes > 1:
+        try:
+            Supervisor(
+                parsed_args.processes,
+                server_options,
+                host=parsed_args.host,
+                port=parsed_args.port,
+                path=parsed_args.path,
+                shared_dir=parsed_args.shared_dir,
+                max_worker_memory_mb=parsed_args.max_worker_memory_mb,
+                graceful_timeout=parsed_args.graceful_timeout,
+            ).run()
+            return 0
+        except Exception as e:
+            print(f"Error running server: {e}", file=sys.stderr)
+            return 1
+    
+    server = create_server(**server_options, shared_dir=parsed_args.shared_dir)
     
     transport_kwargs = {}
     if parsed_args.transport in ["http", "sse"]:
@@ -0,0 +1,276 @@
+"""
+Delta patch files for DeepDiff MCP.
+
+create_delta returns the whole delta and apply_delta the whole transformed
+object, so patching a large document sends it over the protocol several
+times. The functions in this module keep everything on the server: deltas
+are written to compact binary files (DeepDiff's pickle serialization), and a
+delta file is applied to a source file to produce an output file, with only
+paths and a summary returned. Documents made of top-level records (NDJSON,
+JSON arrays and objects, CSV) are patched one record at a time, so memory is
+bounded by the delta and the largest record rather than by the document.
+"""
+import os
+import tempfile
+from typing import Any, Dict, Optional, Set, Tuple
+
+from deepdiff.delta import Delta
+
+from .file_utils import (
+    RecordWriter,
+    file_container,
+    iter_file_items,
+    load_data_from_file,
+    path_keys,
+)
+from .operations import _format_path, build_diff
+
+# Reports a single record can be patched with; the others (moves, ignore_order
+# deltas, difflib opcodes) need the whole document
+_RECORD_REPORTS = {
+    "values_changed",
+    "type_changes",
+    "dictionary_item_added",
+    "dictionary_item_removed",
+    "iterable_item_added",
+    "iterable_item_removed",
+    "set_item_added",
+    "set_item_removed",
+}
+_ADD_REPORTS = {"dictionary_item_added", "iterable_item_added"}
+_REMOVE_REPORTS = {"dictionary_item_removed", "iterable_item_removed"}
+_REPLACE_REPORTS = {"values_changed", "type_changes"}
+
+
+def summarize_delta(delta_dict: Dict) -> Dict[str, int]:
+    """Count the changes of a delta by report type."""
+    return {
+        report: len(items)
+        for report, items in delta_dict.items()
+        if isinstance(items, (dict, list))
+    }
+
+
+def write_delta(delta_dict: Dict, output_path: str) -> Dict[str, Any]:
+    """
+    Write a delta to a binary file.
+
+    Args:
+        delta_dict: Delta dictionary as returned by create_delta
+        output_path: Path of the file to write
+
+    Returns:
+        Dictionary with the "output_path", its size in "bytes" and the number
+        of "changes" by report type
+    """
+    with open(output_path, "wb") as handle:
+        Delta(delta_dict).dump(handle)
+    return {
+        "output_path": output_path,
+        "bytes": os.path.getsize(output_path),
+        "changes": summarize_delta(delta_dict),
+    }
+
+
+def load_delta(delta_path: str) -> Dict:
+    """
+    Read a delta file written by write_delta.
+
+    Deltas are unpickled with DeepDiff's restricted unpickler, which refuses
+    anything but plain data types.
+
+    Raises:
+        ValueError: If the file is not a valid delta
+        FileNotFoundError: If the file does not exist
+    """
+    if not os.path.isfile(delta_path):
+        raise FileNotFoundError(f"File not found: {delta_path}")
+    try:
+        return Delta(delta_path=delta_path).to_dict()
+    except Exception as e:
+        raise ValueError(f"Invalid delta file {delta_path}: {str(e)}")
+
+
+def dump_delta(t1: Any, t2: Any, output_path: str, **options: Any) -> Dict[str, Any]:
+    """Create the delta transforming t1 into t2 and write it to a file."""
+    delta_dict = Delta(build_diff(t1, t2, **options)).to_dict()
+    return write_delta(delta_dict, output_path)
+
+
+def dump_file_delta(
+    file1_path: str,
+    file2_path: str,
+    output_path: str,
+    **options: Any,
+) -> Dict[str, Any]:
+    """
+    Create the delta transforming one file's contents into another's.
+
+    Args:
+        file1_path: Path to the source file
+        file2_path: Path to the target file
+        output_path: Path of the delta file to write
+        **options: DeepDiff options
+
+    Returns:
+        Summary as returned by write_delta
+
+    Raises:
+        ValueError: If either file cannot be loaded
+    """
+    loaded = []
+    for file_path in (file1_path, file2_path):
+        try:
+            loaded.append(load_data_from_file(file_path))
+        except Exception as e:
+            raise ValueError(f"Error loading {file_path}: {str(e)}")
+    return dump_delta(loaded[0], loaded[1], output_path, **options)
+
+
+def _split_delta(
+    delta_dict: Dict,
+    container: type,
+) -> Optional[Tuple[Dict[Any, Dict], Dict[Any, Any], Set[Any], Dict[Any, Any]]]:
+    """
+    Split a delta by the top-level item each change applies to.
+
+    Returns:
+        (sub-deltas by key, with paths relative to the item; new values of
+        replaced items; removed keys; added items), or None if the delta
+        cannot be applied one item at a time
+    """
+    key_type = int if container is list else str
+    patches: Dict[Any, Dict] = {}
+    replaced: Dict[Any, Any] = {}
+    removed: Set[Any] = set()
+    added: Dict[Any, Any] = {}
+    for report, items in delta_dict.items():
+        if report not in _RECORD_REPORTS or not isinstance(items, dict):
+            return None
+        for path, value in items.items():
+            try:
+                keys = path_keys(path)
+            except ValueError:
+                return None
+            if not keys or type(keys[0]) is not key_type:
+                return None
+            key = keys[0]
+            if (
+                len(keys) > 1
+                or report not in _ADD_REPORTS | _REMOVE_REPORTS | _REPLACE_REPORTS
+            ):
+                patch = patches.setdefault(key, {}).setdefault(report, {})
+                patch[_format_path(keys[1:])] = value
+            elif report in _REPLACE_REPORTS:
+                if "new_value" not in value:
+                    return None
+                replaced[key] = value["new_value"]
+            elif report in _REMOVE_REPORTS:
+                removed.add(key)
+            else:
+                added[key] = value
+    if patches.keys() & (replaced.keys() | removed):
+        return None
+    return patches, replaced, removed, added
+
+
+def _stream_patch(
+    source_path: str,
+    writer: RecordWriter,
+    patches: Dict[Any, Dict],
+    replaced: Dict[Any, Any],
+    removed: Set[Any],
+    added: Dict[Any, Any],
+) -> None:
+    """Patch a source file item by item into a writer."""
+    # List additions hold positions in the patched list, as in Delta: an item
+    # is inserted once everything before its position has been written
+    additions = sorted(added.items()) if writer.container is list else []
+    next_addition = 0
+    for key, value in iter_file_items(source_path):
+        if key in removed:
+            continue
+        while (
+            next_addition < len(additions)
+            and additions[next_addition][0] <= writer.items
+        ):
+            writer.write(*additions[next_addition])
+            next_addition += 1
+        if key in replaced:
+            value = replaced[key]
+        elif key in patches:
+            value = value + Delta(patches[key])
+        writer.write(key, value)
+
+    if writer.container is list:
+        for key, value in additions[next_addition:]:
+            writer.write(key, value)
+    else:
+        for key, value in added.items():
+            writer.write(key, value)
+
+
+def apply_delta_file(
+    source_path: str, delta_path: str, output_path: str
+) -> Dict[str, Any]:
+    """
+    Apply a delta file to a source file and write the result to an output file.
+
+    Deltas made of changes inside top-level items, and of top-level items
+    replaced, added or removed, are applied one item at a time while the
+    source is streamed. Other deltas (moves, ignore_order deltas) are applied
+    to the whole document. The output file may be the source file itself; it
+    is only replaced once the output is complete.
+
+    Args:
+        source_path: Path to the CSV, Excel, JSON or NDJSON file to patch
+        delta_path: Path to a delta file written by create_delta
+        output_path: Path of the JSON, NDJSON or CSV file to write
+
+    Returns:
+        Dictionary with the "output_path", its size in "bytes", the number of
+        top-level "items" written, whether the source was "streamed" and the
+        number of "changes" in the delta by report type
+
+    Raises:
+        ValueError: If the delta or the source cannot be read, or the output
+            file type cannot hold the result
+        FileNotFoundError: If the source or delta file does not exist
+    """
+    if not os.path.isfile(source_path):
+        raise FileNotFoundError(f"File not found: {source_path}")
+    delta_dict = load_delta(delta_path)
+    container = file_container(source_path)
+    split = _split_delta(delta_dict, container) if container is not None else None
+
+    directory = os.path.dirname(os.path.abspath(output_path))
+    extension = os.path.splitext(output_path)[1]
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=extension)
+    os.close(fd)
+    try:
+        if split is not None:
+            with RecordWriter(temp_path, container) as writer:
+                _stream_patch(source_path, writer, *split)
+        else:
+            patched = load_data_from_file(source_path) + Delta(delta_dict)
+            if isinstance(patched, dict):
+                container, items = dict, patched.items()
+            elif isinstance(patched, list):
+                container, items = list, enumerate(patched)
+            else:
+                container, items = None, [(None, patched)]
+            with RecordWriter(temp_path, container) as writer:
+                for key, value in items:
+                    writer.write(key, value)
+        os.replace(temp_path, output_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    return {
+        "output_path": output_path,
+        "bytes": os.path.getsize(output_path),
+        "items": writer.items,
+        "streamed": split is not None,
+        "changes": summarize_delta(delta_dict),
+    }
@@ -0,0 +1,350 @@
+"""
+Execution layer for DeepDiff MCP tools.
+
+DeepDiff is CPU bound and pure Python, so running it directly inside a tool
+blocks the FastMCP event loop for every other client. The executor offloads
+tool bodies to a thread or process pool, bounds how many calls of each tool
+may run or wait at the same time, and runs every call under a budget (see
+budget.py) that stops it when it runs too long, uses too much or is cancelled.
+"""
+import asyncio
+import functools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .budget import Budget, BudgetExceededError, run_with_budget
+from .lazy import warm_up
+from .metrics import current_call, run_timed
+
+EXECUTOR_KINDS = ("thread", "process")
+
+ProgressCallback = Callable[[float, Optional[float]], Awaitable[None]]
+
+
+class ExecutorBusyError(RuntimeError):
+    """Raised when a tool's queue is full and a call is rejected."""
+
+
+class _ProgressReporter:
+    """
+    Picklable progress callback handed to tool bodies.
+
+    Tool bodies call it with (progress, total). The updates are put on a queue
+    that the event loop drains, so the same reporter works in worker threads
+    and in worker processes (through a manager queue).
+    """
+
+    def __init__(self, updates: Any):
+        self.updates = updates
+
+    def __call__(self, progress: float, total: Optional[float] = None) -> None:
+        self.updates.put((progress, total))
+
+
+class ToolExecutor:
+    """Run tool bodies in a bounded worker pool."""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        kind: str = "thread",
+        max_concurrency: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        initializer: Optional[Callable[..., Any]] = None,
+        initargs: Tuple[Any, ...] = (),
+        budget: Optional[Budget] = None,
+        tool_budgets: Optional[Dict[str, Budget]] = None,
+        profile: bool = False,
+    ):
+        """
+        Initialize the executor.
+
+        Args:
+            workers: Number of pool workers (default: number of CPUs)
+            kind: Pool type, either "thread" or "process"
+            max_concurrency: Maximum number of running calls per tool
+                (default: number of workers)
+            max_queue: Maximum number of calls per tool waiting for a free slot.
+                Calls beyond this limit are rejected. None means unbounded.
+            initializer: Optional function setting up per-process state. It is
+                called in every worker process, or once in this process when
+                the thread pool is created.
+            initargs: Arguments for initializer
+            budget: Limits applied to every call (default: unlimited)
+            tool_budgets: Limits applied to the calls of some tools, by name,
+                on top of budget
+            profile: Whether to profile every call with cProfile (see
+                metrics.run_timed); profiles go to the call's metrics record
+        """
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(
+                f"Unsupported executor kind: {kind}. "
+                f"Expected one of: {', '.join(EXECUTOR_KINDS)}"
+            )
+        if workers is not None and workers < 1:
+            raise ValueError("workers must be at least 1")
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if max_queue is not None and max_queue < 0:
+            raise ValueError("max_queue must not be negative")
+
+        self.kind = kind
+        self.workers = workers or os.cpu_count() or 1
+        self.max_concurrency = max_concurrency or self.workers
+        self.max_queue = max_queue
+        self.initializer = initializer
+        self.initargs = initargs
+        self.budget = budget or Budget()
+        self.tool_budgets = dict(tool_budgets or {})
+        self.profile = profile
+        self._pool: Optional[Executor] = None
+        self._manager: Any = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._pending: Dict[str, int] = {}
+        self._running: Dict[str, int] = {}
+
+    @property
+    def pool(self) -> Executor:
+        """The underlying pool, created on first use."""
+        if self._pool is None:
+            if self.kind == "process":
+                # Spawn instead of fork: the server process runs an event loop
+                # and threads, neither of which survive a fork safely.
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=self.initializer,
+                    initargs=self.initargs,
+                )
+            else:
+                if self.initializer is not None:
+                    self.initializer(*self.initargs)
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="deepdiff-mcp",
+                )
+        return self._pool
+
+    def warm_up(self) -> List[Future]:
+        """
+        Import the modules the tools need in the pool, in the background.
+
+        The thread pool shares this process's modules, so one task is enough;
+        a process pool gets one task per worker, which also starts them.
+
+        Returns:
+            Futures of the tasks, resolving to the import time of each module
+            (see lazy.warm_up)
+        """
+        tasks = self.workers if self.kind == "process" else 1
+        return [self.pool.submit(warm_up) for _ in range(tasks)]
+
+    def pending(self, tool: Optional[str] = None) -> int:
+        """
+        Get the number of running and queued calls.
+
+        Args:
+            tool: Tool name, or None for the total over all tools
+
+        Returns:
+            Number of calls that have been accepted and not yet finished
+        """
+        if tool is None:
+            return sum(self._pending.values())
+        return self._pending.get(tool, 0)
+
+    def tools(self) -> List[str]:
+        """Get the names of the tools that made calls, sorted."""
+        return sorted(self._pending)
+
+    def running(self, tool: Optional[str] = None) -> int:
+        """
+        Get the number of calls running in the pool.
+
+        Args:
+            tool: Tool name, or None for the total over all tools
+
+        Returns:
+            Number of calls that got a slot and have not finished; the others
+            of pending(tool) are queued
+        """
+        if tool is None:
+            return sum(self._running.values())
+        return self._running.get(tool, 0)
+
+    def budget_for(self, tool: str, budget: Optional[Budget] = None) -> Budget:
+        """
+        Get the limits of a call.
+
+        Args:
+            tool: Name of the tool
+            budget: Limits asked for by the call itself
+
+        Returns:
+            The tightest of the executor's, the tool's and the call's limits
+        """
+        return self.budget.merge(self.tool_budgets.get(tool)).merge(budget)
+
+    @property
+    def manager(self) -> Any:
+        """Manager sharing queues and events with worker processes."""
+        if self._manager is None:
+            self._manager = multiprocessing.get_context("spawn").Manager()
+        return self._manager
+
+    def _progress_queue(self) -> Any:
+        """Create a queue that worker threads or processes can report to."""
+        if self.kind == "process":
+            return self.manager.Queue()
+        return queue.SimpleQueue()
+
+    def _cancel_event(self) -> Any:
+        """Create an event that worker threads or processes can watch."""
+        if self.kind == "process":
+            return self.manager.Event()
+        return threading.Event()
+
+    async def _relay_progress(
+        self,
+        updates: Any,
+        on_progress: ProgressCallback,
+        done: asyncio.Event,
+    ) -> None:
+        """Forward queued progress updates to the callback until done."""
+        while True:
+            try:
+                progress, total = updates.get_nowait()
+            except queue.Empty:
+                if done.is_set():
+                    return
+                await asyncio.sleep(0.05)
+                continue
+            await on_progress(progress, total)
+
+    async def run(
+        self,
+        tool: str,
+        func: Callable[..., Any],
+        *args: Any,
+        on_progress: Optional[ProgressCallback] = None,
+        budget: Optional[Budget] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Run a function in the pool on behalf of a tool.
+
+        The call runs under the tightest of the executor's, the tool's and
+        its own limits. It fails once its timeout has passed, and is stopped
+        when it is cancelled: comparisons and hashes check the budget as they
+        go (see budget.BudgetOperator) and stop; other work runs on in its
+        worker until it returns, but its result is dropped.
+
+        The time the call queued and ran (and its profile, when profiling)
+        is added to the record of the tool call it belongs to, if any (see
+        metrics.current_call).
+
+        Args:
+            tool: Name of the tool the call belongs to
+            func: Function to run. In process mode it must be a picklable,
+                module-level function, and its arguments must be picklable.
+            *args: Positional arguments for func
+            on_progress: Optional coroutine function called with
+                (progress, total) on the event loop. When given, func receives
+                a ``progress`` keyword argument it can call to report progress.
+            budget: Limits asked for by the call (see budget_for)
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            The function's return value
+
+        Raises:
+            ExecutorBusyError: If the tool already has too many calls queued
+            BudgetExceededError: If the call ran out of its budget
+        """
+        pending = self._pending.get(tool, 0)
+        if (
+            self.max_queue is not None
+            and pending >= self.max_concurrency + self.max_queue
+        ):
+            raise ExecutorBusyError(
+                f"Too many pending '{tool}' calls ({pending}); try again later"
+            )
+
+        semaphore = self._semaphores.get(tool)
+        if semaphore is None:
+            semaphore = self._semaphores[tool] = asyncio.Semaphore(self.max_concurrency)
+
+        relay = None
+        done = asyncio.Event()
+        if on_progress is not None:
+            updates = self._progress_queue()
+            kwargs["progress"] = _ProgressReporter(updates)
+            relay = asyncio.ensure_future(
+                self._relay_progress(updates, on_progress, done)
+            )
+
+        limits = self.budget_for(tool, budget)
+        cancelled = self._cancel_event()
+        call = current_call()
+        self._pending[tool] = pending + 1
+        try:
+            queued = time.perf_counter()
+            async with semaphore:
+                started = time.perf_counter()
+                self._running[tool] = self._running.get(tool, 0) + 1
+                loop = asyncio.get_running_loop()
+                future = loop.run_in_executor(
+                    self.pool,
+                    functools.partial(
+                        run_timed,
+                        self.profile,
+                        run_with_budget,
+                        limits,
+                        cancelled,
+                        func,
+                        *args,
+                        **kwargs,
+                    ),
+                )
+                try:
+                    result, phases, profile = await asyncio.wait_for(
+                        future, limits.timeout
+                    )
+                    if call is not None:
+                        call.add("queue", started - queued)
+                        call.add_worker_phases(time.perf_counter() - started, phases)
+                        if profile is not None:
+                            call.profile = (call.profile or "") + profile
+                    return result
+                except asyncio.TimeoutError:
+                    cancelled.set()
+                    raise BudgetExceededError(
+                        f"'{tool}' call ran for more than {limits.timeout} seconds "
+                        "(timeout)"
+                    ) from None
+                except asyncio.CancelledError:
+                    # The client cancelled the request or went away
+                    cancelled.set()
+                    raise
+                finally:
+                    self._running[tool] -= 1
+        finally:
+            self._pending[tool] -= 1
+            if relay is not None:
+                # Deliver the updates reported before the call finished
+                done.set()
+                await relay
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the underlying pool."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
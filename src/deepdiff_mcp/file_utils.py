@@ -1,10 +1,278 @@
 """
 Utilities for file operations in DeepDiff MCP.
 """
+import hashlib
+import itertools
+import json
+import mmap
 import os
-from typing import Any, Dict, List, Optional, Tuple, Union
+import pickle
+import tempfile
+import threading
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
-import pandas as pd
+from .cache import ResultCache, file_signature, make_cache_key
+from .metrics import worker_phase
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - optional speedup
+    ijson = None
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+DEFAULT_FILE_CACHE_SIZE = 32
+DEFAULT_FILE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_FILE_CACHE_MAX_DISK_BYTES = 2 * 1024 * 1024 * 1024
+
+CSV_RECORD_CHUNK_ROWS = 10000
+
+JSON_EXTENSIONS = (".json",)
+NDJSON_EXTENSIONS = (".ndjson", ".jsonl")
+
+_MISSING = object()
+
+
+class ParsedFileCache:
+    """
+    Cache of parsed file contents, keyed on path, mtime, size and parse options.
+    
+    Parsed DataFrames are kept in an in-memory LRU and, when a cache directory
+    is configured, also persisted there as pickles so that a restarted server
+    does not pay the parse cost (tens of seconds for large Excel files) again.
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_FILE_CACHE_SIZE,
+        max_bytes: int = DEFAULT_FILE_CACHE_MAX_BYTES,
+        cache_dir: Optional[str] = None,
+        max_disk_bytes: int = DEFAULT_FILE_CACHE_MAX_DISK_BYTES,
+    ):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_entries: Maximum number of parsed files kept in memory;
+                0 disables the in-memory cache
+            max_bytes: Maximum total size of the parsed files kept in memory
+            cache_dir: Optional directory where parsed files are persisted.
+                Only point this at a directory the server alone writes to,
+                since its contents are unpickled.
+            max_disk_bytes: Maximum total size of the persisted files
+        """
+        self.memory = ResultCache(max_entries=max_entries, max_bytes=max_bytes)
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.disk_hits = 0
+        self.disk_writes = 0
+        self.disk_evictions = 0
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+    
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+    
+    def _read_disk(self, key: str) -> Any:
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        # Touch the file so that pruning evicts the least recently used ones
+        os.utime(path)
+        with self._lock:
+            self.disk_hits += 1
+        return value
+    
+    def _write_disk(self, key: str, value: Any) -> None:
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self._disk_path(key))
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+        with self._lock:
+            self.disk_writes += 1
+        self._prune_disk()
+    
+    def _prune_disk(self) -> None:
+        """Remove the least recently used persisted files over the size limit."""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".pkl"):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            with self._lock:
+                self.disk_evictions += 1
+    
+    def load(self, file_path: str, loader: Any, **options: Any) -> Any:
+        """
+        Load a file through the cache.
+        
+        Args:
+            file_path: Path to the file
+            loader: Function parsing the file, called as loader(file_path, **options)
+            **options: Parse options, part of the cache key
+            
+        Returns:
+            The parsed contents
+        """
+        signature = file_signature(file_path)
+        key = None
+        if signature is not None:
+            key = make_cache_key(signature, loader.__name__, sorted(options.items()))
+        if key is None:
+            return loader(file_path, **options)
+        
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+        if self.cache_dir:
+            value = self._read_disk(key)
+            if value is not None:
+                self.memory.put(key, value)
+                return value
+        
+        value = loader(file_path, **options)
+        self.memory.put(key, value)
+        if self.cache_dir:
+            self._write_disk(key, value)
+        return value
+    
+    def clear(self) -> None:
+        """Remove all parsed files from memory (persisted files are kept)."""
+        self.memory.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get memory and disk counters."""
+        stats = self.memory.stats()
+        with self._lock:
+            stats.update(
+                cache_dir=self.cache_dir,
+                disk_hits=self.disk_hits,
+                disk_writes=self.disk_writes,
+                disk_evictions=self.disk_evictions,
+            )
+        return stats
+
+
+_file_cache = ParsedFileCache()
+
+
+def configure_file_cache(
+    max_entries: int = DEFAULT_FILE_CACHE_SIZE,
+    max_bytes: int = DEFAULT_FILE_CACHE_MAX_BYTES,
+    cache_dir: Optional[str] = None,
+    max_disk_bytes: int = DEFAULT_FILE_CACHE_MAX_DISK_BYTES,
+) -> ParsedFileCache:
+    """
+    Replace the process-wide parsed file cache.
+    
+    Worker processes each have their own cache; the executor calls this in
+    every worker at startup.
+    
+    Args:
+        max_entries: Maximum number of parsed files kept in memory
+        max_bytes: Maximum total size of the parsed files kept in memory
+        cache_dir: Optional directory where parsed files are persisted
+        max_disk_bytes: Maximum total size of the persisted files
+        
+    Returns:
+        The new cache
+    """
+    global _file_cache
+    _file_cache = ParsedFileCache(
+        max_entries=max_entries,
+        max_bytes=max_bytes,
+        cache_dir=cache_dir,
+        max_disk_bytes=max_disk_bytes,
+    )
+    return _file_cache
+
+
+def get_file_cache() -> ParsedFileCache:
+    """Get the process-wide parsed file cache."""
+    return _file_cache
+
+
+def _parse_dataframe(file_path: str) -> "pd.DataFrame":
+    """Parse a tabular file into a DataFrame based on its extension."""
+    import pandas as pd
+
+    extension = os.path.splitext(file_path)[1].lower()
+    
+    if extension == ".csv":
+        return pd.read_csv(file_path)
+    elif extension in [".xls", ".xlsx"]:
+        return pd.read_excel(file_path)
+    elif extension in JSON_EXTENSIONS:
+        return pd.read_json(file_path)
+    elif extension in NDJSON_EXTENSIONS:
+        return pd.read_json(file_path, lines=True)
+    else:
+        raise ValueError(f"Unsupported file type: {extension}")
+
+
+def load_dataframe_from_file(file_path: str, use_cache: bool = True) -> "pd.DataFrame":
+    """
+    Load a tabular file into a DataFrame based on its extension.
+    
+    Parsed files are cached, keyed on path, modification time and size, so
+    comparing one file against many others parses it only once.
+    
+    Args:
+        file_path: Path to the file to load
+        use_cache: Whether to go through the parsed file cache
+        
+    Returns:
+        DataFrame with the file contents
+        
+    Raises:
+        ValueError: If the file type is unsupported
+        FileNotFoundError: If the file does not exist
+    """
+    if not os.path.isfile(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+    
+    with worker_phase("load"):
+        if use_cache:
+            return _file_cache.load(file_path, _parse_dataframe)
+        return _parse_dataframe(file_path)
 
 
 def load_data_from_file(file_path: str) -> Any:
@@ -21,19 +289,476 @@ def load_data_from_file(file_path: str) -> Any:
         ValueError: If the file type is unsupported
         FileNotFoundError: If the file does not exist
     """
+    with worker_phase("load"):
+        if is_json_file(file_path):
+            return load_json_file(file_path)
+        return load_dataframe_from_file(file_path).to_dict(orient="records")
+
+
+def is_json_file(file_path: str) -> bool:
+    """Tell whether a file is JSON or NDJSON, based on its extension."""
+    extension = os.path.splitext(file_path)[1].lower()
+    return extension in JSON_EXTENSIONS + NDJSON_EXTENSIONS
+
+
+def _is_ndjson(file_path: str) -> bool:
+    return os.path.splitext(file_path)[1].lower() in NDJSON_EXTENSIONS
+
+
+def parse_json(data: Union[bytes, str, memoryview]) -> Any:
+    """
+    Parse a JSON document, with orjson when it is installed.
+    
+    orjson rejects some documents the json module accepts (NaN literals,
+    integers beyond 64 bits); those are parsed with the json module.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def _parse_json_file(file_path: str) -> Any:
+    """Parse a whole JSON file, memory-mapping it when orjson is available."""
+    with open(file_path, "rb") as handle:
+        if orjson is None or os.fstat(handle.fileno()).st_size == 0:
+            return parse_json(handle.read())
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                return parse_json(view)
+            finally:
+                view.release()
+
+
+def iter_json_records(file_path: str) -> Iterator[Any]:
+    """
+    Iterate over the records of an NDJSON file or of a JSON array.
+    
+    NDJSON lines are parsed one at a time. JSON arrays are streamed item by
+    item when ijson is installed, and parsed whole otherwise.
+    
+    Args:
+        file_path: Path to a .json, .ndjson or .jsonl file
+    
+    Yields:
+        Each record (blank NDJSON lines are skipped)
+    
+    Raises:
+        ValueError: If a JSON file does not hold an array
+    """
+    if _is_ndjson(file_path):
+        with open(file_path, "rb") as handle:
+            for line in handle:
+                if line.strip():
+                    yield parse_json(line)
+        return
+    
+    if ijson is None or _json_container(file_path) != b"[":
+        yield from _parse_json_array(file_path)
+        return
+    
+    with open(file_path, "rb") as handle:
+        records = ijson.items(handle, "item", use_float=True)
+        yield from _resume_stream(records, lambda: _parse_json_array(file_path))
+
+
+def _parse_json_array(file_path: str) -> List[Any]:
+    records = _parse_json_file(file_path)
+    if not isinstance(records, list):
+        raise ValueError(f"{file_path} does not hold a JSON array")
+    return records
+
+
+def _resume_stream(
+    stream: Iterator[Any], parse_whole: Callable[[], Iterable[Any]]
+) -> Iterator[Any]:
+    """
+    Yield from an ijson stream, finishing from a full parse if ijson fails.
+    
+    ijson only accepts strict JSON, while the json module also reads NaN and
+    Infinity; the entries already yielded are skipped in the full parse.
+    """
+    count = 0
+    try:
+        for entry in stream:
+            yield entry
+            count += 1
+    except ijson.JSONError:
+        yield from itertools.islice(parse_whole(), count, None)
+
+
+def path_keys(path: str) -> Tuple[Any, ...]:
+    """
+    Split a DeepDiff path into the keys and indices it goes through.
+    
+    Args:
+        path: Path such as ``root['a'][0]``
+    
+    Returns:
+        The keys, e.g. ``('a', 0)``
+    
+    Raises:
+        ValueError: If the path is invalid or accesses attributes
+    """
+    from deepdiff.path import _path_to_elements
+
+    try:
+        elements = _path_to_elements(path)
+    except Exception as e:
+        raise ValueError(f"Invalid path {path}: {str(e)}")
+    if any(action != "GET" for _, action in elements[1:]):
+        raise ValueError(f"Only item access is supported in paths: {path}")
+    return tuple(key for key, _ in elements[1:])
+
+
+def _get_keys(value: Any, keys: Tuple[Any, ...], path: str) -> Any:
+    for key in keys:
+        try:
+            value = value[key]
+        except (KeyError, IndexError, TypeError):
+            raise KeyError(f"Path not found: {path}")
+    return value
+
+
+def _stream_json_path(file_path: str, keys: Tuple[Any, ...], path: str) -> Any:
+    """
+    Extract the value at a path from a JSON file without parsing the rest.
+    
+    ijson filters the document at C speed down to the longest leading run of
+    dictionary keys plus, when a list index follows, that list's items. Only
+    the selected value (or list item) is built in memory; the remaining keys
+    are applied to it.
+    """
+    leading = []
+    for key in keys:
+        # ijson prefixes are dot-separated, and "item" stands for list items
+        if not isinstance(key, str) or not key or "." in key or key == "item":
+            break
+        leading.append(key)
+    rest = keys[len(leading):]
+    position = rest[0] if rest else None
+    by_position = isinstance(position, int) and not isinstance(position, bool)
+    
+    try:
+        with open(file_path, "rb") as handle:
+            if by_position and position >= 0:
+                prefix = ".".join(leading + ["item"])
+                items = ijson.items(handle, prefix, use_float=True)
+                value = next(itertools.islice(items, position, None), _MISSING)
+                rest = rest[1:]
+            else:
+                items = ijson.items(handle, ".".join(leading), use_float=True)
+                value = next(items, _MISSING)
+    except ijson.JSONError:
+        # Not strict JSON (NaN or Infinity, for instance); parse it whole
+        return _get_keys(_parse_json_file(file_path), keys, path)
+    
+    if value is _MISSING:
+        raise KeyError(f"Path not found: {path}")
+    return _get_keys(value, rest, path)
+
+
+def _load_json(file_path: str, path: Optional[str] = None) -> Any:
+    """Load a JSON or NDJSON file, or only the value at a path in it."""
+    keys = path_keys(path) if path else ()
+    
+    if _is_ndjson(file_path):
+        if not keys:
+            return list(iter_json_records(file_path))
+        if not isinstance(keys[0], int) or keys[0] < 0:
+            raise KeyError(f"Path not found: {path}")
+        # Lines before the selected record are skipped without being parsed
+        with open(file_path, "rb") as handle:
+            lines = (line for line in handle if line.strip())
+            line = next(itertools.islice(lines, keys[0], None), None)
+        if line is None:
+            raise KeyError(f"Path not found: {path}")
+        return _get_keys(parse_json(line), keys[1:], path)
+    
+    if keys and ijson is not None:
+        return _stream_json_path(file_path, keys, path)
+    return _get_keys(_parse_json_file(file_path), keys, path)
+
+
+def load_json_file(
+    file_path: str, path: Optional[str] = None, use_cache: bool = True
+) -> Any:
+    """
+    Load a JSON or NDJSON file natively (without pandas).
+    
+    NDJSON files (.ndjson, .jsonl) load as a list of records. With a path,
+    only the value at that path is built: NDJSON lines before the selected
+    record are not parsed, and JSON files are streamed with ijson (when
+    installed) so the parts of the document outside the path are never
+    materialized.
+    
+    Args:
+        file_path: Path to the file to load
+        path: Optional DeepDiff path of the value to load, e.g. ``root['a'][0]``
+        use_cache: Whether to go through the parsed file cache
+    
+    Returns:
+        The file contents, or the value at path
+    
+    Raises:
+        ValueError: If the file type is unsupported or the file is invalid
+        FileNotFoundError: If the file does not exist
+        KeyError: If the path does not exist in the file
+    """
     if not os.path.isfile(file_path):
         raise FileNotFoundError(f"File not found: {file_path}")
+    if not is_json_file(file_path):
+        extension = os.path.splitext(file_path)[1].lower()
+        raise ValueError(f"Unsupported file type: {extension}")
     
+    with worker_phase("load"):
+        if use_cache:
+            return _file_cache.load(file_path, _load_json, path=path)
+        return _load_json(file_path, path)
+
+
+def _json_container(file_path: str) -> bytes:
+    """Get the first significant byte of a JSON file ({, [ or a scalar's)."""
+    with open(file_path, "rb") as handle:
+        head = handle.read(3)
+        if head != b"\xef\xbb\xbf":
+            handle.seek(0)
+        while True:
+            byte = handle.read(1)
+            if not byte or not byte.isspace():
+                return byte
+
+
+def file_container(file_path: str) -> Optional[type]:
+    """
+    Tell what kind of document a file holds, without parsing it.
+
+    Returns:
+        dict or list for the container iter_file_items walks (NDJSON, CSV and
+        Excel files are lists of records), or None for a JSON scalar
+    """
     extension = os.path.splitext(file_path)[1].lower()
-    
-    if extension == ".csv":
-        return pd.read_csv(file_path).to_dict(orient="records")
-    elif extension in [".xls", ".xlsx"]:
-        return pd.read_excel(file_path).to_dict(orient="records")
-    elif extension == ".json":
-        return pd.read_json(file_path).to_dict(orient="records")
+    if extension not in JSON_EXTENSIONS:
+        return list
+    container = _json_container(file_path)
+    if container == b"{":
+        return dict
+    if container == b"[":
+        return list
+    return None
+
+
+def iter_file_items(file_path: str) -> Iterator[Tuple[Any, Any]]:
+    """
+    Iterate over the top-level items of a file without loading it whole.
+
+    NDJSON lines and CSV rows are read a block at a time, and JSON documents
+    are streamed with ijson when it is installed, so only one item is held in
+    memory at a time. Excel files, and JSON files without ijson, are loaded
+    whole first. pandas infers the column types of each block of CSV rows on
+    its own, so a column can parse differently than when the table is loaded
+    whole (integers in one block and floats in a block with empty cells).
+
+    Args:
+        file_path: Path to a CSV, Excel, JSON or NDJSON file
+
+    Yields:
+        (key, value) for the items of a top-level dictionary, (index, record)
+        for the records of a top-level list or table, or a single
+        (None, value) when the document is a scalar
+
+    Raises:
+        ValueError: If the file type is unsupported
+        FileNotFoundError: If the file does not exist
+    """
+    if not os.path.isfile(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+    extension = os.path.splitext(file_path)[1].lower()
+
+    if _is_ndjson(file_path):
+        yield from enumerate(iter_json_records(file_path))
+    elif extension in JSON_EXTENSIONS:
+        container = _json_container(file_path)
+        if ijson is not None and container == b"[":
+            yield from enumerate(iter_json_records(file_path))
+        elif ijson is not None and container == b"{":
+            with open(file_path, "rb") as handle:
+                items = ijson.kvitems(handle, "", use_float=True)
+                yield from _resume_stream(
+                    items, lambda: _parse_json_file(file_path).items()
+                )
+        else:
+            data = _parse_json_file(file_path)
+            if isinstance(data, dict):
+                yield from data.items()
+            elif isinstance(data, list):
+                yield from enumerate(data)
+            else:
+                yield None, data
+    elif extension == ".csv":
+        import pandas as pd
+
+        index = 0
+        with pd.read_csv(file_path, chunksize=CSV_RECORD_CHUNK_ROWS) as reader:
+            for chunk in reader:
+                for record in chunk.to_dict(orient="records"):
+                    yield index, record
+                    index += 1
     else:
-        raise ValueError(f"Unsupported file type: {extension}")
+        yield from enumerate(load_data_from_file(file_path))
+
+
+def hash_file_bytes(file_path: str, chunk_size: int = 1024 * 1024) -> Dict[str, Any]:
+    """
+    Hash the raw bytes of a file, reading it in chunks.
+
+    Args:
+        file_path: Path to the file
+        chunk_size: Number of bytes read at a time
+
+    Returns:
+        Dictionary with the blake2b "hash" of the file and its size in "bytes"
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    size = 0
+    with open(file_path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b""):
+            digest.update(chunk)
+            size += len(chunk)
+    return {"hash": digest.hexdigest(), "bytes": size}
+
+
+class RecordWriter:
+    """
+    Write a document to a JSON, NDJSON or CSV file one top-level item at a time.
+
+    Items are written as they come, so a document produced record by record
+    never has to be held in memory. Values are encoded with the json module,
+    which keeps NaN and Infinity readable by load_json_file.
+    """
+
+    def __init__(self, file_path: str, container: type = list):
+        """
+        Open the file for writing.
+
+        Args:
+            file_path: Path of the file to write; its extension selects the format
+            container: dict or list, the kind of document written, or None
+                for a single JSON value (NDJSON and CSV files only hold lists
+                of records)
+
+        Raises:
+            ValueError: If the file type is unsupported or cannot hold the
+                container
+        """
+        from .operations import _json_default
+
+        extension = os.path.splitext(file_path)[1].lower()
+        if extension not in JSON_EXTENSIONS + NDJSON_EXTENSIONS + (".csv",):
+            raise ValueError(f"Unsupported output file type: {extension}")
+        if container is not list and extension not in JSON_EXTENSIONS:
+            raise ValueError(f"{extension} files can only hold lists of records")
+
+        self.file_path = file_path
+        self.extension = extension
+        self.container = container
+        self.items = 0
+        self._default = _json_default
+        self._rows: List[Any] = []
+        self._columns: Optional[List[Any]] = None
+        self._handle = open(file_path, "w", encoding="utf-8", newline="")
+        if extension in JSON_EXTENSIONS and container is not None:
+            self._handle.write("{" if container is dict else "[")
+
+    def _dumps(self, value: Any) -> str:
+        return json.dumps(value, default=self._default, ensure_ascii=False)
+
+    def write(self, key: Any, value: Any) -> None:
+        """Write an item: key is the dictionary key, and ignored for lists."""
+        if self.extension in NDJSON_EXTENSIONS:
+            self._handle.write(self._dumps(value))
+            self._handle.write("\n")
+        elif self.extension == ".csv":
+            self._rows.append(value)
+            if len(self._rows) >= CSV_RECORD_CHUNK_ROWS:
+                self._flush_rows()
+        else:
+            if self.items and self.container is not None:
+                self._handle.write(",")
+            if self.container is dict:
+                self._handle.write(self._dumps(str(key)) + ":")
+            self._handle.write(self._dumps(value))
+        self.items += 1
+
+    def _flush_rows(self) -> None:
+        if not self._rows:
+            return
+        import pandas as pd
+
+        frame = pd.DataFrame(self._rows, columns=self._columns)
+        frame.to_csv(self._handle, header=self._columns is None, index=False)
+        self._columns = list(frame.columns)
+        self._rows = []
+
+    def close(self) -> int:
+        """
+        Finish and close the file.
+
+        Returns:
+            Size of the written file in bytes
+        """
+        if self.extension == ".csv":
+            self._flush_rows()
+        elif self.extension in JSON_EXTENSIONS and self.container is not None:
+            self._handle.write("}" if self.container is dict else "]")
+        self._handle.close()
+        return os.path.getsize(self.file_path)
+
+    def __enter__(self) -> "RecordWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if not self._handle.closed:
+            if exc_info[0] is None:
+                self.close()
+            else:
+                self._handle.close()
+
+
+def open_csv_reader(file_path: str) -> Any:
+    """
+    Open a CSV file for reading in chunks.
+    
+    Args:
+        file_path: Path to the CSV file
+        
+    Returns:
+        pandas TextFileReader; call get_chunk(n) to read the next n rows
+        
+    Raises:
+        ValueError: If the file is not a CSV file
+        FileNotFoundError: If the file does not exist
+    """
+    if not os.path.isfile(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+    
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension != ".csv":
+        raise ValueError(
+            f"Chunked reading is only supported for CSV files, not {extension}"
+        )
+
+    import pandas as pd
+
+    return pd.read_csv(file_path, iterator=True)
 
 
 def detect_delimiter(file_path: str) -> str:
@@ -0,0 +1,237 @@
+"""
+Output formats for DeepDiff MCP results.
+
+A full diff keeps every old and new value and repeats long path strings such
+as ``root['a']['b'][3]`` for every change, and building and encoding it can
+take longer than the comparison itself. Most callers only need part of it;
+the formats in this module give them just that part, and results are encoded
+with orjson when it is installed.
+"""
+import json
+from collections.abc import Collection
+from typing import Any, Callable, Dict, List, Tuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+OUTPUT_FORMATS = ("full", "tree_summary", "paths_only", "json_patch", "compact")
+
+# Reports holding a value (or old and new values) for each path
+_VALUE_REPORTS = ("values_changed", "type_changes")
+
+
+def dumps_json(obj: Any, default: Callable[[Any], Any] = str) -> str:
+    """
+    Encode a result as JSON, with orjson when it is installed.
+
+    Args:
+        obj: Object to encode
+        default: Function encoding the values JSON has no type for
+            (default: their str(), as FastMCP does)
+
+    Returns:
+        The JSON text
+    """
+    if orjson is not None:
+        try:
+            data = orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS)
+            return data.decode()
+        except TypeError:
+            # Integers beyond 64 bits, for instance
+            pass
+    return json.dumps(obj, default=default)
+
+
+def _is_report(items: Any) -> bool:
+    # Reports are dictionaries, lists or ordered sets of paths
+    return isinstance(items, Collection) and not isinstance(items, (str, bytes))
+
+
+def _keys(path: str) -> Tuple[Any, ...]:
+    from deepdiff.path import _path_to_elements
+
+    return tuple(key for key, _ in _path_to_elements(path)[1:])
+
+
+def tree_summary(diff: Dict) -> Dict[str, Any]:
+    """
+    Count the changes of a diff.
+
+    Returns:
+        Dictionary with the "total" number of changes, the number per report
+        type ("reports") and per top-level key of the compared objects
+        ("subtrees", "root" for changes of the objects themselves)
+    """
+    reports = {}
+    subtrees: Dict[str, int] = {}
+    for report, items in diff.items():
+        if not _is_report(items):
+            continue
+        reports[report] = len(items)
+        for path in items:
+            keys = _keys(path)
+            subtree = f"root[{keys[0]!r}]" if keys else "root"
+            subtrees[subtree] = subtrees.get(subtree, 0) + 1
+    return {"total": sum(reports.values()), "reports": reports, "subtrees": subtrees}
+
+
+def paths_only(diff: Dict) -> Dict[str, Any]:
+    """Keep only the changed paths of each report type."""
+    return {
+        report: list(items) if _is_report(items) else items
+        for report, items in diff.items()
+    }
+
+
+def _pointer(keys: Tuple[Any, ...]) -> str:
+    """Build an RFC 6901 JSON pointer."""
+    return "".join("/" + str(key).replace("~", "~0").replace("/", "~1") for key in keys)
+
+
+def _position_order(keys: Tuple[Any, ...]) -> Tuple[Tuple[int, Any], ...]:
+    # Positions sort numerically, keys by their text
+    return tuple((0, key) if isinstance(key, int) else (1, str(key)) for key in keys)
+
+
+def json_patch(diff: Dict) -> Dict[str, Any]:
+    """
+    Convert a diff into an RFC 6902 JSON patch.
+
+    Added dictionary items only carry their values in delta dictionaries
+    (create_delta's output), so pass a delta to get a complete patch; with a
+    plain diff they are reported as unsupported.
+
+    Operations are ordered as Delta applies them: replacements first (their
+    list positions are those of the first object), then list items removed
+    from the last position to the first, list items added from the first
+    position to the last (positions in the second object), and dictionary
+    items added and removed.
+
+    Returns:
+        Dictionary with the "patch" operations and, under "unsupported", the
+        paths of changes JSON patch cannot express (set changes, repetition
+        changes, moves found with ignore_order, changes without values)
+    """
+    replaced: List[Tuple[Tuple[Any, ...], Any]] = []
+    removed_items: List[Tuple[Any, ...]] = []
+    added_items: List[Tuple[Tuple[Any, ...], Any]] = []
+    added_keys: List[Tuple[Tuple[Any, ...], Any]] = []
+    removed_keys: List[Tuple[Any, ...]] = []
+    unsupported: Dict[str, List[str]] = {}
+
+    for report, items in diff.items():
+        if not _is_report(items):
+            continue
+        has_values = isinstance(items, dict)
+        for path in items:
+            keys = _keys(path)
+            if report in _VALUE_REPORTS and has_values and "new_value" in items[path]:
+                replaced.append((keys, items[path]["new_value"]))
+            elif report == "iterable_item_removed":
+                removed_items.append(keys)
+            elif report == "iterable_item_added" and has_values:
+                added_items.append((keys, items[path]))
+            elif report in ("dictionary_item_added", "attribute_added") and has_values:
+                added_keys.append((keys, items[path]))
+            elif report in ("dictionary_item_removed", "attribute_removed"):
+                removed_keys.append(keys)
+            else:
+                unsupported.setdefault(report, []).append(path)
+
+    patch: List[Dict[str, Any]] = []
+    for keys, value in replaced:
+        patch.append({"op": "replace", "path": _pointer(keys), "value": value})
+    for keys in sorted(removed_items, key=_position_order, reverse=True):
+        patch.append({"op": "remove", "path": _pointer(keys)})
+    for keys, value in sorted(added_items, key=lambda entry: _position_order(entry[0])):
+        patch.append({"op": "add", "path": _pointer(keys), "value": value})
+    for keys, value in added_keys:
+        patch.append({"op": "add", "path": _pointer(keys), "value": value})
+    for keys in removed_keys:
+        patch.append({"op": "remove", "path": _pointer(keys)})
+
+    result: Dict[str, Any] = {"patch": patch}
+    if unsupported:
+        result["unsupported"] = unsupported
+    return result
+
+
+def compact(diff: Dict) -> Dict[str, Any]:
+    """
+    Encode the paths of a diff as lists of indices into a table of segments.
+
+    Every distinct key or position appears once in "segments", and each path
+    becomes the list of its segments' indices, e.g. ``root['a'][3]`` becomes
+    ``[0, 1]`` with segments ``["a", 3]``.
+
+    Returns:
+        Dictionary with the "segments" and, for each report type, a list of
+        ``[path, value]`` entries (``[path]`` for reports without values)
+    """
+    segments: List[Any] = []
+    ids: Dict[Tuple[type, Any], int] = {}
+
+    def encode(path: str) -> List[int]:
+        encoded = []
+        for key in _keys(path):
+            # Keep 1 and "1" (and True) apart
+            segment = (type(key), key)
+            if segment not in ids:
+                ids[segment] = len(segments)
+                segments.append(key)
+            encoded.append(ids[segment])
+        return encoded
+
+    result: Dict[str, Any] = {"segments": segments}
+    for report, items in diff.items():
+        if isinstance(items, dict):
+            result[report] = [[encode(path), value] for path, value in items.items()]
+        elif _is_report(items):
+            result[report] = [[encode(path)] for path in items]
+        else:
+            result[report] = items
+    return result
+
+
+_FORMATTERS = {
+    "tree_summary": tree_summary,
+    "paths_only": paths_only,
+    "json_patch": json_patch,
+    "compact": compact,
+}
+
+
+def check_output_format(output_format: str) -> None:
+    """
+    Check that an output format is supported.
+
+    Raises:
+        ValueError: If the format is not one of OUTPUT_FORMATS
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(
+            f"Unsupported output format: {output_format}. "
+            f"Expected one of: {', '.join(OUTPUT_FORMATS)}"
+        )
+
+
+def format_diff(diff: Dict, output_format: str = "full") -> Dict:
+    """
+    Convert a diff dictionary to an output format.
+
+    Args:
+        diff: Diff dictionary as returned by DeepDiff.to_dict()
+        output_format: One of OUTPUT_FORMATS; "full" returns the diff as is
+
+    Returns:
+        The formatted result
+
+    Raises:
+        ValueError: If the format is unknown
+    """
+    check_output_format(output_format)
+    if output_format == "full":
+        return diff
+    return _FORMATTERS[output_format](diff)
@@ -0,0 +1,171 @@
+"""
+Delta histories for DeepDiff MCP.
+
+An object's history stored as a chain of deltas is rebuilt by applying them
+one by one, and ``obj + Delta(...)`` deep-copies the whole object at every
+step. Replaying a chain here copies the object once and applies every delta
+in place, and a DeltaHistory keeps a full snapshot (keyframe) every few
+versions, so rebuilding a version replays at most that many deltas.
+"""
+import copy
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_KEYFRAME_INTERVAL = 16
+
+
+def apply_deltas(obj: Any, deltas: List[Dict]) -> Any:
+    """
+    Apply a chain of deltas to an object.
+
+    The object is copied once and the deltas are applied to the copy in
+    place, instead of copying the object for every delta. Only the deltas'
+    values are copied, so that later deltas do not modify them.
+
+    Args:
+        obj: Object to transform; it is not modified
+        deltas: Delta dictionaries created by create_delta, in order
+
+    Returns:
+        The transformed object
+    """
+    from deepdiff.delta import Delta
+
+    result = copy.deepcopy(obj)
+    for delta_dict in deltas:
+        result = result + Delta(copy.deepcopy(delta_dict), mutate=True)
+    return result
+
+
+def squash_deltas(obj: Any, deltas: List[Dict], **options: Any) -> Dict:
+    """
+    Compose a chain of deltas into one equivalent delta.
+
+    Delta paths such as list positions refer to the state the delta was
+    created from, so the chain is composed by replaying it on the object it
+    starts from and diffing the result.
+
+    Args:
+        obj: Object the first delta applies to
+        deltas: Delta dictionaries created by create_delta, in order
+        **options: DeepDiff options for the composed delta
+
+    Returns:
+        Delta dictionary transforming obj into the end of the chain
+    """
+    from .operations import create_delta
+
+    return create_delta(obj, apply_deltas(obj, deltas), **options)
+
+
+class DeltaHistory:
+    """Versions of an object, stored as deltas with periodic keyframes."""
+
+    def __init__(self, obj: Any, keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL):
+        """
+        Start a history at version 0.
+
+        Args:
+            obj: First version of the object
+            keyframe_interval: Keep a full snapshot every this many versions
+
+        Raises:
+            ValueError: If keyframe_interval is not positive
+        """
+        if keyframe_interval < 1:
+            raise ValueError("keyframe_interval must be at least 1")
+        self.keyframe_interval = keyframe_interval
+        # deltas[i] turns version i into version i + 1
+        self.deltas: List[Dict] = []
+        self.keyframes: Dict[int, Any] = {0: copy.deepcopy(obj)}
+        self.latest = copy.deepcopy(obj)
+
+    @property
+    def version(self) -> int:
+        """Number of the latest version."""
+        return len(self.deltas)
+
+    def append(self, delta_dict: Dict) -> int:
+        """
+        Add a version by applying a delta to the latest one.
+
+        Args:
+            delta_dict: Delta dictionary created by create_delta
+
+        Returns:
+            Number of the new version
+        """
+        from deepdiff.delta import Delta
+
+        self.latest = self.latest + Delta(copy.deepcopy(delta_dict), mutate=True)
+        self.deltas.append(delta_dict)
+        if self.version % self.keyframe_interval == 0:
+            self.keyframes[self.version] = copy.deepcopy(self.latest)
+        return self.version
+
+    def appended(self, delta_dict: Dict) -> "DeltaHistory":
+        """
+        Get a copy of the history with one more version.
+
+        The history itself is left unchanged; the copy shares its keyframes
+        and deltas, which are never modified.
+
+        Args:
+            delta_dict: Delta dictionary created by create_delta
+
+        Returns:
+            The new history
+        """
+        history = copy.copy(self)
+        history.deltas = list(self.deltas)
+        history.keyframes = dict(self.keyframes)
+        history.latest = copy.deepcopy(self.latest)
+        history.append(delta_dict)
+        return history
+
+    def chain(self, version: Optional[int] = None) -> Tuple[Any, List[Dict]]:
+        """
+        Get the nearest keyframe of a version and the deltas leading to it.
+
+        Args:
+            version: Version number (default: the latest); negative numbers
+                count back from the latest
+
+        Returns:
+            (object, deltas) to pass to apply_deltas; the object is not copied
+
+        Raises:
+            ValueError: If the version does not exist
+        """
+        if version is None:
+            version = self.version
+        elif version < 0:
+            version += self.version + 1
+        if not 0 <= version <= self.version:
+            raise ValueError(f"Unknown version {version} (latest is {self.version})")
+        if version == self.version:
+            return self.latest, []
+        keyframe = version - version % self.keyframe_interval
+        return self.keyframes[keyframe], self.deltas[keyframe:version]
+
+    def get(self, version: Optional[int] = None) -> Any:
+        """
+        Rebuild a version from its nearest keyframe.
+
+        Args:
+            version: Version number (default: the latest); negative numbers
+                count back from the latest
+
+        Returns:
+            A copy of the object at that version
+
+        Raises:
+            ValueError: If the version does not exist
+        """
+        return apply_deltas(*self.chain(version))
+
+
+def create_history(
+    obj: Any, keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL
+) -> DeltaHistory:
+    """Start the history of an object."""
+    return DeltaHistory(obj, keyframe_interval=keyframe_interval)
@@ -0,0 +1,170 @@
+"""
+Deferred imports for DeepDiff MCP.
+
+Desktop MCP clients start a server per session over stdio, so everything
+imported before the handshake delays every session. DeepDiff (which loads
+numpy and pandas when they are installed), pandas and openpyxl are only
+needed once a tool runs: the server refers to the modules using them through
+LazyModule, and once a client is connected the worker pool imports them in
+the background (see ToolExecutor.warm_up), so the first call does not pay for
+them either.
+"""
+import importlib
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+
+# Modules the tools need, heaviest first
+WARM_UP_MODULES = (
+    "deepdiff_mcp.operations",
+    "deepdiff_mcp.sharding",
+    "deepdiff_mcp.file_utils",
+    "deepdiff_mcp.tabular",
+    "deepdiff_mcp.similarity",
+    "deepdiff_mcp.search_index",
+    "deepdiff_mcp.history",
+    "deepdiff_mcp.merkle",
+    "pandas",
+    "openpyxl",
+)
+
+_IMPORT_TIME = re.compile(r"^import time:\s*(\d+)\s*\|\s*(\d+)\s*\| ( *)(\S+)")
+
+
+class LazyModule:
+    """
+    A module imported on first attribute access.
+
+    Unlike importlib.util.LazyLoader, the import goes through importlib's
+    per-module locks, so threads touching the module at the same time (the
+    event loop and a warm-up, for instance) are safe.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+
+    def __getattr__(self, attribute: str) -> Any:
+        return getattr(importlib.import_module(self._name), attribute)
+
+    def __repr__(self) -> str:
+        return f"<lazy module {self._name!r}>"
+
+
+def warm_up(modules: Tuple[str, ...] = WARM_UP_MODULES) -> Dict[str, float]:
+    """
+    Import the modules the tools need.
+
+    It is a module-level function so that process pools can run it.
+
+    Args:
+        modules: Names of the modules to import
+
+    Returns:
+        Seconds spent importing each module; modules imported earlier (as
+        dependencies of previous ones) take no time, and modules that are
+        not installed are left out
+    """
+    durations = {}
+    for name in modules:
+        start = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            continue
+        durations[name] = time.perf_counter() - start
+    return durations
+
+
+class WarmUpMiddleware(Middleware):
+    """FastMCP middleware warming up the worker pool after the first handshake."""
+
+    def __init__(self, executor: Any):
+        self.executor = executor
+        self.started = False
+
+    async def _after_handshake(self, context: MiddlewareContext, call_next: Any) -> Any:
+        result = await call_next(context)
+        if not self.started:
+            self.started = True
+            self.executor.warm_up()
+        return result
+
+    # Clients negotiate with either request depending on the protocol version
+    on_initialize = _after_handshake
+    on_discover = _after_handshake
+
+
+def import_times(
+    module: str = "deepdiff_mcp.cli", top: int = 15
+) -> Tuple[float, List[Tuple[str, float]]]:
+    """
+    Measure the time importing a module spends in each top-level package.
+
+    The module is imported in a fresh interpreter run with ``-X importtime``.
+
+    Args:
+        module: Module to import
+        top: Number of packages to report
+
+    Returns:
+        The total seconds, and (package, seconds) pairs for the slowest
+        packages, counting each module's own time in its package
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    packages: Dict[str, float] = {}
+    total = 0.0
+    for line in completed.stderr.splitlines():
+        match = _IMPORT_TIME.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0.0) + int(self_us) / 1e6
+        if not indent:
+            total += int(cumulative_us) / 1e6
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)
+    return total, ranked[:top]
+
+
+async def time_handshake(
+    server_args: Optional[List[str]] = None,
+) -> Tuple[float, float]:
+    """
+    Time a stdio session against a new server process.
+
+    Args:
+        server_args: Command line arguments for the server
+
+    Returns:
+        Seconds from starting the process to a completed handshake, and
+        seconds of a first compare call made right after it
+    """
+    from fastmcp import Client
+    from fastmcp.client.transports import StdioTransport
+
+    async def ignore_log(message: Any) -> None:
+        pass
+
+    with open(os.devnull, "w") as log_file:
+        transport = StdioTransport(
+            command=sys.executable,
+            args=["-m", "deepdiff_mcp", *(server_args or []), "--transport", "stdio"],
+            keep_alive=False,
+            log_file=log_file,
+        )
+        start = time.perf_counter()
+        async with Client(transport, log_handler=ignore_log) as client:
+            connected = time.perf_counter()
+            await client.call_tool("compare", {"t1": {"a": 1}, "t2": {"a": 2}})
+            called = time.perf_counter()
+    return connected - start, called - connected
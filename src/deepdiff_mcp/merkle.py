@@ -0,0 +1,355 @@
+"""
+Incremental Merkle hash trees for DeepDiff MCP.
+
+DeepHash rebuilds the hash of every sub-object on each call. For objects
+that are hashed over and over with only small changes (configuration
+snapshots, for example) a Merkle tree keeps the hash of every subtree by
+path: the next snapshot only rehashes the subtrees that differ from the
+previous one, and the paths that changed are found by descending only into
+subtrees whose hashes differ.
+"""
+import hashlib
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# (hash, children): children maps keys (dicts) or positions (lists and
+# tuples) to child nodes, and is None for leaves
+Node = Tuple[str, Any]
+
+_DIGEST_SIZE = 16
+
+
+def _leaf_hash(value: Any) -> str:
+    data = f"{type(value).__name__}:{value!r}".encode("utf-8", "surrogatepass")
+    return hashlib.blake2b(data, digest_size=_DIGEST_SIZE).hexdigest()
+
+
+def _container_hash(kind: str, items: List[Tuple[str, str]]) -> str:
+    digest = hashlib.blake2b(kind.encode(), digest_size=_DIGEST_SIZE)
+    for key, child_hash in items:
+        digest.update(key.encode("utf-8", "surrogatepass"))
+        digest.update(child_hash.encode())
+    return digest.hexdigest()
+
+
+class MerkleTree:
+    """Hashes of an object and of all its subtrees, keyed by path."""
+
+    def __init__(self, obj: Any, root: Node, options: Dict[str, Any]):
+        """
+        Initialize the tree. Use MerkleTree.build() to hash an object.
+
+        Args:
+            obj: The hashed object
+            root: Root node
+            options: Exclusion options the tree was built with
+        """
+        self.obj = obj
+        self.root = root
+        self.options = options
+
+    @property
+    def hash(self) -> str:
+        """Hash of the whole object."""
+        return self.root[0]
+
+    @classmethod
+    def build(
+        cls,
+        obj: Any,
+        previous: Optional["MerkleTree"] = None,
+        exclude_types: Optional[List[str]] = None,
+        exclude_paths: Optional[List[str]] = None,
+        exclude_regex_paths: Optional[List[str]] = None,
+    ) -> Tuple["MerkleTree", int]:
+        """
+        Hash an object, reusing the subtrees of a previous tree.
+
+        A subtree of the previous tree is reused when the value at the same
+        path is strictly equal to the previous one, types included.
+
+        Args:
+            obj: Object to hash
+            previous: Tree of an earlier version of the object; ignored if it
+                was built with other exclusion options
+            exclude_types: Types to leave out of the hashes
+            exclude_paths: Paths to leave out of the hashes
+            exclude_regex_paths: Regex paths to leave out of the hashes
+
+        Returns:
+            (tree, number of nodes that were hashed)
+        """
+        options = {
+            "exclude_types": sorted(exclude_types or []),
+            "exclude_paths": sorted(exclude_paths or []),
+            "exclude_regex_paths": sorted(exclude_regex_paths or []),
+        }
+        if previous is not None and previous.options != options:
+            previous = None
+
+        from .operations import _strictly_equal, resolve_exclude_types
+
+        builder = _Builder(
+            strictly_equal=_strictly_equal,
+            exclude_types=tuple(resolve_exclude_types(exclude_types) or ()),
+            exclude_paths=set(exclude_paths or ()),
+            exclude_regex_paths=[re.compile(p) for p in exclude_regex_paths or ()],
+        )
+        root = builder.node(
+            obj, "root", (previous.obj, previous.root) if previous is not None else None
+        )
+        return cls(obj, root, options), builder.hashed
+
+    def hashes(self) -> Dict[str, str]:
+        """Get the hash of every subtree, keyed by path."""
+        result = {}
+        stack = [("root", self.root)]
+        while stack:
+            path, (node_hash, children) = stack.pop()
+            result[path] = node_hash
+            if children is not None:
+                stack.extend(
+                    (f"{path}[{key!r}]", child) for key, child in children.items()
+                )
+        return result
+
+    def changed_paths(self, other: "MerkleTree") -> List[str]:
+        """
+        Find the paths whose values differ between two trees.
+
+        Only subtrees whose hashes differ are visited, so the cost grows with
+        the number of changes rather than with the size of the object.
+
+        Args:
+            other: Tree of another version of the object
+
+        Returns:
+            Sorted paths of the changed leaves and of the added or removed
+            subtrees
+        """
+        changed = []
+        stack = [("root", self.root, other.root)]
+        while stack:
+            path, (hash1, children1), (hash2, children2) = stack.pop()
+            if hash1 == hash2:
+                continue
+            if (
+                children1 is None
+                or children2 is None
+                or type(children1) is not type(children2)
+            ):
+                changed.append(path)
+                continue
+            items1 = dict(children1.items())
+            items2 = dict(children2.items())
+            differing = False
+            for key in items1.keys() | items2.keys():
+                child_path = f"{path}[{key!r}]"
+                if key not in items1 or key not in items2:
+                    changed.append(child_path)
+                    differing = True
+                elif items1[key][0] != items2[key][0]:
+                    stack.append((child_path, items1[key], items2[key]))
+                    differing = True
+            if not differing:
+                # Same children, so the container type itself changed
+                changed.append(path)
+        return sorted(changed)
+
+
+class _Builder:
+    """Recursive hashing with exclusions, counting the hashed nodes."""
+
+    def __init__(
+        self,
+        strictly_equal: Callable[[Any, Any], bool],
+        exclude_types: tuple,
+        exclude_paths: set,
+        exclude_regex_paths: list,
+    ):
+        self.strictly_equal = strictly_equal
+        self.exclude_types = exclude_types
+        self.exclude_paths = exclude_paths
+        self.exclude_regex_paths = exclude_regex_paths
+        self.hashed = 0
+
+    def excluded(self, path: str, value: Any) -> bool:
+        return (
+            path in self.exclude_paths
+            or any(pattern.search(path) for pattern in self.exclude_regex_paths)
+            or (bool(self.exclude_types) and isinstance(value, self.exclude_types))
+        )
+
+    def node(self, obj: Any, path: str, previous: Optional[Tuple[Any, Node]]) -> Node:
+        if previous is not None:
+            previous_obj, previous_node = previous
+            # Plain equality would reuse {'y': 1} for {'y': True}
+            if self.strictly_equal(previous_obj, obj):
+                return previous_node
+
+        self.hashed += 1
+        if isinstance(obj, dict):
+            previous_children = _previous_children(previous, dict)
+            children = {}
+            for key, value in obj.items():
+                child_path = f"{path}[{key!r}]"
+                if self.excluded(child_path, value):
+                    continue
+                child_previous = None
+                if previous_children is not None and key in previous_children:
+                    child_previous = (previous[0][key], previous_children[key])
+                children[key] = self.node(value, child_path, child_previous)
+            items = sorted((repr(key), child[0]) for key, child in children.items())
+            return _container_hash("dict", items), children
+
+        if isinstance(obj, (list, tuple)):
+            previous_children = _previous_children(previous, list)
+            children = []
+            positions = []
+            for position, value in enumerate(obj):
+                child_path = f"{path}[{position}]"
+                if self.excluded(child_path, value):
+                    continue
+                child_previous = None
+                if previous_children is not None:
+                    index = _position_index(previous_children, position)
+                    if index is not None:
+                        child_previous = (
+                            previous[0][position],
+                            previous_children[index],
+                        )
+                children.append(self.node(value, child_path, child_previous))
+                positions.append(position)
+            items = [
+                (str(position), child[0])
+                for position, child in zip(positions, children)
+            ]
+            # Keep positions with the children so excluded items do not shift paths
+            return (
+                _container_hash(type(obj).__name__, items),
+                _Positions(positions, children),
+            )
+
+        if isinstance(obj, (set, frozenset)):
+            items = sorted(("", _leaf_hash(value)) for value in obj)
+            return _container_hash(type(obj).__name__, items), None
+
+        return _leaf_hash(obj), None
+
+
+class _Positions(list):
+    """List children with the original positions of the non-excluded items."""
+
+    def __init__(self, positions: List[int], children: List[Node]):
+        super().__init__(children)
+        self.positions = positions
+
+    def items(self) -> Any:
+        return zip(self.positions, self)
+
+    def __reduce__(self) -> Any:
+        return _Positions, (self.positions, list(self))
+
+
+def _previous_children(previous: Optional[Tuple[Any, Node]], kind: type) -> Any:
+    if previous is None:
+        return None
+    children = previous[1][1]
+    if kind is dict:
+        return children if isinstance(children, dict) else None
+    return children if isinstance(children, _Positions) else None
+
+
+def _position_index(children: "_Positions", position: int) -> Optional[int]:
+    # Without exclusions positions and indices coincide
+    if position < len(children) and children.positions[position] == position:
+        return position
+    try:
+        return children.positions.index(position)
+    except ValueError:
+        return None
+
+
+def hash_tree(
+    obj: Any,
+    previous: Optional[MerkleTree] = None,
+    return_hashes: bool = False,
+    **options: Any,
+) -> Dict[str, Any]:
+    """
+    Build the Merkle tree of an object, incrementally from a previous tree.
+
+    Args:
+        obj: Object to hash
+        previous: Tree of an earlier version of the object
+        return_hashes: Whether to include the hash of every path
+        **options: exclude_types, exclude_paths and exclude_regex_paths
+
+    Returns:
+        Dictionary with the "tree", its root "hash", the number of
+        "rehashed_nodes", the "changed_paths" since the previous tree when
+        one is given, and the "hashes" by path when requested
+    """
+    tree, rehashed = MerkleTree.build(obj, previous, **options)
+    result = {"tree": tree, "hash": tree.hash, "rehashed_nodes": rehashed}
+    if previous is not None:
+        result["changed_paths"] = previous.changed_paths(tree)
+    if return_hashes:
+        result["hashes"] = tree.hashes()
+    return result
+
+
+def hash_items(
+    items: Iterable[Tuple[Any, Any]],
+    exclude_types: Optional[List[str]] = None,
+    exclude_paths: Optional[List[str]] = None,
+    exclude_regex_paths: Optional[List[str]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Hash an object from its top-level items, one item at a time.
+
+    The hash is the one MerkleTree.build gives for the whole object, but only
+    the subtree of the current item is held in memory, so a document can be
+    hashed while it is being streamed.
+
+    Args:
+        items: (key, value) pairs of a dictionary, (index, value) pairs of a
+            list, or a single (None, value) for a scalar, as yielded by
+            file_utils.iter_file_items
+        exclude_types: Types to leave out of the hash
+        exclude_paths: Paths to leave out of the hash
+        exclude_regex_paths: Regex paths to leave out of the hash
+
+    Returns:
+        Dictionary with the "hash" and the number of top-level "items", or
+        None if there were no items (an empty dictionary and an empty list
+        hash differently, and the items do not tell them apart)
+    """
+    from .operations import _strictly_equal, resolve_exclude_types
+
+    builder = _Builder(
+        strictly_equal=_strictly_equal,
+        exclude_types=tuple(resolve_exclude_types(exclude_types) or ()),
+        exclude_paths=set(exclude_paths or ()),
+        exclude_regex_paths=[re.compile(p) for p in exclude_regex_paths or ()],
+    )
+    kind = None
+    hashed = []
+    count = 0
+    for key, value in items:
+        if key is None:
+            return {"hash": builder.node(value, "root", None)[0], "items": 1}
+        count += 1
+        kind = "dict" if isinstance(key, str) else "list"
+        path = f"root[{key!r}]"
+        if builder.excluded(path, value):
+            continue
+        # Only the hash is kept; the item's subtree is dropped right away
+        node_hash = builder.node(value, path, None)[0]
+        hashed.append((repr(key) if kind == "dict" else str(key), node_hash))
+
+    if kind is None:
+        return None
+    if kind == "dict":
+        hashed.sort()
+    return {"hash": _container_hash(kind, hashed), "items": count}
@@ -0,0 +1,485 @@
+"""
+Metrics and profiling for DeepDiff MCP tool calls.
+
+Every tool call is counted and timed, split into phases:
+
+- deserialize: validating the arguments, until the tool body starts
+- cache: hashing the arguments into a result cache key
+- queue: waiting for a free executor slot
+- load: reading and parsing files, in the worker
+- execute: the DeepDiff, DeepSearch or DeepHash work itself, in the worker
+- handler: the rest of the tool body, on the event loop (resolving object
+  references, formatting results, logging to the client)
+- serialize: converting the result for the client, once the body returned
+
+Calls running several batches at the same time (compare_many, find_nearest)
+add up the queue, load and execute time of their batches. Request and
+response sizes, result cache hits and the executor's queue depth are tracked
+too, and everything is exported in the Prometheus text format or as a
+dictionary (the server_stats tool).
+
+When enabled, tool bodies are also profiled with cProfile and the profiles of
+the slowest calls are kept.
+"""
+import bisect
+import contextvars
+import cProfile
+import functools
+import heapq
+import io
+import itertools
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+
+from .formats import dumps_json
+
+PHASES = ("deserialize", "cache", "queue", "load", "execute", "handler", "serialize")
+
+# Phases measured inside the tool body; the handler phase is what remains
+_BODY_PHASES = ("cache", "queue", "load", "execute")
+
+SECONDS_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300
+)
+BYTES_BUCKETS = tuple(4 ** power for power in range(4, 16))  # 256 B to 1 GB
+
+# Lines of the cumulative-time table kept for each profile
+PROFILE_LINES = 30
+
+
+class Histogram:
+    """Distribution of observed values in cumulative buckets, as in Prometheus."""
+
+    def __init__(self, buckets: Tuple[float, ...] = SECONDS_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        """Add a value."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, fraction: float) -> float:
+        """
+        Estimate a quantile as the upper bound of the bucket holding it.
+
+        Values beyond the last bucket are estimated by the largest one seen.
+        """
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank and seen:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, float]:
+        """Summarize the distribution."""
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "max": self.max,
+        }
+
+
+class CallRecord:
+    """Phases of one running tool call, filled in as the call goes."""
+
+    def __init__(self, tool: str):
+        self.tool = tool
+        self.started = time.perf_counter()
+        self.body_started: Optional[float] = None
+        self.body_ended: Optional[float] = None
+        self.phases: Dict[str, float] = {}
+        self.profile: Optional[str] = None
+
+    def add(self, phase: str, seconds: float) -> None:
+        """Add time spent in a phase."""
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def add_worker_phases(self, seconds: float, phases: Dict[str, float]) -> None:
+        """
+        Add the time a worker ran for, split into the phases it reported.
+
+        Args:
+            seconds: Time from submitting the work to getting its result
+            phases: Phases measured by the worker (see worker_phase); the rest
+                of the time counts as execute
+        """
+        for phase, spent in phases.items():
+            self.add(phase, spent)
+        self.add("execute", max(0.0, seconds - sum(phases.values())))
+
+    def finish(self) -> Tuple[float, Dict[str, float]]:
+        """
+        Close the call.
+
+        Returns:
+            The call's total time and its time per phase
+        """
+        ended = time.perf_counter()
+        phases = dict(self.phases)
+        if self.body_started is not None and self.body_ended is not None:
+            body = self.body_ended - self.body_started
+            measured = sum(phases.get(phase, 0.0) for phase in _BODY_PHASES)
+            phases["deserialize"] = self.body_started - self.started
+            phases["handler"] = max(0.0, body - measured)
+            phases["serialize"] = ended - self.body_ended
+        return ended - self.started, phases
+
+
+_current_call: contextvars.ContextVar[Optional[CallRecord]] = contextvars.ContextVar(
+    "deepdiff_mcp_call", default=None
+)
+
+
+def current_call() -> Optional[CallRecord]:
+    """Get the record of the tool call running in this task, if any."""
+    return _current_call.get()
+
+
+def timed_body(method: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Wrap a tool method so that its call record knows when the body ran.
+
+    The wrapper keeps the method's signature and docstring, which FastMCP
+    builds the tool's schema from.
+    """
+
+    @functools.wraps(method)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        call = current_call()
+        if call is not None:
+            call.body_started = time.perf_counter()
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            if call is not None:
+                call.body_ended = time.perf_counter()
+
+    return wrapper
+
+
+_worker = threading.local()
+
+
+@contextmanager
+def worker_phase(phase: str) -> Iterator[None]:
+    """
+    Time a phase of a tool body running in a worker (see run_timed).
+
+    Nested phases count towards the outermost one only.
+    """
+    phases = getattr(_worker, "phases", None)
+    if phases is None or getattr(_worker, "in_phase", False):
+        yield
+        return
+    _worker.in_phase = True
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases[phase] = phases.get(phase, 0.0) + time.perf_counter() - start
+        _worker.in_phase = False
+
+
+def _format_profile(profiler: cProfile.Profile) -> str:
+    """Render the functions taking the most cumulative time."""
+    output = io.StringIO()
+    stats = pstats.Stats(profiler, stream=output)
+    stats.strip_dirs().sort_stats("cumulative").print_stats(PROFILE_LINES)
+    return output.getvalue()
+
+
+def run_timed(
+    profile: bool,
+    func: Callable[..., Any],
+    *args: Any,
+    **kwargs: Any,
+) -> Tuple[Any, Dict[str, float], Optional[str]]:
+    """
+    Run a tool body in a worker, timing its phases and optionally profiling it.
+
+    It is a module-level function so that process pools can run it.
+
+    Args:
+        profile: Whether to profile the call with cProfile
+        func: Function to run
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        The function's return value, the phases it reported with
+        worker_phase, and its profile (None when not profiled)
+    """
+    previous = getattr(_worker, "phases", None)
+    phases: Dict[str, float] = {}
+    _worker.phases = phases
+    profiler = cProfile.Profile() if profile else None
+    try:
+        if profiler is not None:
+            try:
+                profiler.enable()
+            except ValueError:
+                # Python 3.12+ allows one active profiler per interpreter
+                profiler = None
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+    finally:
+        _worker.phases = previous
+    return result, phases, _format_profile(profiler) if profiler is not None else None
+
+
+def _labels(**labels: str) -> str:
+    def escape(value: str) -> str:
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return ",".join(f'{name}="{escape(str(value))}"' for name, value in labels.items())
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# Gauges: metric name -> (help text, [(labels, value)])
+Gauges = Dict[str, Tuple[str, List[Tuple[Dict[str, str], float]]]]
+
+
+class ServerMetrics:
+    """Counters, histograms and slowest-call profiles of a server."""
+
+    def __init__(self, profile_slowest: int = 0):
+        """
+        Initialize the metrics.
+
+        Args:
+            profile_slowest: Number of slowest calls whose profile is kept;
+                0 disables profiling
+
+        Raises:
+            ValueError: If profile_slowest is negative
+        """
+        if profile_slowest < 0:
+            raise ValueError("profile_slowest must not be negative")
+        self.profile_slowest = profile_slowest
+        self._lock = threading.Lock()
+        self.calls: Dict[Tuple[str, str], int] = {}
+        self.durations: Dict[str, Histogram] = {}
+        self.phases: Dict[Tuple[str, str], Histogram] = {}
+        self.payloads: Dict[Tuple[str, str], Histogram] = {}
+        self.cache: Dict[Tuple[str, str], int] = {}
+        self._slowest: List[Tuple[float, int, Dict[str, Any]]] = []
+        self._sequence = itertools.count()
+
+    @property
+    def profiling(self) -> bool:
+        """Whether tool bodies should be profiled."""
+        return self.profile_slowest > 0
+
+    def record_call(
+        self,
+        tool: str,
+        status: str,
+        seconds: float,
+        phases: Dict[str, float],
+        request_bytes: Optional[int] = None,
+        response_bytes: Optional[int] = None,
+        profile: Optional[str] = None,
+    ) -> None:
+        """
+        Record a finished tool call.
+
+        Args:
+            tool: Name of the tool
+            status: "ok" or "error"
+            seconds: Total time of the call
+            phases: Time per phase (see PHASES)
+            request_bytes: Size of the JSON arguments
+            response_bytes: Size of the result sent to the client
+            profile: Profile of the tool body, kept if the call is among the
+                slowest ones
+        """
+        with self._lock:
+            self.calls[(tool, status)] = self.calls.get((tool, status), 0) + 1
+            self.durations.setdefault(tool, Histogram()).observe(seconds)
+            for phase, spent in phases.items():
+                self.phases.setdefault((tool, phase), Histogram()).observe(spent)
+            sizes = (("request", request_bytes), ("response", response_bytes))
+            for direction, size in sizes:
+                if size is not None:
+                    histogram = self.payloads.setdefault(
+                        (tool, direction), Histogram(BYTES_BUCKETS)
+                    )
+                    histogram.observe(size)
+            if profile is not None and self.profile_slowest:
+                entry = {
+                    "tool": tool,
+                    "seconds": seconds,
+                    "phases": phases,
+                    "time": time.time(),
+                    "profile": profile,
+                }
+                item = (seconds, next(self._sequence), entry)
+                if len(self._slowest) < self.profile_slowest:
+                    heapq.heappush(self._slowest, item)
+                else:
+                    heapq.heappushpop(self._slowest, item)
+
+    def record_cache(self, tool: str, hit: bool) -> None:
+        """Count a result cache lookup."""
+        key = (tool, "hit" if hit else "miss")
+        with self._lock:
+            self.cache[key] = self.cache.get(key, 0) + 1
+
+    def slowest(self) -> List[Dict[str, Any]]:
+        """Get the profiled slowest calls, slowest first."""
+        with self._lock:
+            return [entry for _, _, entry in sorted(self._slowest, reverse=True)]
+
+    def snapshot(self, include_profiles: bool = False) -> Dict[str, Any]:
+        """
+        Get the metrics as a dictionary.
+
+        Args:
+            include_profiles: Whether to include the slowest calls' profiles
+
+        Returns:
+            Dictionary with the metrics of each tool under "tools" and, when
+            asked for, the "slowest" profiled calls
+        """
+        tools: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for (tool, status), count in self.calls.items():
+                tools.setdefault(tool, {}).setdefault("calls", {})[status] = count
+            for tool, histogram in self.durations.items():
+                tools.setdefault(tool, {})["seconds"] = histogram.to_dict()
+            for (tool, phase), histogram in self.phases.items():
+                phases = tools.setdefault(tool, {}).setdefault("phases", {})
+                phases[phase] = histogram.to_dict()
+            for (tool, direction), histogram in self.payloads.items():
+                payloads = tools.setdefault(tool, {}).setdefault("payload_bytes", {})
+                payloads[direction] = histogram.to_dict()
+            for (tool, result), count in self.cache.items():
+                tools.setdefault(tool, {}).setdefault("cache", {})[result] = count
+        snapshot: Dict[str, Any] = {"tools": tools}
+        if include_profiles:
+            snapshot["slowest"] = self.slowest()
+        return snapshot
+
+    def to_prometheus(self, gauges: Optional[Gauges] = None) -> str:
+        """
+        Export the metrics in the Prometheus text format.
+
+        Args:
+            gauges: Current values of gauges owned by other components, such
+                as the executor's queue depth
+
+        Returns:
+            The exposition text
+        """
+        lines: List[str] = []
+
+        def header(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def histogram(name: str, labels: Dict[str, str], values: Histogram) -> None:
+            cumulative = 0
+            for bound, count in zip(values.buckets + (float("inf"),), values.counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                bucket_labels = _labels(**labels, le=le)
+                lines.append(f"{name}_bucket{{{bucket_labels}}} {cumulative}")
+            lines.append(f"{name}_sum{{{_labels(**labels)}}} {_number(values.sum)}")
+            lines.append(f"{name}_count{{{_labels(**labels)}}} {values.count}")
+
+        with self._lock:
+            name = "deepdiff_mcp_tool_calls_total"
+            header(name, "counter", "Tool calls by outcome.")
+            for (tool, status), count in sorted(self.calls.items()):
+                lines.append(f"{name}{{{_labels(tool=tool, status=status)}}} {count}")
+
+            name = "deepdiff_mcp_tool_duration_seconds"
+            header(name, "histogram", "Total time of tool calls.")
+            for tool, values in sorted(self.durations.items()):
+                histogram(name, {"tool": tool}, values)
+
+            name = "deepdiff_mcp_tool_phase_seconds"
+            header(name, "histogram", "Time of tool calls spent in each phase.")
+            for (tool, phase), values in sorted(self.phases.items()):
+                histogram(name, {"tool": tool, "phase": phase}, values)
+
+            name = "deepdiff_mcp_tool_payload_bytes"
+            header(name, "histogram", "Size of tool arguments and results.")
+            for (tool, direction), values in sorted(self.payloads.items()):
+                histogram(name, {"tool": tool, "direction": direction}, values)
+
+            name = "deepdiff_mcp_cache_lookups_total"
+            header(name, "counter", "Result cache lookups by outcome.")
+            for (tool, result), count in sorted(self.cache.items()):
+                lines.append(f"{name}{{{_labels(tool=tool, result=result)}}} {count}")
+
+        for name, (help_text, samples) in sorted((gauges or {}).items()):
+            header(name, "gauge", help_text)
+            for labels, value in samples:
+                label_text = f"{{{_labels(**labels)}}}" if labels else ""
+                lines.append(f"{name}{label_text} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _result_bytes(result: Any) -> Optional[int]:
+    """Size of the text content of a tool result."""
+    content = getattr(result, "content", None)
+    if content is None:
+        return None
+    return sum(len(block.text.encode()) for block in content if hasattr(block, "text"))
+
+
+class MetricsMiddleware(Middleware):
+    """FastMCP middleware recording every tool call in a ServerMetrics."""
+
+    def __init__(self, metrics: ServerMetrics):
+        self.metrics = metrics
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next: Any) -> Any:
+        tool = context.message.name
+        try:
+            request_bytes = len(dumps_json(context.message.arguments or {}).encode())
+        except Exception:
+            request_bytes = None
+        call = CallRecord(tool)
+        token = _current_call.set(call)
+        status = "error"
+        result = None
+        try:
+            result = await call_next(context)
+            status = "error" if getattr(result, "is_error", False) else "ok"
+            return result
+        finally:
+            _current_call.reset(token)
+            seconds, phases = call.finish()
+            self.metrics.record_call(
+                tool,
+                status,
+                seconds,
+                phases,
+                request_bytes=request_bytes,
+                response_bytes=_result_bytes(result),
+                profile=call.profile,
+            )
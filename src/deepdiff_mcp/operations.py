@@ -0,0 +1,1027 @@
+"""
+DeepDiff operations used by the DeepDiff MCP tools.
+
+The functions in this module hold the actual tool bodies. They are plain
+module-level functions that take and return picklable values so that they
+can be dispatched to either a thread or a process pool by the executor.
+"""
+import pickle
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from deepdiff import DeepDiff, DeepSearch, extract
+from deepdiff import grep as deep_grep
+from deepdiff.deephash import DeepHash
+from deepdiff.delta import Delta
+from deepdiff.helper import SetOrdered
+
+from .budget import BudgetExceededError, budget_operators
+from .formats import check_output_format, dumps_json, format_diff, json_patch
+
+TYPE_MAP = {
+    "str": str,
+    "int": int,
+    "float": float,
+    "bool": bool,
+    "list": list,
+    "dict": dict,
+    "tuple": tuple,
+    "set": set,
+    "frozenset": frozenset,
+    "bytes": bytes,
+    "bytearray": bytearray,
+    "complex": complex,
+    "NoneType": type(None),
+}
+
+
+def resolve_exclude_types(exclude_types: Optional[List[str]]) -> Optional[List[Any]]:
+    """
+    Convert type names to actual types.
+
+    Args:
+        exclude_types: Type names such as "str" or "NoneType"
+
+    Returns:
+        List of types, or None if no types were given
+    """
+    if not exclude_types:
+        return None
+    return [TYPE_MAP.get(t, t) for t in exclude_types]
+
+
+class _LimitedDiff(DeepDiff):
+    """
+    DeepDiff that stops once it found enough differences or ran out of time.
+
+    DeepDiff's own max_diffs counts the nodes it visits, not the differences
+    it reports. This subclass makes DeepDiff's traversal cutoff (_count_diff)
+    stop the walk once stop_after differences were reported or the deadline
+    has passed, then keeps at most report_limit of them. ``truncated`` tells
+    whether differences may be missing from the result.
+    """
+
+    # Counting the reported differences walks the whole result tree, so the
+    # limits are only checked every this many visited nodes
+    _CHECK_INTERVAL = 16
+
+    def __init__(
+        self,
+        t1: Any,
+        t2: Any,
+        report_limit: Optional[int] = None,
+        stop_after: Optional[int] = None,
+        deadline: Optional[float] = None,
+        **options: Any,
+    ):
+        # DeepDiff runs the comparison in __init__. Stopping after one more
+        # difference than the limit tells whether any were left out.
+        if stop_after is None and report_limit is not None:
+            stop_after = report_limit + 1
+        self._stop_after = stop_after
+        self._deadline = deadline
+        self._countdown = 0
+        self.truncated = False
+        super().__init__(t1, t2, **options)
+        if report_limit is not None and self._reported() > report_limit:
+            self.truncated = True
+            self._trim(report_limit)
+
+    def _reported(self) -> int:
+        return sum(
+            len(levels)
+            for levels in self.tree.values()
+            if isinstance(levels, SetOrdered)
+        )
+
+    def _trim(self, limit: int) -> None:
+        for report in list(self.tree):
+            levels = self.tree[report]
+            if not isinstance(levels, SetOrdered):
+                continue
+            if len(levels) > limit:
+                self.tree[report] = SetOrdered(list(levels)[:limit])
+            limit -= len(self.tree[report])
+        self.tree.remove_empty_keys()
+        self.clear()
+        self.update(self._get_view_results(self.view))
+
+    def _count_diff(self):
+        if self.truncated:
+            return StopIteration
+        if self._countdown:
+            self._countdown -= 1
+        else:
+            self._countdown = self._CHECK_INTERVAL
+            if (self._deadline is not None and time.monotonic() > self._deadline) or (
+                self._stop_after is not None and self._reported() >= self._stop_after
+            ):
+                self.truncated = True
+                return StopIteration
+        return super()._count_diff()
+
+
+def _add_budget_operators(options: Dict[str, Any]) -> None:
+    """Have DeepDiff check the running call's budget at every node it visits."""
+    operators = budget_operators()
+    if operators:
+        existing = list(options.get("custom_operators") or [])
+        options["custom_operators"] = existing + operators
+
+
+def build_diff(
+    t1: Any,
+    t2: Any,
+    exclude_types: Optional[List[str]] = None,
+    max_diffs: Optional[int] = None,
+    max_time_ms: Optional[float] = None,
+    **options: Any,
+) -> DeepDiff:
+    """
+    Build a DeepDiff object from tool options.
+
+    Args:
+        t1: First object to compare
+        t2: Second object to compare
+        exclude_types: Type names to exclude from comparison
+        max_diffs: Stop the comparison once this many differences were found
+        max_time_ms: Stop the comparison after this many milliseconds
+        **options: Any other DeepDiff keyword argument
+
+    Returns:
+        DeepDiff instance. With a limit, its ``truncated`` attribute tells
+        whether the comparison stopped before the end.
+
+    Raises:
+        ValueError: If a limit is negative
+    """
+    exclude_types = resolve_exclude_types(exclude_types)
+    _add_budget_operators(options)
+    if max_diffs is None and max_time_ms is None:
+        return DeepDiff(t1=t1, t2=t2, exclude_types=exclude_types, **options)
+
+    if any(limit is not None and limit < 0 for limit in (max_diffs, max_time_ms)):
+        raise ValueError("max_diffs and max_time_ms must not be negative")
+    deadline = None
+    if max_time_ms is not None:
+        deadline = time.monotonic() + max_time_ms / 1000
+    return _LimitedDiff(
+        t1,
+        t2,
+        report_limit=max_diffs,
+        deadline=deadline,
+        exclude_types=exclude_types,
+        **options,
+    )
+
+
+def build_hash_options(
+    ignore_order: bool = False,
+    report_repetition: bool = False,
+    exclude_types: Optional[List[str]] = None,
+    **options: Any,
+) -> Dict[str, Any]:
+    """
+    Translate DeepDiff options into the matching DeepHash options.
+
+    Two objects with the same DeepHash under these options are reported as
+    equal by DeepDiff with the original options, which lets callers skip
+    comparisons of identical objects.
+
+    Args:
+        ignore_order: Whether iterable order is ignored
+        report_repetition: Whether repetitions are reported with ignore_order
+        exclude_types: Type names to exclude
+        **options: Other DeepDiff options; the ones DeepHash supports are kept
+
+    Returns:
+        Keyword arguments for DeepHash
+    """
+    hash_options = {
+        name: options[name]
+        for name in (
+            "exclude_paths",
+            "exclude_regex_paths",
+            "ignore_string_type_changes",
+            "ignore_numeric_type_changes",
+            "ignore_string_case",
+            "significant_digits",
+        )
+        if options.get(name) is not None
+    }
+    hash_options.update(
+        custom_operators=budget_operators() or None,
+        exclude_types=resolve_exclude_types(exclude_types),
+        ignore_iterable_order=ignore_order,
+        ignore_repetition=ignore_order and not report_repetition,
+    )
+    return hash_options
+
+
+def rebase_diff(diff: Dict, prefix: str, into: Optional[Dict] = None) -> Dict:
+    """
+    Rewrite the paths of a diff computed on a sub-object.
+
+    A diff of ``t1['a']`` and ``t2['a']`` reports paths such as ``root['b']``.
+    Rebasing it on ``root['a']`` turns them into ``root['a']['b']``, so partial
+    diffs can be merged into one result keyed by the original root paths.
+
+    Args:
+        diff: Diff dictionary as returned by DeepDiff.to_dict()
+        prefix: Path of the sub-object, e.g. "root['a']"
+        into: Optional diff dictionary to merge the rebased reports into
+
+    Returns:
+        The rebased diff dictionary (``into`` if it was given)
+    """
+    result = {} if into is None else into
+    for report, items in diff.items():
+        if isinstance(items, dict):
+            target = result.setdefault(report, {})
+            for path, value in items.items():
+                target[prefix + path[4:]] = value
+        elif isinstance(items, (str, int, float)) or items is None:
+            result[report] = items
+        else:
+            target = result.setdefault(report, [])
+            target.extend(prefix + path[4:] for path in items)
+    return result
+
+
+def _strictly_equal(value1: Any, value2: Any) -> bool:
+    """
+    Tell whether two values are equal whatever the DeepDiff options.
+
+    Python equality alone is not enough: 1, 1.0 and True compare equal but
+    DeepDiff reports type changes between them, so equal values must also
+    pickle to the same bytes.
+    """
+    if value1 is value2:
+        return True
+    try:
+        if type(value1) is not type(value2) or not value1 == value2:
+            return False
+        return pickle.dumps(value1, protocol=pickle.HIGHEST_PROTOCOL) == pickle.dumps(
+            value2, protocol=pickle.HIGHEST_PROTOCOL
+        )
+    except Exception:
+        return False
+
+
+def prune_identical(t1: Any, t2: Any) -> Any:
+    """
+    Make t2 share the subtrees it has in common with t1.
+
+    Values of common dictionary keys and list positions that are strictly
+    equal on both sides are replaced in (a shallow copy of) t2 by the very
+    same objects from t1. DeepDiff skips identical objects without walking
+    them, so it reports exactly the same differences while only descending
+    into the branches that differ, and all paths stay those of the original
+    objects.
+
+    Args:
+        t1: First object
+        t2: Second object
+
+    Returns:
+        t2 with the identical subtrees taken from t1
+    """
+    if type(t1) is not type(t2):
+        return t2
+
+    if isinstance(t1, dict):
+        pruned = dict(t2) if type(t2) is dict else t2.copy()
+        for key, value2 in t2.items():
+            if key in t1:
+                pruned[key] = _share(t1[key], value2)
+        return pruned
+
+    if isinstance(t1, list):
+        pruned = list(t2)
+        for position, (value1, value2) in enumerate(zip(t1, t2)):
+            pruned[position] = _share(value1, value2)
+        return pruned
+
+    return t2
+
+
+def _share(value1: Any, value2: Any) -> Any:
+    if _strictly_equal(value1, value2):
+        return value1
+    return prune_identical(value1, value2)
+
+
+def _with_added_values(diff: DeepDiff) -> Dict:
+    """Get a diff dictionary with the values of added dictionary items."""
+    result = diff.to_dict()
+    for report in ("dictionary_item_added", "attribute_added"):
+        if report in result:
+            result[report] = {level.path(): level.t2 for level in diff.tree[report]}
+    return result
+
+
+def compare(
+    t1: Any,
+    t2: Any,
+    prune: bool = False,
+    output_format: str = "full",
+    **options: Any,
+) -> Dict:
+    """
+    Compare two objects and return their differences as a dictionary.
+
+    Args:
+        t1: First object to compare
+        t2: Second object to compare
+        prune: Whether to share identical subtrees with prune_identical first
+        output_format: One of formats.OUTPUT_FORMATS
+        **options: build_diff options, including the max_diffs and
+            max_time_ms limits
+
+    Returns:
+        Dictionary containing the differences, in the requested format, with
+        "truncated" set when a limit stopped the comparison early
+    """
+    check_output_format(output_format)
+    if prune:
+        t2 = prune_identical(t1, t2)
+    diff = build_diff(t1, t2, **options)
+    if output_format == "json_patch":
+        # The delta form carries the values of added dictionary items, but
+        # Delta requires report_repetition with ignore_order
+        if options.get("ignore_order"):
+            result = json_patch(_with_added_values(diff))
+            # Paths inside list items give their positions in t1: apply the
+            # deepest changes before items are removed from or added to lists
+            result["patch"].sort(key=lambda op: -op["path"].count("/"))
+        else:
+            result = json_patch(Delta(diff).to_dict())
+    else:
+        result = format_diff(diff.to_dict(), output_format)
+    if getattr(diff, "truncated", False):
+        result["truncated"] = True
+    return result
+
+
+def equal(
+    t1: Any, t2: Any, max_time_ms: Optional[float] = None, **options: Any
+) -> Dict:
+    """
+    Tell whether two objects are equal, stopping at the first difference.
+
+    Strictly equal objects (same types and values) are recognized with Python
+    equality, without walking them. With ignore_order, the DeepHash of both
+    roots is compared next: DeepDiff would hash every item anyway, and equal
+    hashes mean equal objects. Otherwise DeepDiff runs until it finds one
+    difference.
+
+    Args:
+        t1: First object to compare
+        t2: Second object to compare
+        max_time_ms: Give up after this many milliseconds
+        **options: build_diff options
+
+    Returns:
+        Dictionary with "equal" (None if the time ran out first), the
+        "method" that decided it ("identical", "hash" or "diff") and, for
+        different objects, the report type and path of the first
+        "difference" found
+    """
+    if _strictly_equal(t1, t2):
+        return {"equal": True, "method": "identical"}
+
+    if options.get("ignore_order"):
+        hash_options = build_hash_options(**options)
+        try:
+            if DeepHash(t1, **hash_options)[t1] == DeepHash(t2, **hash_options)[t2]:
+                return {"equal": True, "method": "hash"}
+        except BudgetExceededError:
+            raise
+        except Exception:
+            # Unhashable contents; let DeepDiff decide
+            pass
+
+    deadline = None
+    if max_time_ms is not None:
+        deadline = time.monotonic() + max_time_ms / 1000
+    _add_budget_operators(options)
+    diff = _LimitedDiff(
+        t1,
+        t2,
+        report_limit=1,
+        stop_after=1,
+        deadline=deadline,
+        exclude_types=resolve_exclude_types(options.pop("exclude_types", None)),
+        **options,
+    )
+    for report, items in diff.to_dict().items():
+        path = next(iter(items))
+        difference = {"report": report, "path": path}
+        return {"equal": False, "method": "diff", "difference": difference}
+    if diff.truncated:
+        return {"equal": None, "method": "diff", "truncated": True}
+    return {"equal": True, "method": "diff"}
+
+
+def _batch_item(
+    index: int, func: Callable[..., Any], *args: Any, **kwargs: Any
+) -> Dict:
+    """Run one item of a batch, turning its failure into an error entry."""
+    try:
+        return {"index": index, "diff": func(*args, **kwargs)}
+    except BudgetExceededError:
+        # The whole call is out of budget, not just this item
+        raise
+    except Exception as e:
+        return {"index": index, "error": f"{type(e).__name__}: {str(e)}"}
+
+
+def compare_batch(
+    baseline: Any,
+    candidates: List[Any],
+    indices: Optional[List[int]] = None,
+    **options: Any,
+) -> List[Dict]:
+    """
+    Compare one baseline against several candidates.
+
+    The DeepHash cache is shared by all comparisons of the batch, so with
+    ignore_order the hashes of the baseline's subtrees are computed once
+    instead of once per candidate. All candidates stay referenced for the
+    whole batch, which keeps the id-based hash entries valid.
+
+    Args:
+        baseline: Object every candidate is compared against
+        candidates: Objects to compare with the baseline
+        indices: Index of each candidate, used in the results
+            (default: 0, 1, 2, ...)
+        **options: DeepDiff options
+
+    Returns:
+        One entry per candidate, in order, with either "diff" or "error"
+    """
+    indices = indices if indices is not None else range(len(candidates))
+    hashes: Dict = {}
+    return [
+        _batch_item(index, compare, baseline, candidate, hashes=hashes, **options)
+        for index, candidate in zip(indices, candidates)
+    ]
+
+
+def compare_pairs(
+    pairs: List[Any],
+    indices: Optional[List[int]] = None,
+    **options: Any,
+) -> List[Dict]:
+    """
+    Compare several (t1, t2) pairs.
+
+    Args:
+        pairs: Two-item lists or tuples
+        indices: Index of each pair, used in the results (default: 0, 1, 2, ...)
+        **options: DeepDiff options
+
+    Returns:
+        One entry per pair, in order, with either "diff" or "error"
+    """
+    indices = indices if indices is not None else range(len(pairs))
+    results = []
+    for index, pair in zip(indices, pairs):
+        if not isinstance(pair, (list, tuple)) or len(pair) != 2:
+            results.append(
+                {"index": index, "error": "ValueError: expected a [t1, t2] pair"}
+            )
+            continue
+        results.append(_batch_item(index, compare, pair[0], pair[1], **options))
+    return results
+
+
+def get_deep_distance(t1: Any, t2: Any, **options: Any) -> float:
+    """Get the deep distance between two objects."""
+    diff = build_diff(t1, t2, get_deep_distance=True, **options)
+    return diff.get("deep_distance", 0.0)
+
+
+def _search_result_to_dict(result: Dict) -> Dict:
+    """Convert a DeepSearch result to plain, serializable containers."""
+    return {
+        report: dict(paths) if isinstance(paths, dict) else list(paths)
+        for report, paths in result.items()
+    }
+
+
+def search(obj: Any, item: Any, **options: Any) -> Dict:
+    """Search for an item in an object."""
+    return _search_result_to_dict(DeepSearch(obj=obj, item=item, **options))
+
+
+def grep(obj: Any, item: Any, **options: Any) -> Dict:
+    """Grep for an item in an object."""
+    return _search_result_to_dict(obj | deep_grep(item, **options))
+
+
+def hash_object(
+    obj: Any,
+    exclude_types: Optional[List[str]] = None,
+    **options: Any,
+) -> Dict:
+    """Hash an object based on its content."""
+    hasher = DeepHash(
+        obj,
+        exclude_types=resolve_exclude_types(exclude_types),
+        custom_operators=budget_operators() or None,
+        **options,
+    )
+    # We only return the hash of the root object as the full hasher
+    # contains references to all sub-objects which may not be serializable
+    return {"hash": hasher[obj]}
+
+
+def create_delta(t1: Any, t2: Any, **options: Any) -> Dict:
+    """Create a delta that can be used to transform t1 into t2."""
+    return Delta(build_diff(t1, t2, **options)).to_dict()
+
+
+def apply_delta(obj: Any, delta_dict: Dict) -> Any:
+    """Apply a delta to an object."""
+    return obj + Delta(delta_dict)
+
+
+def extract_path(obj: Any, path: str) -> Any:
+    """Extract a value from an object using a path."""
+    return extract(obj, path)
+
+
+def _json_default(value: Any) -> Any:
+    """Encode values that the json module does not support."""
+    if isinstance(value, type):
+        return value.__name__
+    return str(value)
+
+
+def write_diff_ndjson(handle: Any, diff: Dict) -> int:
+    """
+    Write a diff as newline-delimited JSON, one reported item per line.
+
+    Each line is an object with the report type and path, plus the reported
+    value for reports that carry one, e.g.
+    ``{"report": "values_changed", "path": "root[3]['age']", "value": {...}}``.
+
+    Args:
+        handle: Text file open for writing
+        diff: Diff dictionary as returned by DeepDiff.to_dict()
+
+    Returns:
+        Number of lines written
+    """
+    lines = 0
+    for report, items in diff.items():
+        if isinstance(items, dict):
+            entries = (
+                {"report": report, "path": path, "value": value}
+                for path, value in items.items()
+            )
+        else:
+            entries = ({"report": report, "path": path} for path in items)
+        for entry in entries:
+            handle.write(dumps_json(entry, default=_json_default))
+            handle.write("\n")
+            lines += 1
+    return lines
+
+
+def distance_batch(
+    t1: Any,
+    candidates: List[Any],
+    indices: Optional[List[int]] = None,
+    **options: Any,
+) -> List[Dict]:
+    """
+    Get the deep distance between one object and several candidates.
+
+    Args:
+        t1: Object every candidate is measured against
+        candidates: Objects to measure
+        indices: Index of each candidate, used in the results
+            (default: 0, 1, 2, ...)
+        **options: DeepDiff options
+
+    Returns:
+        One entry per candidate, in order, with its "index" and "distance"
+        (or "error")
+    """
+    indices = indices if indices is not None else range(len(candidates))
+    results = []
+    for index, candidate in zip(indices, candidates):
+        try:
+            distance = get_deep_distance(t1, candidate, **options)
+            results.append({"index": index, "distance": distance})
+        except BudgetExceededError:
+            raise
+        except Exception as e:
+            results.append({"index": index, "error": f"{type(e).__name__}: {str(e)}"})
+    return results
+
+
+def compare_files_chunked(
+    file1_path: str,
+    file2_path: str,
+    chunksize: Optional[int] = None,
+    max_memory_mb: Optional[float] = None,
+    output_path: Optional[str] = None,
+    progress: Optional[Callable[[float, Optional[float]], None]] = None,
+    **options: Any,
+) -> Dict:
+    """
+    Compare two CSV files in aligned chunks with bounded memory.
+
+    Args:
+        file1_path: Path to the first CSV file
+        file2_path: Path to the second CSV file
+        chunksize: Maximum number of rows per chunk
+        max_memory_mb: Memory ceiling for the chunks being compared
+        output_path: Optional NDJSON file the differences are written to as
+            they are found, instead of being returned
+        progress: Optional callback called with the number of rows compared
+            after each chunk
+        **options: Other comparison options
+
+    Returns:
+        The differences, or a summary when output_path is given
+
+    Raises:
+        ValueError: If either file cannot be loaded
+    """
+    from .file_utils import open_csv_reader
+    from .tabular import iter_chunk_diffs
+
+    for file_path in (file1_path, file2_path):
+        try:
+            open_csv_reader(file_path).close()
+        except Exception as e:
+            raise ValueError(f"Error loading {file_path}: {str(e)}")
+
+    chunks = iter_chunk_diffs(
+        file1_path,
+        file2_path,
+        chunksize=chunksize,
+        max_memory_mb=max_memory_mb,
+        **options,
+    )
+
+    if output_path is None:
+        result: Dict[str, Any] = {}
+        for rows, diff in chunks:
+            rebase_diff(diff, "root", into=result)
+            if progress:
+                progress(rows, None)
+        return result
+
+    counts: Dict[str, int] = {}
+    rows = 0
+    with open(output_path, "w", encoding="utf-8") as handle:
+        for rows, diff in chunks:
+            write_diff_ndjson(handle, diff)
+            for report, items in diff.items():
+                counts[report] = counts.get(report, 0) + len(items)
+            if progress:
+                progress(rows, None)
+    return {"output_path": output_path, "rows_compared": rows, "differences": counts}
+
+
+def _format_path(keys: Tuple[Any, ...]) -> str:
+    """Build a DeepDiff path from the keys it goes through."""
+    return "root" + "".join(f"[{key!r}]" for key in keys)
+
+
+def compare_file_paths(
+    file1_path: str,
+    file2_path: str,
+    include_paths: List[str],
+    exclude_paths: Optional[List[str]] = None,
+    exclude_regex_paths: Optional[List[str]] = None,
+    **options: Any,
+) -> Optional[Dict]:
+    """
+    Compare only some paths of two JSON or NDJSON files, loading only those.
+
+    The value at each path is extracted lazily from both files and compared
+    on its own, and the reported paths are rebased onto the include path.
+
+    Args:
+        file1_path: Path to the first file
+        file2_path: Path to the second file
+        include_paths: DeepDiff paths to compare, e.g. ``root['config']``
+        exclude_paths: Paths to exclude from comparison
+        exclude_regex_paths: Regex paths to exclude from comparison
+        **options: Other comparison options
+
+    Returns:
+        The differences, or None if the comparison cannot be done lazily
+        (other file types, regex exclusions, or a path missing from a file)
+        and the files must be loaded whole
+    """
+    from .file_utils import is_json_file, load_json_file, path_keys
+
+    json_files = is_json_file(file1_path) and is_json_file(file2_path)
+    if exclude_regex_paths or not json_files:
+        return None
+    try:
+        roots = sorted({path_keys(path) for path in include_paths}, key=len)
+    except ValueError:
+        return None
+    # Paths under another include path are already covered by it
+    kept: List[Tuple[Any, ...]] = []
+    for keys in roots:
+        if not any(keys[: len(other)] == other for other in kept):
+            kept.append(keys)
+
+    result: Dict[str, Any] = {}
+    for keys in kept:
+        prefix = _format_path(keys)
+        try:
+            values = [
+                load_json_file(file_path, prefix)
+                for file_path in (file1_path, file2_path)
+            ]
+        except KeyError:
+            return None
+        except Exception as e:
+            raise ValueError(f"Error loading {prefix}: {str(e)}")
+        # Exclusions are relative to the compared value
+        relative_excludes = [
+            "root" + path[len(prefix):]
+            for path in exclude_paths or []
+            if path == prefix or path.startswith(prefix + "[")
+        ]
+        diff = compare(
+            values[0], values[1], exclude_paths=relative_excludes or None, **options
+        )
+        rebase_diff(diff, prefix, into=result)
+    return result
+
+
+def compare_files(
+    file1_path: str,
+    file2_path: str,
+    key_columns: Optional[List[str]] = None,
+    columnar: bool = False,
+    chunksize: Optional[int] = None,
+    max_memory_mb: Optional[float] = None,
+    output_path: Optional[str] = None,
+    progress: Optional[Callable[[float, Optional[float]], None]] = None,
+    include_paths: Optional[List[str]] = None,
+    output_format: str = "full",
+    **options: Any,
+) -> Dict:
+    """
+    Load two files and compare their contents.
+
+    When key_columns is given, rows are aligned on those columns instead of
+    on their position. When columnar is True, the files are compared as
+    DataFrames with vectorized operations instead of record by record. When
+    chunksize, max_memory_mb or output_path is given, CSV files are compared
+    chunk by chunk (see compare_files_chunked). When include_paths is given,
+    only those paths are compared, and for JSON files only those paths are
+    loaded (see compare_file_paths); chunked comparisons do not take
+    include_paths. output_format (see formats.format_diff)
+    does not apply to the summary of a comparison written to output_path.
+
+    Raises:
+        ValueError: If either file cannot be loaded
+    """
+    check_output_format(output_format)
+    if output_format != "full" and not output_path:
+        diff = compare_files(
+            file1_path,
+            file2_path,
+            key_columns=key_columns,
+            columnar=columnar,
+            chunksize=chunksize,
+            max_memory_mb=max_memory_mb,
+            progress=progress,
+            include_paths=include_paths,
+            **options,
+        )
+        return format_diff(diff, output_format)
+
+    if chunksize or max_memory_mb or output_path:
+        if include_paths:
+            raise ValueError("include_paths is not supported with chunked comparisons")
+        return compare_files_chunked(
+            file1_path,
+            file2_path,
+            chunksize=chunksize,
+            max_memory_mb=max_memory_mb,
+            output_path=output_path,
+            progress=progress,
+            key_columns=key_columns,
+            columnar=columnar,
+            **options,
+        )
+
+    if include_paths:
+        if columnar:
+            raise ValueError("include_paths is not supported with columnar comparisons")
+        if not key_columns:
+            result = compare_file_paths(
+                file1_path, file2_path, include_paths, **options
+            )
+            if result is not None:
+                return result
+        options["include_paths"] = include_paths
+
+    from .file_utils import load_data_from_file, load_dataframe_from_file
+
+    loader = load_dataframe_from_file if columnar else load_data_from_file
+    loaded = []
+    for file_path in (file1_path, file2_path):
+        try:
+            loaded.append(loader(file_path))
+        except Exception as e:
+            raise ValueError(f"Error loading {file_path}: {str(e)}")
+
+    if columnar:
+        from .tabular import diff_dataframes
+
+        return diff_dataframes(loaded[0], loaded[1], key_columns=key_columns, **options)
+
+    if key_columns:
+        from .tabular import diff_records_by_key
+
+        return diff_records_by_key(loaded[0], loaded[1], key_columns, **options)
+
+    return compare(loaded[0], loaded[1], **options)
+
+
+def _search_file(
+    func: Callable[..., Dict],
+    file_path: str,
+    item: Any,
+    max_matches: Optional[int] = None,
+    **options: Any,
+) -> Dict:
+    """
+    Search a file item by item, stopping after max_matches matches.
+
+    Each top-level item is searched on its own, wrapped in a dictionary so
+    that the reported paths (which DeepSearch also matches the item against)
+    are the ones a search of the whole document reports.
+    """
+    from .file_utils import iter_file_items
+
+    if max_matches is not None and max_matches < 1:
+        raise ValueError("max_matches must be at least 1")
+
+    case_sensitive = options.get("case_sensitive", False)
+    use_regexp = options.get("use_regexp", False)
+    item_cased = item.lower() if isinstance(item, str) and not case_sensitive else item
+
+    result: Dict[str, Any] = {}
+    found = 0
+    for key, value in iter_file_items(file_path):
+        if key is None:
+            matches = func(value, item, **options)
+        elif isinstance(key, str):
+            matches = func({key: value}, item, **options)
+        else:
+            # Mirror DeepSearch on lists: an item equal to the searched one
+            # is reported as a value and not searched further, and the
+            # position is not a path that can match
+            path = f"root[{key}]"
+            fold = isinstance(value, str) and not case_sensitive
+            value_cased = value.lower() if fold else value
+            if not use_regexp and value_cased == item_cased:
+                matches = {"matched_values": [path]}
+            else:
+                matches = func({key: value}, item, **options)
+                paths = matches.get("matched_paths")
+                if paths is not None and path in paths:
+                    if isinstance(paths, dict):
+                        del paths[path]
+                    else:
+                        paths.remove(path)
+                    if not paths:
+                        del matches["matched_paths"]
+
+        for report, paths in matches.items():
+            target = result.setdefault(report, {} if isinstance(paths, dict) else [])
+            for path in paths:
+                if max_matches is not None and found >= max_matches:
+                    result["truncated"] = True
+                    return result
+                if isinstance(target, dict):
+                    target[path] = paths[path]
+                else:
+                    target.append(path)
+                found += 1
+    return result
+
+
+def search_file(
+    file_path: str, item: Any, max_matches: Optional[int] = None, **options: Any
+) -> Dict:
+    """
+    Search for an item in a file, reading it one top-level item at a time.
+
+    Args:
+        file_path: Path to a CSV, Excel, JSON or NDJSON file
+        item: Item to search for
+        max_matches: Stop reading the file after this many matches
+        **options: DeepSearch options
+
+    Returns:
+        The search results, as for search, with "truncated" set when the
+        search stopped at max_matches before the end of the file
+    """
+    return _search_file(search, file_path, item, max_matches, **options)
+
+
+def grep_file(
+    file_path: str, item: Any, max_matches: Optional[int] = None, **options: Any
+) -> Dict:
+    """Grep for an item in a file; see search_file."""
+    return _search_file(grep, file_path, item, max_matches, **options)
+
+
+def hash_file(
+    file_path: str,
+    raw: bool = False,
+    exclude_types: Optional[List[str]] = None,
+    exclude_paths: Optional[List[str]] = None,
+    exclude_regex_paths: Optional[List[str]] = None,
+) -> Dict:
+    """
+    Hash the contents of a file, reading it one top-level item at a time.
+
+    Args:
+        file_path: Path to a CSV, Excel, JSON or NDJSON file (any file with raw)
+        raw: Whether to hash the file's bytes, in chunks, instead of its
+            parsed contents
+        exclude_types: Types to exclude from hashing
+        exclude_paths: Paths to exclude from hashing
+        exclude_regex_paths: Regex paths to exclude from hashing
+
+    Returns:
+        Dictionary with the "hash" and the number of top-level "items", or
+        with the "hash" and size in "bytes" of the file when raw is True.
+        For JSON, NDJSON and Excel files the hash equals the tree hash of
+        the parsed document. CSV column types are inferred for each block
+        of rows (see file_utils.iter_file_items), so the hash of a CSV file
+        can differ from that of the table loaded whole.
+    """
+    from .file_utils import hash_file_bytes, iter_file_items, load_data_from_file
+    from .merkle import MerkleTree, hash_items
+
+    if raw:
+        return hash_file_bytes(file_path)
+
+    options = dict(
+        exclude_types=exclude_types,
+        exclude_paths=exclude_paths,
+        exclude_regex_paths=exclude_regex_paths,
+    )
+    result = hash_items(iter_file_items(file_path), **options)
+    if result is None:
+        # An empty document; load it to tell an empty dict from an empty list
+        tree, _ = MerkleTree.build(load_data_from_file(file_path), **options)
+        result = {"hash": tree.hash, "items": 0}
+    return result
+
+
+def extract_path_file(file_path: str, path: str) -> Any:
+    """
+    Extract the value at a path from a file without loading the whole file.
+
+    JSON and NDJSON files are streamed down to the path (see
+    file_utils.load_json_file); CSV and Excel rows are read until the
+    selected row.
+
+    Args:
+        file_path: Path to a CSV, Excel, JSON or NDJSON file
+        path: Path to extract, e.g. ``root[3]['name']``
+
+    Returns:
+        Extracted value
+
+    Raises:
+        KeyError: If the path does not exist in the file
+    """
+    from .file_utils import (
+        is_json_file,
+        iter_file_items,
+        load_data_from_file,
+        load_json_file,
+        path_keys,
+    )
+
+    if is_json_file(file_path):
+        return load_json_file(file_path, path)
+
+    keys = path_keys(path)
+    if not keys:
+        return load_data_from_file(file_path)
+    for key, value in iter_file_items(file_path):
+        if key == keys[0]:
+            return extract(value, _format_path(keys[1:]))
+    raise KeyError(f"Path not found: {path}")
@@ -0,0 +1,567 @@
+"""
+Inverted search index for DeepDiff MCP.
+
+DeepSearch walks the whole object on every call. A search index walks it
+once and keeps, for every dictionary key path and every string or number
+value, where it occurs, so the same object can be searched over and over
+without another traversal. Results follow DeepSearch's semantics (and its
+output format), so an index can be used wherever search or grep is.
+"""
+import bisect
+import copy
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .store import content_handle
+
+# Every path sorts between "root" and this prefix-closing character
+_PATH_END = "\U0010ffff"
+_SEPARATOR = "\x00"
+
+_NUMBER_TYPES = (int, float)
+_KEY_TYPES = (str, int, float, bool, type(None))
+
+
+class _Unsupported(Exception):
+    """The object holds values the index does not model."""
+
+
+def _child_path(parent: str, key: Any) -> str:
+    # Same formatting as DeepSearch's reported paths
+    if isinstance(key, str):
+        return "%s['%s']" % (parent, key)
+    return "%s[%s]" % (parent, key)
+
+
+class SearchIndex:
+    """Key paths and leaf values of an object, indexed for lookups."""
+
+    def __init__(self, obj: Any):
+        """
+        Index an object.
+
+        Objects made of anything but dicts, lists, strings, numbers and None
+        are not indexed; searches then fall back to DeepSearch.
+
+        Args:
+            obj: Object to index
+        """
+        self.obj = obj
+        self._source: Optional[str] = None
+        self._reset()
+        try:
+            self._walk(obj, "root", (), False)
+        except _Unsupported:
+            self._reset()
+            self.complete = False
+        self._sorted_paths = sorted(self._keys.keys() | self._values.keys())
+
+    def _reset(self) -> None:
+        self.complete = True
+        # path -> traversal order, for paths of dictionary items
+        self._keys: Dict[str, Tuple[int, ...]] = {}
+        # path -> (traversal order, value), for string and number leaves
+        self._values: Dict[str, Tuple[Tuple[int, ...], Any]] = {}
+        # value -> paths, per variant of the values
+        self._strings: Dict[str, Set[str]] = {}
+        self._folded: Dict[str, Set[str]] = {}
+        self._numbers: Dict[Any, Set[str]] = {}
+        # Lookup structures built on first use
+        self._lazy: Dict[str, Any] = {}
+
+    @property
+    def source(self) -> str:
+        """Handle the indexed object has, or would have, in the object store."""
+        if self._source is None:
+            self._source = content_handle(self.obj)
+        return self._source
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = dict(self.__dict__)
+        state["_lazy"] = {}
+        return state
+
+    def __len__(self) -> int:
+        return len(self._sorted_paths)
+
+    def _walk(
+        self, obj: Any, path: str, order: Tuple[int, ...], is_key: bool
+    ) -> List[str]:
+        """Index obj and its children, returning the indexed paths."""
+        added = []
+        if is_key:
+            self._keys[path] = order
+            added.append(path)
+
+        if isinstance(obj, dict):
+            for position, (key, value) in enumerate(obj.items()):
+                if not isinstance(key, _KEY_TYPES):
+                    raise _Unsupported()
+                child = _child_path(path, key)
+                added.extend(self._walk(value, child, order + (position,), True))
+        elif isinstance(obj, list):
+            for position, value in enumerate(obj):
+                child = _child_path(path, position)
+                added.extend(self._walk(value, child, order + (position,), False))
+        elif isinstance(obj, str):
+            self._values[path] = (order, obj)
+            self._strings.setdefault(obj, set()).add(path)
+            self._folded.setdefault(obj.lower(), set()).add(path)
+            if not is_key:
+                added.append(path)
+        elif isinstance(obj, _NUMBER_TYPES):
+            self._values[path] = (order, obj)
+            self._numbers.setdefault(obj, set()).add(path)
+            if not is_key:
+                added.append(path)
+        elif obj is not None:
+            raise _Unsupported()
+        return added
+
+    def _remove_subtree(self, path: str) -> None:
+        """Drop the entries of a path and of everything below it."""
+        start = bisect.bisect_left(self._sorted_paths, path)
+        end = bisect.bisect_left(self._sorted_paths, path + _PATH_END)
+        for removed in self._sorted_paths[start:end]:
+            self._keys.pop(removed, None)
+            entry = self._values.pop(removed, None)
+            if entry is None:
+                continue
+            value = entry[1]
+            if isinstance(value, str):
+                _discard(self._strings, value, removed)
+                _discard(self._folded, value.lower(), removed)
+            else:
+                _discard(self._numbers, value, removed)
+        del self._sorted_paths[start:end]
+
+    def _renumber(
+        self, path: str, order: Tuple[int, ...], is_key: bool, found: bool, obj: Any
+    ) -> None:
+        """Refresh the traversal order below the items of a dictionary."""
+        if not found or not isinstance(obj, dict):
+            return
+        depth = len(order)
+        for position, key in enumerate(obj):
+            child = _child_path(path, key)
+            if self._keys[child][depth] == position:
+                continue
+            start = bisect.bisect_left(self._sorted_paths, child)
+            end = bisect.bisect_left(self._sorted_paths, child + _PATH_END)
+            for below in self._sorted_paths[start:end]:
+                if below in self._keys:
+                    old = self._keys[below]
+                    self._keys[below] = old[:depth] + (position,) + old[depth + 1 :]
+                if below in self._values:
+                    old, value = self._values[below]
+                    self._values[below] = (
+                        old[:depth] + (position,) + old[depth + 1 :],
+                        value,
+                    )
+
+    def _copy(self, obj: Any) -> "SearchIndex":
+        """Copy the index for another object, sharing nothing updates change."""
+        index = copy.copy(self)
+        index.obj = obj
+        index._source = None
+        index._lazy = {}
+        index._keys = dict(self._keys)
+        index._values = dict(self._values)
+        index._strings = {value: set(paths) for value, paths in self._strings.items()}
+        index._folded = {value: set(paths) for value, paths in self._folded.items()}
+        index._numbers = {value: set(paths) for value, paths in self._numbers.items()}
+        index._sorted_paths = list(self._sorted_paths)
+        return index
+
+    def updated(self, delta_dict: Dict) -> Tuple["SearchIndex", int]:
+        """
+        Get a copy of the index with a delta applied to the indexed object.
+
+        Only the subtrees at the delta's paths are walked again. Changes to
+        list items reindex the whole list, since its positions may shift.
+        The index itself is left unchanged, so it can still be searched
+        while the copy is built.
+
+        Args:
+            delta_dict: Delta as returned by the create_delta tool
+
+        Returns:
+            (the new index, number of subtrees that were reindexed)
+        """
+        from deepdiff.delta import Delta
+
+        obj = self.obj + Delta(delta_dict)
+        if not self.complete:
+            return SearchIndex(obj), 1
+
+        roots = set()
+        for report in delta_dict.values():
+            if isinstance(report, dict):
+                roots.update(
+                    _subtree_root(obj, path) for path in report if isinstance(path, str)
+                )
+        # Nested roots are covered by their ancestors
+        roots = sorted(roots, key=len)
+        kept: List[Tuple[Any, ...]] = []
+        for root in roots:
+            if not any(root[: len(other)] == other for other in kept):
+                kept.append(root)
+
+        index = self._copy(obj)
+        added: List[str] = []
+        try:
+            for elements in kept:
+                path, order, is_key, found, value = _locate(obj, elements)
+                index._remove_subtree(path)
+                if found:
+                    added.extend(index._walk(value, path, order, is_key))
+        except _Unsupported:
+            return SearchIndex(obj), len(kept)
+        # Removed keys shift the positions of the keys after them
+        for parent in {elements[:-1] for elements in kept if elements}:
+            index._renumber(*_locate(obj, parent))
+
+        if len(added) > 64:
+            index._sorted_paths.extend(added)
+            index._sorted_paths.sort()
+        else:
+            for path in added:
+                bisect.insort(index._sorted_paths, path)
+        return index, len(kept)
+
+    def _texts(self, variant: str) -> Tuple[str, List[int], List[str], List[Any]]:
+        """
+        Concatenate the distinct texts of a variant for substring scans.
+
+        Returns:
+            (concatenated texts, start offset of each text, texts, what each
+            text stands for)
+        """
+        lookup = self._lazy.get(variant)
+        if lookup is None:
+            if variant == "strings":
+                texts = list(self._strings)
+                targets = texts
+            elif variant == "folded":
+                texts = list(self._folded)
+                targets = texts
+            elif variant == "keys":
+                texts = list(self._keys)
+                targets = texts
+            else:
+                targets = list(self._keys)
+                texts = [path.lower() for path in targets]
+            starts = []
+            offset = 0
+            for text in texts:
+                starts.append(offset)
+                offset += len(text) + 1
+            joined = _SEPARATOR.join(texts)
+            lookup = self._lazy[variant] = (joined, starts, texts, targets)
+        return lookup
+
+    def _containing(self, variant: str, needle: str) -> List[Any]:
+        """Find what the texts of a variant that contain needle stand for."""
+        text, starts, texts, targets = self._texts(variant)
+        if not needle or _SEPARATOR in needle:
+            return [
+                target
+                for candidate, target in zip(texts, targets)
+                if needle in candidate
+            ]
+        found = []
+        position = text.find(needle)
+        while position != -1:
+            index = bisect.bisect_right(starts, position) - 1
+            found.append(targets[index])
+            # One match per text is enough: continue with the next one
+            if index + 1 == len(starts):
+                break
+            position = text.find(needle, starts[index + 1])
+        return found
+
+    def _folded_keys(self) -> Dict[str, List[str]]:
+        folded = self._lazy.get("folded_key_map")
+        if folded is None:
+            folded = self._lazy["folded_key_map"] = {}
+            for path in self._keys:
+                folded.setdefault(path.lower(), []).append(path)
+        return folded
+
+    def _matched_paths(
+        self, item: Any, case_sensitive: bool, match_string: bool
+    ) -> Iterable[str]:
+        needle = str(item)
+        if match_string:
+            if case_sensitive:
+                return [needle] if needle in self._keys else []
+            return self._folded_keys().get(needle, ())
+        return self._containing("keys" if case_sensitive else "folded_keys", needle)
+
+    def _matched_values(
+        self, item: Any, case_sensitive: bool, match_string: bool
+    ) -> Iterable[str]:
+        if not isinstance(item, str):
+            return self._numbers.get(item, ())
+        paths_by_value = self._strings if case_sensitive else self._folded
+        if match_string:
+            return paths_by_value.get(item, ())
+        variant = "strings" if case_sensitive else "folded"
+        return [
+            path
+            for value in self._containing(variant, item)
+            for path in paths_by_value[value]
+        ]
+
+    def _result(
+        self, matched_paths: Iterable[str], matched_values: Iterable[str]
+    ) -> Dict:
+        result = {}
+        if matched_paths:
+            result["matched_paths"] = sorted(matched_paths, key=self._keys.__getitem__)
+        if matched_values:
+            result["matched_values"] = sorted(
+                matched_values, key=lambda path: self._values[path][0]
+            )
+        return result
+
+    def search(
+        self,
+        item: Any,
+        case_sensitive: bool = False,
+        match_string: bool = False,
+        use_regexp: bool = False,
+    ) -> Dict:
+        """
+        Search the indexed object like DeepSearch would.
+
+        Args:
+            item: Item to search for
+            case_sensitive: Whether the search is case-sensitive
+            match_string: Whether strings must match exactly
+            use_regexp: Whether item is a regular expression
+
+        Returns:
+            Dictionary with the "matched_paths" and "matched_values", in
+            traversal order, leaving out empty reports
+        """
+        if use_regexp:
+            return self.search_many([item], case_sensitive, match_string, use_regexp)[0]
+
+        if not self.complete or type(item) not in (str, int, float, bool):
+            from .operations import search as deep_search
+
+            return deep_search(
+                self.obj, item, case_sensitive=case_sensitive, match_string=match_string
+            )
+
+        if isinstance(item, str):
+            if not case_sensitive:
+                item = item.lower()
+        else:
+            case_sensitive = True
+
+        return self._result(
+            self._matched_paths(item, case_sensitive, match_string),
+            self._matched_values(item, case_sensitive, match_string),
+        )
+
+    def search_many(
+        self,
+        items: List[Any],
+        case_sensitive: bool = False,
+        match_string: bool = False,
+        use_regexp: bool = False,
+    ) -> List[Dict]:
+        """
+        Search the indexed object for several items.
+
+        Regular expressions are matched in a single scan of the indexed
+        texts: a combined alternation of all patterns rules out most texts,
+        and only the texts it matches are tried against each pattern.
+
+        Args:
+            items: Items to search for
+            case_sensitive: Whether the search is case-sensitive
+            match_string: Whether strings must match exactly
+            use_regexp: Whether the items are regular expressions
+
+        Returns:
+            One search() result per item, in the same order
+
+        Raises:
+            ValueError: If use_regexp is set and an item is not a valid
+                regular expression
+        """
+        if not use_regexp:
+            return [self.search(item, case_sensitive, match_string) for item in items]
+        patterns = compile_patterns(items, case_sensitive)
+        if not self.complete:
+            from .operations import search as deep_search
+
+            return [
+                deep_search(self.obj, pattern, case_sensitive=True, use_regexp=True)
+                for pattern in patterns
+            ]
+
+        paths_by_value = self._strings if case_sensitive else self._folded
+        value_hits = self._scan("strings" if case_sensitive else "folded", patterns)
+        key_hits = self._scan("keys" if case_sensitive else "folded_keys", patterns)
+        return [
+            self._result(
+                paths, [path for value in values for path in paths_by_value[value]]
+            )
+            for paths, values in zip(key_hits, value_hits)
+        ]
+
+    def _scan(self, variant: str, patterns: List["re.Pattern"]) -> List[List[Any]]:
+        """Find, for every pattern, what the texts of a variant it matches stand for."""
+        _, _, texts, targets = self._texts(variant)
+        combined = _combine(patterns)
+        hits: List[List[Any]] = [[] for _ in patterns]
+        for text, target in zip(texts, targets):
+            if combined is not None and combined.search(text) is None:
+                continue
+            for pattern, found in zip(patterns, hits):
+                if pattern.search(text):
+                    found.append(target)
+        return hits
+
+
+def compile_patterns(
+    items: List[Any], case_sensitive: bool = False
+) -> List["re.Pattern"]:
+    """
+    Compile search items as regular expressions.
+
+    Like DeepSearch, case-insensitive patterns are lowercased and matched
+    against lowercased texts.
+
+    Raises:
+        ValueError: If an item is not a string or not a valid regular expression
+    """
+    patterns = []
+    for item in items:
+        if not isinstance(item, str):
+            raise ValueError(f"Regular expressions must be strings: {item!r}")
+        try:
+            patterns.append(re.compile(item if case_sensitive else item.lower()))
+        except re.error as e:
+            raise ValueError(f"Invalid regular expression {item!r}: {str(e)}")
+    return patterns
+
+
+def _combine(patterns: List["re.Pattern"]) -> Optional["re.Pattern"]:
+    """
+    Join patterns into one alternation matching wherever any of them does.
+
+    Returns:
+        The alternation, or None if the patterns cannot be joined safely
+        (groups would be renumbered, inline flags must come first)
+    """
+    if len(patterns) < 2 or any(pattern.groups for pattern in patterns):
+        return None
+    try:
+        return re.compile("|".join(f"(?:{pattern.pattern})" for pattern in patterns))
+    except re.error:
+        return None
+
+
+def _discard(index: Dict[Any, Set[str]], value: Any, path: str) -> None:
+    paths = index.get(value)
+    if paths is not None:
+        paths.discard(path)
+        if not paths:
+            del index[value]
+
+
+def _subtree_root(obj: Any, path: str) -> Tuple[Any, ...]:
+    """
+    Get the keys of the subtree to reindex for a path reported by a delta.
+
+    Items of lists are widened to the whole list, whose positions may have
+    shifted.
+    """
+    from deepdiff.path import _path_to_elements
+
+    keys = tuple(key for key, _ in _path_to_elements(path)[1:])
+    container = obj
+    for depth, key in enumerate(keys):
+        if isinstance(container, list):
+            return keys[:depth]
+        try:
+            container = container[key]
+        except (KeyError, IndexError, TypeError):
+            return keys
+    return keys
+
+
+def _locate(
+    obj: Any, keys: Tuple[Any, ...]
+) -> Tuple[str, Tuple[int, ...], bool, bool, Any]:
+    """
+    Find a subtree of obj.
+
+    Returns:
+        (path, traversal order, whether it is a dictionary item, whether it
+        exists, value)
+    """
+    path = "root"
+    order: Tuple[int, ...] = ()
+    value = obj
+    is_key = False
+    for key in keys:
+        path = _child_path(path, key)
+        if isinstance(value, dict) and key in value:
+            order += (list(value).index(key),)
+            value = value[key]
+            is_key = True
+        elif isinstance(value, list) and isinstance(key, int) and 0 <= key < len(value):
+            order += (key,)
+            value = value[key]
+            is_key = False
+        else:
+            return path, order, False, False, None
+    return path, order, is_key, True, value
+
+
+def build_search_index(obj: Any) -> Dict[str, Any]:
+    """
+    Build the search index of an object.
+
+    Returns:
+        Dictionary with the "index" and the "source" handle of the object
+    """
+    index = SearchIndex(obj)
+    return {"index": index, "source": index.source}
+
+
+def search_many(obj: Any, items: List[Any], **options: Any) -> List[Dict]:
+    """
+    Search an object for several items in a single traversal.
+
+    Args:
+        obj: Object to search in
+        items: Items to search for
+        **options: case_sensitive, match_string and use_regexp
+
+    Returns:
+        One DeepSearch result per item, in the same order
+    """
+    return SearchIndex(obj).search_many(items, **options)
+
+
+def update_search_index(index: SearchIndex, delta_dict: Dict) -> Dict[str, Any]:
+    """
+    Apply a delta to an indexed object and update a copy of the index.
+
+    Args:
+        index: Index to update; it is left unchanged
+        delta_dict: Delta as returned by the create_delta tool
+
+    Returns:
+        Dictionary with the updated "index", the "source" handle of the
+        updated object and the number of "reindexed_subtrees"
+    """
+    updated, reindexed = index.updated(delta_dict)
+    return {"index": updated, "source": updated.source, "reindexed_subtrees": reindexed}
@@ -3,47 +3,359 @@ DeepDiff MCP Server
 
 This module provides an MCP server that exposes DeepDiff functionality.
 """
-from typing import Any, Dict, List, Optional, Union
+import asyncio
+import functools
+import time
+import weakref
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastmcp import Context, FastMCP
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+
+from .budget import Budget
+from .cache import (
+    DEFAULT_CACHE_MAX_BYTES,
+    DEFAULT_CACHE_SIZE,
+    ResultCache,
+    file_signature,
+    make_cache_key,
+)
+from .executor import ToolExecutor
+from .file_utils import (
+    DEFAULT_FILE_CACHE_MAX_BYTES,
+    DEFAULT_FILE_CACHE_SIZE,
+    configure_file_cache,
+)
+from .history import (
+    DEFAULT_KEYFRAME_INTERVAL,
+    DeltaHistory,
+    apply_deltas,
+    create_history,
+    squash_deltas,
+)
+from .lazy import LazyModule, WarmUpMiddleware
+from .merkle import MerkleTree, hash_tree
+from .metrics import Gauges, MetricsMiddleware, ServerMetrics, current_call, timed_body
+from .search_index import (
+    SearchIndex,
+    build_search_index,
+    search_many,
+    update_search_index,
+)
+from .shared import shared_backends
+from .store import (
+    DEFAULT_OBJECT_TTL,
+    DEFAULT_STORE_MAX_BYTES,
+    REF_KEY,
+    ObjectStore,
+    content_handle,
+    is_ref,
+    new_handle,
+)
+
+# DeepDiff, and the pandas and numpy it loads, are imported by the first call
+# or the warm-up (see lazy.py), not before the handshake
+delta_files = LazyModule("deepdiff_mcp.delta_files")
+operations = LazyModule("deepdiff_mcp.operations")
+sharding = LazyModule("deepdiff_mcp.sharding")
+
+_MISSING = object()
+
+
+def _count_matches(result: Dict) -> int:
+    """Count the paths found by a search or grep call."""
+    if "results" in result:
+        return sum(_count_matches(entry) for entry in result["results"])
+    return sum(
+        len(paths)
+        for report, paths in result.items()
+        if report not in ("item", "truncated")
+    )
 
-from deepdiff import DeepDiff, DeepSearch, grep, extract
-from deepdiff.delta import Delta
-from deepdiff.deephash import DeepHash
-from fastmcp import FastMCP, Context
 
 class DeepDiffMCP:
     """MCP server for DeepDiff."""
-    
-    def __init__(self, name: str = "DeepDiff MCP"):
-        """Initialize the DeepDiff MCP server."""
+
+    def __init__(
+        self,
+        name: str = "DeepDiff MCP",
+        executor: Optional[ToolExecutor] = None,
+        cache: Optional[ResultCache] = None,
+        objects: Optional[ObjectStore] = None,
+        metrics: Optional[ServerMetrics] = None,
+        metrics_path: Optional[str] = "/metrics",
+        warm_up: bool = True,
+    ):
+        """
+        Initialize the DeepDiff MCP server.
+
+        Args:
+            name: Name of the MCP server
+            executor: Executor used to run tool bodies off the event loop
+                (default: a thread pool with one worker per CPU)
+            cache: Result cache shared by compare, get_deep_distance,
+                create_delta and compare_files (default: a cache with the
+                default size limits)
+            objects: Store for objects uploaded with put_object and passed to
+                tools as {"$ref": handle}
+            metrics: Metrics the tool calls are recorded in
+            metrics_path: Path of the Prometheus metrics endpoint on the HTTP
+                and SSE transports; None disables the endpoint
+            warm_up: Whether to import the modules the tools need in the
+                executor once the first client has connected, instead of in
+                the first call using them
+        """
         self.mcp = FastMCP(name)
+        self.executor = executor or ToolExecutor()
+        self.cache = cache if cache is not None else ResultCache()
+        self.objects = objects if objects is not None else ObjectStore()
+        self.metrics = metrics if metrics is not None else ServerMetrics()
+        # Histories and search indexes being updated, by handle
+        self._update_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = (
+            weakref.WeakValueDictionary()
+        )
+        self.mcp.add_middleware(MetricsMiddleware(self.metrics))
+        if warm_up:
+            self.mcp.add_middleware(WarmUpMiddleware(self.executor))
+        if metrics_path:
+            self.mcp.custom_route(metrics_path, methods=["GET"])(self._metrics_endpoint)
         self._register_tools()
-        
+
+    def _add_tool(self, method: Callable[..., Any]) -> None:
+        """Register a tool method, timing its body for the metrics."""
+        self.mcp.tool(timed_body(method))
+
     def _register_tools(self):
         """Register all available DeepDiff tools."""
         # DeepDiff tools
-        self.mcp.tool(self.compare)
-        self.mcp.tool(self.get_deep_distance)
-        self.mcp.tool(self.compare_files)  # Registrar o método compare_files
-        
+        self._add_tool(self.compare)
+        self._add_tool(self.equal)
+        self._add_tool(self.get_deep_distance)
+        self._add_tool(self.compare_files)
+        self._add_tool(self.compare_many)
+        self._add_tool(self.find_nearest)
+
         # DeepSearch tools
-        self.mcp.tool(self.search)
-        self.mcp.tool(self.grep)
-        
+        self._add_tool(self.search)
+        self._add_tool(self.grep)
+        self._add_tool(self.build_search_index)
+        self._add_tool(self.update_search_index)
+        self._add_tool(self.search_file)
+        self._add_tool(self.grep_file)
+
         # DeepHash tools
-        self.mcp.tool(self.hash_object)
-        
+        self._add_tool(self.hash_object)
+        self._add_tool(self.hash_file)
+
         # Delta tools
-        self.mcp.tool(self.create_delta)
-        self.mcp.tool(self.apply_delta)
-        
+        self._add_tool(self.create_delta)
+        self._add_tool(self.apply_delta)
+        self._add_tool(self.create_delta_file)
+        self._add_tool(self.apply_delta_file)
+        self._add_tool(self.apply_deltas)
+        self._add_tool(self.squash_deltas)
+
+        # Delta history tools
+        self._add_tool(self.create_history)
+        self._add_tool(self.append_history)
+        self._add_tool(self.get_version)
+
         # Extract tools
-        self.mcp.tool(self.extract_path)
-        
+        self._add_tool(self.extract_path)
+        self._add_tool(self.extract_path_file)
+
+        # Object store tools
+        self._add_tool(self.put_object)
+        self._add_tool(self.drop_object)
+
+        # Server tools
+        self._add_tool(self.server_stats)
+
     def run(self, **kwargs):
         """Run the MCP server."""
-        return self.mcp.run(**kwargs)
-        
-    def compare(
+        try:
+            return self.mcp.run(**kwargs)
+        finally:
+            self.executor.shutdown(wait=False)
+
+    async def _run(self, tool: str, func: Callable[..., Any], **kwargs: Any) -> Any:
+        """
+        Resolve object store references and run a tool body in the executor.
+
+        Any argument given as {"$ref": handle} is replaced by the stored object.
+
+        Args:
+            tool: Name of the tool
+            func: Tool body
+            **kwargs: Keyword arguments for func (and for executor.run)
+
+        Returns:
+            The tool body's result
+        """
+        kwargs = {name: self.objects.resolve(value) for name, value in kwargs.items()}
+        return await self.executor.run(tool, func, **kwargs)
+
+    async def _run_file(
+        self,
+        tool: str,
+        func: Callable[..., Any],
+        file_path: str,
+        ctx: Optional[Context] = None,
+        **options: Any,
+    ) -> Any:
+        """
+        Run a tool body reading a local file, through the result cache.
+
+        Results are keyed on the file's path, modification time and size, so
+        an unchanged file is not read again.
+
+        Args:
+            tool: Name of the tool
+            func: Tool body, called with file_path and the options
+            file_path: Path of the file the tool reads
+            ctx: MCP context errors are reported to
+            **options: Other keyword arguments for func
+
+        Returns:
+            The cached or computed result
+        """
+        signature = file_signature(file_path)
+        key_parts = None if signature is None else (signature, sorted(options.items()))
+        try:
+            return await self._run_cached(
+                tool, func, key_parts=key_parts, file_path=file_path, **options
+            )
+        except (ValueError, KeyError, FileNotFoundError) as e:
+            if ctx:
+                await ctx.error(str(e))
+            raise
+
+    async def _run_cached(
+        self,
+        tool: str,
+        func: Callable[..., Any],
+        key_parts: Any = _MISSING,
+        budget: Optional[Budget] = None,
+        planner: Optional[Callable[..., Any]] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Run a tool body through the result cache.
+
+        The key is built before object store references are resolved, so a
+        reference is hashed as its (content-addressed) handle.
+
+        Args:
+            tool: Name of the tool
+            func: Tool body, run by the executor on a miss
+            key_parts: Values identifying the call (default: the keyword
+                arguments). None disables caching for this call.
+            budget: Limits of the call; they do not change its result, so
+                they are not part of the key
+            planner: Optional function splitting the call into shards, as
+                returned by _planner (see _run_sharded). Sharded results are
+                cached apart from whole ones.
+            **kwargs: Keyword arguments for func (and for executor.run)
+
+        Returns:
+            The cached or computed result
+        """
+        key = None
+        if self.cache.enabled and key_parts is not None:
+            if key_parts is _MISSING:
+                key_parts = sorted(kwargs.items())
+            if planner is not None:
+                key_parts = [key_parts, ("shards", planner.keywords["shards"])]
+            # Hashing a large payload takes a while; keep it off the event loop
+            started = time.perf_counter()
+            key = await asyncio.to_thread(make_cache_key, tool, key_parts)
+            result = self.cache.get(key, _MISSING)
+            call = current_call()
+            if call is not None:
+                call.add("cache", time.perf_counter() - started)
+            self.metrics.record_cache(tool, result is not _MISSING)
+            if result is not _MISSING:
+                return result
+
+        if planner is not None:
+            result = await self._run_sharded(
+                tool, func, planner, budget=budget, **kwargs
+            )
+        else:
+            result = await self._run(tool, func, budget=budget, **kwargs)
+        self.cache.put(key, result)
+        return result
+
+    async def _run_sharded(
+        self,
+        tool: str,
+        func: Callable[..., Any],
+        planner: Callable[..., Any],
+        budget: Optional[Budget] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Run a tool body split into shards that run in parallel.
+
+        The planner gets the resolved keyword arguments and returns a
+        sharding.ShardPlan, or None when the call is better run whole. Every
+        shard runs under the call's budget.
+
+        Args:
+            tool: Name of the tool
+            func: Tool body, run whole when the planner returns None
+            planner: Function planning the shards, e.g. sharding.plan_compare
+                with the number of shards bound
+            budget: Limits of the call
+            **kwargs: Keyword arguments for func and the planner
+
+        Returns:
+            The tool body's result
+        """
+        kwargs = {name: self.objects.resolve(value) for name, value in kwargs.items()}
+        # Splitting a large object takes a while; keep it off the event loop
+        plan = await asyncio.to_thread(planner, **kwargs)
+        if plan is None:
+            return await self.executor.run(tool, func, budget=budget, **kwargs)
+        while isinstance(plan, sharding.ShardPlan):
+            results = await asyncio.gather(
+                *(
+                    self.executor.run(tool, plan.func, budget=budget, **call)
+                    for call in plan.calls
+                )
+            )
+            plan = await asyncio.to_thread(plan.finish, list(results))
+        return plan
+
+    def _planner(
+        self, name: str, shards: Optional[int]
+    ) -> Optional[Callable[..., Any]]:
+        """
+        Bind the number of shards asked for by a call to a sharding planner.
+
+        Shards beyond the tool's concurrency would only wait for each other.
+
+        Args:
+            name: Name of the planner in sharding.py
+            shards: Number of shards asked for, if any
+
+        Returns:
+            The planner for _run_sharded, or None to run the call whole
+
+        Raises:
+            ValueError: If shards is below 1
+        """
+        if shards is None:
+            return None
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        shards = min(shards, self.executor.max_concurrency)
+        if shards < 2:
+            return None
+        return functools.partial(getattr(sharding, name), shards=shards)
+
+    async def compare(
         self,
         t1: Any,
         t2: Any,
@@ -56,14 +368,20 @@ class DeepDiffMCP:
         ignore_numeric_type_changes: bool = False,
         ignore_string_case: bool = False,
         significant_digits: Optional[int] = None,
+        prune_identical: bool = False,
+        output_format: str = "full",
+        max_diffs: Optional[int] = None,
+        max_time_ms: Optional[float] = None,
+        shards: Optional[int] = None,
+        budget: Optional[Dict[str, float]] = None,
         ctx: Optional[Context] = None,
     ) -> Dict:
         """
         Compare two objects and return their differences.
-        
+
         Args:
-            t1: First object to compare
-            t2: Second object to compare
+            t1: First object to compare (or {"$ref": handle} from put_object)
+            t2: Second object to compare (or {"$ref": handle} from put_object)
             ignore_order: Whether to ignore order in iterables
             report_repetition: Whether to report repetitions when ignore_order=True
             exclude_paths: Paths to exclude from comparison
@@ -73,54 +391,143 @@ class DeepDiffMCP:
             ignore_numeric_type_changes: Whether to ignore numeric type changes
             ignore_string_case: Whether to ignore string case
             significant_digits: Number of significant digits to consider for float comparison
+            prune_identical: Whether to skip the subtrees that are identical on
+                both sides before running DeepDiff. The result is the same;
+                this is much faster for large objects with few differences.
+            output_format: "full" (the DeepDiff result), "tree_summary"
+                (change counts per report type and top-level key),
+                "paths_only" (changed paths without values), "json_patch"
+                (RFC 6902 operations) or "compact" (paths as indices into a
+                table of keys)
+            max_diffs: Stop once this many differences were found
+            max_time_ms: Stop comparing after this many milliseconds
+            shards: Split the comparison of a very large top-level dict or
+                list into up to this many parts compared in parallel by the
+                server's workers. The result is the same. Comparisons with
+                max_diffs, max_time_ms, exclude_paths, exclude_regex_paths,
+                report_repetition with ignore_order or the json_patch format
+                run whole.
+            budget: Limits for this call, tightening the server's, e.g.
+                {"timeout": 10, "max_memory_mb": 500, "max_nodes": 1000000}
+                (seconds, MB of memory growth, nodes visited); with shards,
+                every part gets them
             ctx: MCP context
-            
-        Returns:
-            Dictionary containing the differences
-        """
-        if ctx:
-            ctx.info("Comparing objects...")
-            
-        # Convert exclude_types from string to actual types if provided
-        actual_exclude_types = None
-        if exclude_types:
-            type_map = {
-                "str": str,
-                "int": int,
-                "float": float,
-                "bool": bool,
-                "list": list,
-                "dict": dict,
-                "tuple": tuple,
-                "set": set,
-                "frozenset": frozenset,
-                "bytes": bytes,
-                "bytearray": bytearray,
-                "complex": complex,
-                "NoneType": type(None),
-            }
-            actual_exclude_types = [type_map.get(t, t) for t in exclude_types]
-            
-        diff = DeepDiff(
+
+        Returns:
+            Dictionary containing the differences, in the requested format,
+            with "truncated": true when max_diffs or max_time_ms stopped the
+            comparison before the end
+        """
+        if ctx:
+            await ctx.info("Comparing objects...")
+
+        limits = Budget.from_dict(budget)
+        result = await self._run_cached(
+            "compare",
+            operations.compare,
+            budget=limits,
+            planner=self._planner("plan_compare", shards),
+            # Where a time limit stops depends on the load; not cached
+            key_parts=None if max_time_ms is not None else _MISSING,
             t1=t1,
             t2=t2,
             ignore_order=ignore_order,
             report_repetition=report_repetition,
             exclude_paths=exclude_paths,
             exclude_regex_paths=exclude_regex_paths,
-            exclude_types=actual_exclude_types,
+            exclude_types=exclude_types,
             ignore_string_type_changes=ignore_string_type_changes,
             ignore_numeric_type_changes=ignore_numeric_type_changes,
             ignore_string_case=ignore_string_case,
             significant_digits=significant_digits,
+            prune=prune_identical,
+            output_format=output_format,
+            max_diffs=max_diffs,
+            max_time_ms=max_time_ms,
         )
-        
+
         if ctx:
-            ctx.info(f"Found {len(diff)} differences")
-            
-        return diff.to_dict()
-    
-    def get_deep_distance(
+            await ctx.info("Comparison completed")
+
+        return result
+
+    async def equal(
+        self,
+        t1: Any,
+        t2: Any,
+        ignore_order: bool = False,
+        report_repetition: bool = False,
+        exclude_paths: Optional[List[str]] = None,
+        exclude_regex_paths: Optional[List[str]] = None,
+        exclude_types: Optional[List[str]] = None,
+        ignore_string_type_changes: bool = False,
+        ignore_numeric_type_changes: bool = False,
+        ignore_string_case: bool = False,
+        significant_digits: Optional[int] = None,
+        max_time_ms: Optional[float] = None,
+        budget: Optional[Dict[str, float]] = None,
+        ctx: Optional[Context] = None,
+    ) -> Dict:
+        """
+        Tell whether two objects are equal, stopping at the first difference.
+
+        Much faster than compare when only a yes/no answer is needed: strictly
+        equal objects are recognized without walking them, and the comparison
+        stops as soon as a difference is found.
+
+        Args:
+            t1: First object to compare (or {"$ref": handle} from put_object)
+            t2: Second object to compare (or {"$ref": handle} from put_object)
+            ignore_order: Whether to ignore order in iterables
+            report_repetition: Whether to report repetitions when ignore_order=True
+            exclude_paths: Paths to exclude from comparison
+            exclude_regex_paths: Regex paths to exclude from comparison
+            exclude_types: Types to exclude from comparison
+            ignore_string_type_changes: Whether to ignore string type changes
+            ignore_numeric_type_changes: Whether to ignore numeric type changes
+            ignore_string_case: Whether to ignore string case
+            significant_digits: Number of significant digits to consider for
+                float comparison
+            max_time_ms: Give up after this many milliseconds of comparison
+            budget: Limits for this call, tightening the server's (see compare)
+            ctx: MCP context
+
+        Returns:
+            Dictionary with "equal" (null if max_time_ms ran out first), the
+            "method" that decided it and, for different objects, the report
+            type and path of the first "difference" found
+        """
+        # Objects stored under the same handle have the same contents
+        if is_ref(t1) and is_ref(t2) and t1[REF_KEY] == t2[REF_KEY]:
+            if t1[REF_KEY] in self.objects:
+                return {"equal": True, "method": "identical"}
+
+        limits = Budget.from_dict(budget)
+        result = await self._run_cached(
+            "equal",
+            operations.equal,
+            budget=limits,
+            key_parts=None if max_time_ms is not None else _MISSING,
+            t1=t1,
+            t2=t2,
+            ignore_order=ignore_order,
+            report_repetition=report_repetition,
+            exclude_paths=exclude_paths,
+            exclude_regex_paths=exclude_regex_paths,
+            exclude_types=exclude_types,
+            ignore_string_type_changes=ignore_string_type_changes,
+            ignore_numeric_type_changes=ignore_numeric_type_changes,
+            ignore_string_case=ignore_string_case,
+            significant_digits=significant_digits,
+            max_time_ms=max_time_ms,
+        )
+
+        if ctx and result.get("difference"):
+            await ctx.info(f"First difference at {result['difference']['path']}")
+
+        return result
+
+    async def get_deep_distance(
         self,
         t1: Any,
         t2: Any,
@@ -133,272 +540,1004 @@ class DeepDiffMCP:
         ignore_string_type_changes: bool = False,
         ignore_numeric_type_changes: bool = False,
         ignore_string_case: bool = False,
-        significant_digits: Optional[int] = None
+        significant_digits: Optional[int] = None,
+        shards: Optional[int] = None,
+        budget: Optional[Dict[str, float]] = None,
     ) -> float:
         """
         Get the deep distance between two objects.
-        
+
         Args:
-            t1: First object
-            t2: Second object
+            t1: First object (or {"$ref": handle} from put_object)
+            t2: Second object (or {"$ref": handle} from put_object)
             ignore_order: Whether to ignore order in iterables
+            shards: Split the comparison of a very large top-level dict or
+                list into up to this many parts (see compare)
+            budget: Limits for this call, tightening the server's (see compare)
             ctx: MCP context
-            
+
         Returns:
             Float representing the deep distance (between 0 and 1)
         """
         if ctx:
-            ctx.info("Calculating deep distance...")
-            
-        diff = DeepDiff(t1=t1, t2=t2, ignore_order=ignore_order, report_repetition=report_repetition,
+            await ctx.info("Calculating deep distance...")
+
+        limits = Budget.from_dict(budget)
+        distance = await self._run_cached(
+            "get_deep_distance",
+            operations.get_deep_distance,
+            budget=limits,
+            planner=self._planner("plan_distance", shards),
+            t1=t1,
+            t2=t2,
+            ignore_order=ignore_order,
+            report_repetition=report_repetition,
             exclude_paths=exclude_paths,
             exclude_regex_paths=exclude_regex_paths,
             exclude_types=exclude_types,
             ignore_string_type_changes=ignore_string_type_changes,
             ignore_numeric_type_changes=ignore_numeric_type_changes,
             ignore_string_case=ignore_string_case,
-            significant_digits=significant_digits)
-        distance = diff.get_deep_distance()
-        
+            significant_digits=significant_digits,
+        )
+
         if ctx:
-            ctx.info(f"Deep distance: {distance}")
-            
+            await ctx.info(f"Deep distance: {distance}")
+
         return distance
-    
-    def search(
+
+    async def search(
         self,
         obj: Any,
         item: Any,
         case_sensitive: bool = False,
         exact_match: bool = False,
+        index: Optional[str] = None,
+        items: Optional[List[Any]] = None,
+        use_regexp: bool = False,
         ctx: Optional[Context] = None,
     ) -> Dict:
         """
         Search for an item in an object.
-        
+
         Args:
-            obj: Object to search in
+            obj: Object to search in (or {"$ref": handle} from put_object). With
+                an index it is only used to check that the index is up to
+                date and may be null.
             item: Item to search for
             case_sensitive: Whether the search is case-sensitive
             exact_match: Whether to perform an exact match
+            index: Handle from build_search_index to look the item up in
+                instead of walking the object
+            items: Several items to search for in a single traversal, instead
+                of item (which may then be null)
+            use_regexp: Whether the item(s) are regular expressions
             ctx: MCP context
-            
+
         Returns:
-            Dictionary containing search results
+            Dictionary containing search results. With items, a dictionary
+            with "results": one entry per item, holding the "item" and its
+            search results.
         """
         if ctx:
-            ctx.info(f"Searching for {item}...")
-            
-        result = DeepSearch(
-            obj=obj,
-            item=item,
-            case_sensitive=case_sensitive,
-            exact_match=exact_match,
+            await ctx.info(f"Searching for {items if items is not None else item}...")
+
+        result = await self._search(
+            "search",
+            operations.search,
+            obj,
+            item,
+            items,
+            case_sensitive,
+            exact_match,
+            use_regexp,
+            index,
         )
-        
+
         if ctx:
-            paths_count = sum(len(paths) for paths in result.values())
-            ctx.info(f"Found {paths_count} matches")
-            
+            await ctx.info(f"Found {_count_matches(result)} matches")
+
         return result
-    
-    def grep(
+
+    async def grep(
         self,
         obj: Any,
         item: Any,
         case_sensitive: bool = False,
         exact_match: bool = False,
+        index: Optional[str] = None,
+        items: Optional[List[Any]] = None,
+        use_regexp: bool = False,
         ctx: Optional[Context] = None,
     ) -> Dict:
         """
         Grep for an item in an object.
-        
+
         Args:
-            obj: Object to grep in
+            obj: Object to grep in (or {"$ref": handle} from put_object). With
+                an index it is only used to check that the index is up to
+                date and may be null.
             item: Item to grep for
             case_sensitive: Whether the grep is case-sensitive
             exact_match: Whether to perform an exact match
+            index: Handle from build_search_index to look the item up in
+                instead of walking the object
+            items: Several items to grep for in a single traversal, instead of
+                item (which may then be null)
+            use_regexp: Whether the item(s) are regular expressions
             ctx: MCP context
-            
+
         Returns:
-            Dictionary containing grep results
+            Dictionary containing grep results. With items, a dictionary with
+            "results": one entry per item, holding the "item" and its grep
+            results.
         """
         if ctx:
-            ctx.info(f"Grepping for {item}...")
-            
-        result = grep(
-            obj=obj,
-            item=item,
-            case_sensitive=case_sensitive,
-            exact_match=exact_match,
+            await ctx.info(f"Grepping for {items if items is not None else item}...")
+
+        result = await self._search(
+            "grep",
+            operations.grep,
+            obj,
+            item,
+            items,
+            case_sensitive,
+            exact_match,
+            use_regexp,
+            index,
         )
-        
+
         if ctx:
-            paths_count = sum(len(paths) for paths in result.values())
-            ctx.info(f"Found {paths_count} matches")
-            
+            await ctx.info(f"Found {_count_matches(result)} matches")
+
         return result
-    
-    def hash_object(
+
+    async def _search(
         self,
+        tool: str,
+        func: Callable[..., Any],
         obj: Any,
-        exclude_types: Optional[List[str]] = None,
-        exclude_paths: Optional[List[str]] = None,
-        exclude_regex_paths: Optional[List[str]] = None,
-        ctx: Optional[Context] = None,
+        item: Any,
+        items: Optional[List[Any]],
+        case_sensitive: bool,
+        match_string: bool,
+        use_regexp: bool,
+        index: Optional[str],
     ) -> Dict:
-        """
-        Hash an object based on its content.
-        
-        Args:
-            obj: Object to hash
-            exclude_types: Types to exclude from hashing
-            exclude_paths: Paths to exclude from hashing
-            exclude_regex_paths: Regex paths to exclude from hashing
-            ctx: MCP context
-            
-        Returns:
-            Dictionary mapping objects to their hashes
-        """
-        if ctx:
-            ctx.info("Hashing object...")
-            
-        # Convert exclude_types from string to actual types if provided
-        actual_exclude_types = None
-        if exclude_types:
-            type_map = {
-                "str": str,
-                "int": int,
-                "float": float,
-                "bool": bool,
-                "list": list,
-                "dict": dict,
-                "tuple": tuple,
-                "set": set,
-                "frozenset": frozenset,
-                "bytes": bytes,
-                "bytearray": bytearray,
-                "complex": complex,
-                "NoneType": type(None),
-            }
-            actual_exclude_types = [type_map.get(t, t) for t in exclude_types]
-            
-        hasher = DeepHash(
-            obj,
-            exclude_types=actual_exclude_types,
-            exclude_paths=exclude_paths,
-            exclude_regex_paths=exclude_regex_paths,
+        """Run search or grep for one item or several, with or without an index."""
+        options = dict(
+            case_sensitive=case_sensitive,
+            match_string=match_string,
+            use_regexp=use_regexp,
         )
-        
-        # Convert the DeepHash object to a dict for serialization
-        # We only return the hash of the root object as the full hasher 
-        # contains references to all sub-objects which may not be serializable
-        result = {"hash": hasher[obj]}
-        
-        if ctx:
-            ctx.info("Hash calculated successfully")
-            
-        return result
-    
-    def create_delta(
+        terms = [item] if items is None else items
+
+        results = None
+        if index is not None:
+            results = await self._search_index(index, obj, terms, **options)
+        if results is None:
+            if items is None:
+                results = [await self._run(tool, func, obj=obj, item=item, **options)]
+            else:
+                results = await self._run(
+                    tool, search_many, obj=obj, items=items, **options
+                )
+
+        if items is None:
+            return results[0]
+        grouped = [{"item": term, **found} for term, found in zip(items, results)]
+        return {"results": grouped}
+
+    async def _search_index(
         self,
-        t1: Any,
-        t2: Any,
+        index: str,
+        obj: Any,
+        items: List[Any],
+        **options: Any,
+    ) -> Optional[List[Dict]]:
+        """
+        Look items up in a search index.
+
+        Returns:
+            The search results of each item, or None if the index does not
+            match obj, which the caller should then search instead
+        """
+        search_index = self.objects.resolve({REF_KEY: index})
+        if not isinstance(search_index, SearchIndex):
+            raise ValueError(f"Handle is not a search index: {index}")
+        if obj is not None:
+            if is_ref(obj):
+                source = obj[REF_KEY]
+            else:
+                source = await asyncio.to_thread(content_handle, obj)
+            # Computed in the executor when the index was built or updated
+            if source != search_index.source:
+                return None
+        return await asyncio.to_thread(search_index.search_many, items, **options)
+
+    async def build_search_index(
+        self,
+        obj: Any,
         ctx: Optional[Context] = None,
-        ignore_order: bool = False,
-        report_repetition: bool = False,
-        exclude_paths: Optional[List[str]] = None,
-        exclude_regex_paths: Optional[List[str]] = None,
-        exclude_types: Optional[List[str]] = None,
-        ignore_string_type_changes: bool = False,
-        ignore_numeric_type_changes: bool = False,
-        ignore_string_case: bool = False,
-        significant_digits: Optional[int] = None
     ) -> Dict:
         """
-        Create a delta that can be used to transform t1 into t2.
-        
+        Index an object for repeated search and grep calls.
+
+        The object is walked once; search and grep given the returned handle
+        as index then look items up without walking it again.
+
         Args:
-            t1: Source object
-            t2: Target object
+            obj: Object to index (or {"$ref": handle} from put_object)
             ctx: MCP context
-            
+
         Returns:
-            Serializable delta representation
+            Dictionary with the "index" handle, the number of indexed "paths"
+            and the "source" handle the indexed object has in the object store
         """
         if ctx:
-            ctx.info("Creating delta...")
-            
-        diff = DeepDiff(t1=t1, t2=t2, ignore_order=ignore_order,
-            report_repetition=report_repetition,
-            exclude_paths=exclude_paths,
-            exclude_regex_paths=exclude_regex_paths,
-            exclude_types=exclude_types,
-            ignore_string_type_changes=ignore_string_type_changes,
-            ignore_numeric_type_changes=ignore_numeric_type_changes,
-            ignore_string_case=ignore_string_case,
-            significant_digits=significant_digits)
-        delta = Delta(diff)
-        
-        # Convert to a serializable format
-        return delta.to_dict()
-    
-    def apply_delta(
+            await ctx.info("Building search index...")
+
+        built = await self._run("build_search_index", build_search_index, obj=obj)
+        search_index = built["index"]
+        stored = await asyncio.to_thread(
+            self.objects.put, search_index, handle=new_handle()
+        )
+
+        if ctx:
+            await ctx.info(f"Indexed {len(search_index)} paths")
+
+        return {
+            "index": stored["handle"],
+            "paths": len(search_index),
+            "source": built["source"],
+        }
+
+    async def update_search_index(
         self,
-        obj: Any,
-        delta_dict: Dict,
+        index: str,
+        delta: Dict,
         ctx: Optional[Context] = None,
-    ) -> Any:
+    ) -> Dict:
         """
-        Apply a delta to an object.
-        
+        Apply a delta to an indexed object and update its index.
+
+        Only the parts of the index under the paths the delta touches are
+        rebuilt. The index keeps its handle.
+
         Args:
-            obj: Object to transform
-            delta_dict: Delta dictionary created by create_delta
+            index: Handle from build_search_index
+            delta: Delta as returned by create_delta
             ctx: MCP context
-            
+
         Returns:
-            Transformed object
+            Dictionary with the "index" handle, the number of indexed "paths",
+            the "source" handle of the updated object and the number of
+            "reindexed_subtrees"
         """
         if ctx:
-            ctx.info("Applying delta...")
-            
-        delta = Delta(delta_dict)
-        result = obj + delta
-        
-        if ctx:
-            ctx.info("Delta applied successfully")
-            
-        return result
-    
-    def extract_path(
+            await ctx.info("Updating search index...")
+
+        async def update(current: SearchIndex) -> Tuple[SearchIndex, Dict]:
+            result = await self._run(
+                "update_search_index",
+                update_search_index,
+                index=current,
+                delta_dict=delta,
+            )
+            return result["index"], result
+
+        # Searches go on with the old index until the new one is stored
+        result = await self._update_stored(index, SearchIndex, "search index", update)
+        search_index = result["index"]
+
+        return {
+            "index": index,
+            "paths": len(search_index),
+            "source": result["source"],
+            "reindexed_subtrees": result["reindexed_subtrees"],
+        }
+
+    async def search_file(
         self,
-        obj: Any,
-        path: str,
+        file_path: str,
+        item: Any,
+        case_sensitive: bool = False,
+        exact_match: bool = False,
+        use_regexp: bool = False,
+        max_matches: Optional[int] = None,
         ctx: Optional[Context] = None,
-    ) -> Any:
+    ) -> Dict:
         """
-        Extract a value from an object using a path.
-        
+        Search for an item in a local file (CSV, Excel, JSON or NDJSON).
+
+        The file is read on the server one top-level item at a time, so it is
+        never sent over the protocol nor, for JSON, NDJSON and CSV files,
+        loaded whole.
+
         Args:
-            obj: Object to extract from
-            path: Path to extract
+            file_path: Path to the file to search in
+            item: Item to search for
+            case_sensitive: Whether the search is case-sensitive
+            exact_match: Whether to perform an exact match
+            use_regexp: Whether the item is a regular expression
+            max_matches: Stop reading the file after this many matches
             ctx: MCP context
-            
+
         Returns:
-            Extracted value
+            Dictionary containing search results, with "truncated" set when
+            the search stopped at max_matches
         """
         if ctx:
-            ctx.info(f"Extracting path: {path}")
-            
-        result = extract(obj, path)
-        
-        if ctx:
-            ctx.info("Extraction completed")
-            
-        return result
-        
-    def compare_files(
+            await ctx.info(f"Searching {file_path} for {item}...")
+
+        result = await self._run_file(
+            "search_file",
+            operations.search_file,
+            file_path,
+            ctx=ctx,
+            item=item,
+            case_sensitive=case_sensitive,
+            match_string=exact_match,
+            use_regexp=use_regexp,
+            max_matches=max_matches,
+        )
+
+        if ctx:
+            await ctx.info(f"Found {_count_matches(result)} matches")
+
+        return result
+
+    async def grep_file(
+        self,
+        file_path: str,
+        item: Any,
+        case_sensitive: bool = False,
+        exact_match: bool = False,
+        use_regexp: bool = False,
+        max_matches: Optional[int] = None,
+        ctx: Optional[Context] = None,
+    ) -> Dict:
+        """
+        Grep for an item in a local file (CSV, Excel, JSON or NDJSON).
+
+        The file is read on the server one top-level item at a time; see
+        search_file.
+
+        Args:
+            file_path: Path to the file to grep in
+            item: Item to grep for
+            case_sensitive: Whether the grep is case-sensitive
+            exact_match: Whether to perform an exact match
+            use_regexp: Whether the item is a regular expression
+            max_matches: Stop reading the file after this many matches
+            ctx: MCP context
+
+        Returns:
+            Dictionary containing grep results, with "truncated" set when the
+            grep stopped at max_matches
+        """
+        if ctx:
+            await ctx.info(f"Grepping {file_path} for {item}...")
+
+        result = await self._run_file(
+            "grep_file",
+            operations.grep_file,
+            file_path,
+            ctx=ctx,
+            item=item,
+            case_sensitive=case_sensitive,
+            match_string=exact_match,
+            use_regexp=use_regexp,
+            max_matches=max_matches,
+        )
+
+        if ctx:
+            await ctx.info(f"Found {_count_matches(result)} matches")
+
+        return result
+
+    async def hash_object(
+        self,
+        obj: Any,
+        exclude_types: Optional[List[str]] = None,
+        exclude_paths: Optional[List[str]] = None,
+        exclude_regex_paths: Optional[List[str]] = None,
+        tree: bool = False,
+        previous_tree: Optional[str] = None,
+        return_hashes: bool = False,
+        ctx: Optional[Context] = None,
+    ) -> Dict:
+        """
+        Hash an object based on its content.
+
+        With tree=True the hash of every subtree is kept in a Merkle tree stored
+        on the server. Passing its handle as previous_tree when hashing the
+        next version of the object rehashes only the subtrees that changed and
+        reports the paths that differ.
+
+        Args:
+            obj: Object to hash (or {"$ref": handle} from put_object)
+            exclude_types: Types to exclude from hashing
+            exclude_paths: Paths to exclude from hashing
+            exclude_regex_paths: Regex paths to exclude from hashing
+            tree: Whether to build and store a Merkle tree of the object
+            previous_tree: Handle of a tree from an earlier call (implies tree=True)
+            return_hashes: Whether to return the hash of every path (implies tree=True)
+            ctx: MCP context
+
+        Returns:
+            Dictionary with the object's hash. Trees also return the "tree"
+            handle and the number of "rehashed_nodes", plus the
+            "changed_paths" since previous_tree and the "hashes" by path when
+            requested. A tree's hash is not comparable with a plain DeepHash.
+        """
+        if ctx:
+            await ctx.info("Hashing object...")
+
+        if not (tree or previous_tree or return_hashes):
+            result = await self._run(
+                "hash_object",
+                operations.hash_object,
+                obj=obj,
+                exclude_types=exclude_types,
+                exclude_paths=exclude_paths,
+                exclude_regex_paths=exclude_regex_paths,
+            )
+        else:
+            previous = None
+            if previous_tree is not None:
+                previous = self.objects.resolve({REF_KEY: previous_tree})
+                if not isinstance(previous, MerkleTree):
+                    raise ValueError(f"Handle is not a hash tree: {previous_tree}")
+
+            result = await self._run(
+                "hash_object",
+                hash_tree,
+                obj=obj,
+                previous=previous,
+                return_hashes=return_hashes,
+                exclude_types=exclude_types,
+                exclude_paths=exclude_paths,
+                exclude_regex_paths=exclude_regex_paths,
+            )
+            stored = await asyncio.to_thread(self.objects.put, result["tree"])
+            result["tree"] = stored["handle"]
+
+        if ctx:
+            await ctx.info("Hash calculated successfully")
+
+        return result
+
+    async def hash_file(
+        self,
+        file_path: str,
+        raw: bool = False,
+        exclude_types: Optional[List[str]] = None,
+        exclude_paths: Optional[List[str]] = None,
+        exclude_regex_paths: Optional[List[str]] = None,
+        ctx: Optional[Context] = None,
+    ) -> Dict:
+        """
+        Hash the contents of a local file (CSV, Excel, JSON or NDJSON).
+
+        The file is hashed on the server one top-level item at a time. For
+        JSON, NDJSON and Excel files the hash is the one hash_object returns
+        for the parsed document with tree=True, so a file can be checked
+        against an object hashed earlier. CSV column types are inferred for
+        each block of rows, so a CSV file hashes the same as itself but not
+        necessarily as the table loaded whole.
+
+        Args:
+            file_path: Path to the file to hash
+            raw: Whether to hash the file's bytes instead of its contents
+                (works for any file; read in chunks)
+            exclude_types: Types to exclude from hashing
+            exclude_paths: Paths to exclude from hashing
+            exclude_regex_paths: Regex paths to exclude from hashing
+            ctx: MCP context
+
+        Returns:
+            Dictionary with the "hash" and the number of top-level "items",
+            or with the "hash" and size in "bytes" when raw is True
+        """
+        if ctx:
+            await ctx.info(f"Hashing {file_path}...")
+
+        result = await self._run_file(
+            "hash_file",
+            operations.hash_file,
+            file_path,
+            ctx=ctx,
+            raw=raw,
+            exclude_types=exclude_types,
+            exclude_paths=exclude_paths,
+            exclude_regex_paths=exclude_regex_paths,
+        )
+
+        if ctx:
+            await ctx.info("Hash calculated successfully")
+
+        return result
+
+    async def create_delta(
+        self,
+        t1: Any,
+        t2: Any,
+        ctx: Optional[Context] = None,
+        ignore_order: bool = False,
+        report_repetition: bool = False,
+        exclude_paths: Optional[List[str]] = None,
+        exclude_regex_paths: Optional[List[str]] = None,
+        exclude_types: Optional[List[str]] = None,
+        ignore_string_type_changes: bool = False,
+        ignore_numeric_type_changes: bool = False,
+        ignore_string_case: bool = False,
+        significant_digits: Optional[int] = None,
+        output_path: Optional[str] = None,
+    ) -> Dict:
+        """
+        Create a delta that can be used to transform t1 into t2.
+
+        Args:
+            t1: Source object (or {"$ref": handle} from put_object)
+            t2: Target object (or {"$ref": handle} from put_object)
+            ctx: MCP context
+            output_path: Write the delta to this binary file on the server
+                (for apply_delta_file) and return only a summary
+
+        Returns:
+            Serializable delta representation, or the "output_path", its
+            size in "bytes" and the number of "changes" by report type when
+            output_path is given
+        """
+        if ctx:
+            await ctx.info("Creating delta...")
+
+        options = dict(
+            ignore_order=ignore_order,
+            report_repetition=report_repetition,
+            exclude_paths=exclude_paths,
+            exclude_regex_paths=exclude_regex_paths,
+            exclude_types=exclude_types,
+            ignore_string_type_changes=ignore_string_type_changes,
+            ignore_numeric_type_changes=ignore_numeric_type_changes,
+            ignore_string_case=ignore_string_case,
+            significant_digits=significant_digits,
+        )
+        if output_path is not None:
+            return await self._run(
+                "create_delta",
+                delta_files.dump_delta,
+                t1=t1,
+                t2=t2,
+                output_path=output_path,
+                **options,
+            )
+
+        return await self._run_cached(
+            "create_delta", operations.create_delta, t1=t1, t2=t2, **options
+        )
+
+    async def apply_delta(
+        self,
+        obj: Any,
+        delta_dict: Dict,
+        ctx: Optional[Context] = None,
+    ) -> Any:
+        """
+        Apply a delta to an object.
+
+        Args:
+            obj: Object to transform (or {"$ref": handle} from put_object)
+            delta_dict: Delta dictionary created by create_delta (or
+                {"$ref": handle} from put_object)
+            ctx: MCP context
+
+        Returns:
+            Transformed object
+        """
+        if ctx:
+            await ctx.info("Applying delta...")
+
+        result = await self._run(
+            "apply_delta", operations.apply_delta, obj=obj, delta_dict=delta_dict
+        )
+
+        if ctx:
+            await ctx.info("Delta applied successfully")
+
+        return result
+
+    async def apply_deltas(
+        self,
+        obj: Any,
+        deltas: List[Dict],
+        ctx: Optional[Context] = None,
+    ) -> Any:
+        """
+        Apply a chain of deltas to an object.
+
+        The object is copied once and the deltas are applied to the copy in
+        place, which is much faster than calling apply_delta for each one.
+
+        Args:
+            obj: Object to transform (or {"$ref": handle} from put_object)
+            deltas: Delta dictionaries created by create_delta, in order
+            ctx: MCP context
+
+        Returns:
+            Transformed object
+        """
+        if ctx:
+            await ctx.info(f"Applying {len(deltas)} deltas...")
+
+        result = await self._run("apply_deltas", apply_deltas, obj=obj, deltas=deltas)
+
+        if ctx:
+            await ctx.info("Deltas applied successfully")
+
+        return result
+
+    async def squash_deltas(
+        self,
+        obj: Any,
+        deltas: List[Dict],
+        ignore_order: bool = False,
+        report_repetition: bool = False,
+        ctx: Optional[Context] = None,
+    ) -> Dict:
+        """
+        Compose a chain of deltas into one equivalent delta.
+
+        Args:
+            obj: Object the first delta applies to (or {"$ref": handle} from
+                put_object); delta paths refer to the state they were created
+                from, so the chain is composed by replaying it on obj
+            deltas: Delta dictionaries created by create_delta, in order
+            ignore_order: Whether to ignore order in iterables in the composed
+                delta (requires report_repetition)
+            report_repetition: Whether to report repetitions when ignore_order=True
+            ctx: MCP context
+
+        Returns:
+            Delta transforming obj into the end of the chain
+        """
+        if ctx:
+            await ctx.info(f"Squashing {len(deltas)} deltas...")
+
+        return await self._run(
+            "squash_deltas",
+            squash_deltas,
+            obj=obj,
+            deltas=deltas,
+            ignore_order=ignore_order,
+            report_repetition=report_repetition,
+        )
+
+    async def _update_stored(
+        self,
+        handle: str,
+        kind: type,
+        name: str,
+        update: Callable[[Any], Awaitable[Tuple[Any, Any]]],
+    ) -> Any:
+        """
+        Replace a stored history or search index with an updated copy.
+
+        Updates of the same handle run one at a time in this process. When
+        another process sharing the object store replaced the object in the
+        meantime, the update is made again from its version, so none is lost.
+
+        Args:
+            handle: Handle of the stored object
+            kind: Type the stored object must have
+            name: What the object is, for errors
+            update: Coroutine function taking the stored object and returning
+                (the updated copy, the result to return)
+
+        Returns:
+            The result of the update that was stored
+        """
+        lock = self._update_locks.setdefault(handle, asyncio.Lock())
+        async with lock:
+            while True:
+                try:
+                    current, revision = await asyncio.to_thread(
+                        self.objects.get_revision, handle
+                    )
+                except (KeyError, TypeError):
+                    raise ValueError(f"Unknown or expired object handle: {handle}")
+                if not isinstance(current, kind):
+                    raise ValueError(f"Handle is not a {name}: {handle}")
+                updated, result = await update(current)
+                stored = await asyncio.to_thread(
+                    self.objects.replace, handle, updated, revision
+                )
+                if stored is not None:
+                    return result
+
+    def _history(self, handle: str) -> DeltaHistory:
+        history = self.objects.resolve({REF_KEY: handle})
+        if not isinstance(history, DeltaHistory):
+            raise ValueError(f"Handle is not a delta history: {handle}")
+        return history
+
+    async def create_history(
+        self,
+        obj: Any,
+        keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL,
+        ctx: Optional[Context] = None,
+    ) -> Dict:
+        """
+        Start a versioned history of an object, stored on the server.
+
+        Versions are stored as deltas, with a full snapshot (keyframe) every
+        keyframe_interval versions, so get_version replays at most that many
+        deltas.
+
+        Args:
+            obj: First version of the object (or {"$ref": handle} from put_object)
+            keyframe_interval: Keep a full snapshot every this many versions
+            ctx: MCP context
+
+        Returns:
+            Dictionary with the "history" handle and the "version" (0)
+        """
+        history = await self._run(
+            "create_history",
+            create_history,
+            obj=obj,
+            keyframe_interval=keyframe_interval,
+        )
+        stored = await asyncio.to_thread(
+            self.objects.put, history, handle=new_handle()
+        )
+        return {"history": stored["handle"], "version": history.version}
+
+    async def append_history(
+        self,
+        history: str,
+        delta: Optional[Dict] = None,
+        obj: Any = None,
+        ctx: Optional[Context] = None,
+    ) -> Dict:
+        """
+        Add a version to a history, from a delta or from the new object.
+
+        The history keeps its handle. If the version cannot be added, the
+        history is left as it was.
+
+        Args:
+            history: Handle from create_history
+            delta: Delta from the latest version to the new one, as returned
+                by create_delta
+            obj: The new version (or {"$ref": handle} from put_object), used
+                when no delta is given
+            ctx: MCP context
+
+        Returns:
+            Dictionary with the "history" handle, the new "version" and the
+            "delta" that was appended
+        """
+        if delta is None and obj is None:
+            raise ValueError("Either delta or obj must be given")
+        async def append(current: DeltaHistory) -> Tuple[DeltaHistory, Dict]:
+            appended = delta
+            if appended is None:
+                # Only the latest version is sent to the executor
+                appended = await self._run(
+                    "append_history", operations.create_delta, t1=current.latest, t2=obj
+                )
+            updated = await asyncio.to_thread(current.appended, appended)
+            return updated, {"version": updated.version, "delta": appended}
+
+        result = await self._update_stored(
+            history, DeltaHistory, "delta history", append
+        )
+
+        if ctx:
+            await ctx.info(f"Appended version {result['version']}")
+
+        return {"history": history, **result}
+
+    async def get_version(
+        self,
+        history: str,
+        version: Optional[int] = None,
+        ctx: Optional[Context] = None,
+    ) -> Any:
+        """
+        Rebuild a version of an object from its history.
+
+        Args:
+            history: Handle from create_history
+            version: Version number (default: the latest); negative numbers
+                count back from the latest
+            ctx: MCP context
+
+        Returns:
+            The object at that version
+        """
+        obj, deltas = self._history(history).chain(version)
+        return await self._run("get_version", apply_deltas, obj=obj, deltas=deltas)
+
+    async def create_delta_file(
+        self,
+        file1_path: str,
+        file2_path: str,
+        output_path: str,
+        ignore_order: bool = False,
+        report_repetition: bool = False,
+        exclude_paths: Optional[List[str]] = None,
+        exclude_regex_paths: Optional[List[str]] = None,
+        ignore_string_type_changes: bool = False,
+        ignore_numeric_type_changes: bool = False,
+        ignore_string_case: bool = False,
+        significant_digits: Optional[int] = None,
+        ctx: Optional[Context] = None,
+    ) -> Dict:
+        """
+        Create the delta between two local files and write it to a binary file.
+
+        Neither the files nor the delta are sent over the protocol.
+
+        Args:
+            file1_path: Path to the source file (CSV, Excel, JSON or NDJSON)
+            file2_path: Path to the target file
+            output_path: Path of the delta file to write
+            ignore_order: Whether to ignore order in iterables (requires
+                report_repetition)
+            report_repetition: Whether to report repetitions when ignore_order=True
+            exclude_paths: Paths to exclude from comparison
+            exclude_regex_paths: Regex paths to exclude from comparison
+            ignore_string_type_changes: Whether to ignore string type changes
+            ignore_numeric_type_changes: Whether to ignore numeric type changes
+            ignore_string_case: Whether to ignore string case
+            significant_digits: Number of significant digits to consider for
+                float comparison
+            ctx: MCP context
+
+        Returns:
+            Dictionary with the "output_path", its size in "bytes" and the
+            number of "changes" by report type
+        """
+        if ctx:
+            await ctx.info(f"Creating delta from {file1_path} to {file2_path}...")
+
+        try:
+            return await self._run(
+                "create_delta_file",
+                delta_files.dump_file_delta,
+                file1_path=file1_path,
+                file2_path=file2_path,
+                output_path=output_path,
+                ignore_order=ignore_order,
+                report_repetition=report_repetition,
+                exclude_paths=exclude_paths,
+                exclude_regex_paths=exclude_regex_paths,
+                ignore_string_type_changes=ignore_string_type_changes,
+                ignore_numeric_type_changes=ignore_numeric_type_changes,
+                ignore_string_case=ignore_string_case,
+                significant_digits=significant_digits,
+            )
+        except ValueError as e:
+            if ctx:
+                await ctx.error(str(e))
+            raise
+
+    async def apply_delta_file(
+        self,
+        source_path: str,
+        delta_path: str,
+        output_path: str,
+        ctx: Optional[Context] = None,
+    ) -> Dict:
+        """
+        Apply a delta file to a local file and write the result to another file.
+
+        Changes inside top-level records, and records replaced, added or
+        removed, are applied while the source is streamed one record at a
+        time; other deltas are applied to the whole document.
+
+        Args:
+            source_path: Path to the file to patch (CSV, Excel, JSON or NDJSON)
+            delta_path: Path to a delta file from create_delta or create_delta_file
+            output_path: Path of the JSON, NDJSON or CSV file to write; may be
+                source_path to patch the file in place
+            ctx: MCP context
+
+        Returns:
+            Dictionary with the "output_path", its size in "bytes", the number
+            of top-level "items" written, whether the source was "streamed"
+            and the number of "changes" by report type
+        """
+        if ctx:
+            await ctx.info(f"Applying {delta_path} to {source_path}...")
+
+        try:
+            result = await self._run(
+                "apply_delta_file",
+                delta_files.apply_delta_file,
+                source_path=source_path,
+                delta_path=delta_path,
+                output_path=output_path,
+            )
+        except (ValueError, FileNotFoundError) as e:
+            if ctx:
+                await ctx.error(str(e))
+            raise
+
+        if ctx:
+            await ctx.info(f"Wrote {result['items']} items to {output_path}")
+
+        return result
+
+    async def extract_path(
+        self,
+        obj: Any,
+        path: str,
+        ctx: Optional[Context] = None,
+    ) -> Any:
+        """
+        Extract a value from an object using a path.
+
+        Args:
+            obj: Object to extract from (or {"$ref": handle} from put_object)
+            path: Path to extract
+            ctx: MCP context
+
+        Returns:
+            Extracted value
+        """
+        if ctx:
+            await ctx.info(f"Extracting path: {path}")
+
+        result = await self._run(
+            "extract_path", operations.extract_path, obj=obj, path=path
+        )
+
+        if ctx:
+            await ctx.info("Extraction completed")
+
+        return result
+
+    async def extract_path_file(
+        self,
+        file_path: str,
+        path: str,
+        ctx: Optional[Context] = None,
+    ) -> Any:
+        """
+        Extract a value from a local file (CSV, Excel, JSON or NDJSON) using a path.
+
+        Only the value at the path is loaded: JSON files are streamed down to
+        it and NDJSON lines or CSV rows before the selected record are skipped.
+
+        Args:
+            file_path: Path to the file to extract from
+            path: Path to extract, e.g. "root['config']" or "root[3]['name']"
+            ctx: MCP context
+
+        Returns:
+            Extracted value
+        """
+        if ctx:
+            await ctx.info(f"Extracting path {path} from {file_path}")
+
+        result = await self._run_file(
+            "extract_path_file",
+            operations.extract_path_file,
+            file_path,
+            ctx=ctx,
+            path=path,
+        )
+
+        if ctx:
+            await ctx.info("Extraction completed")
+
+        return result
+
+    async def compare_files(
         self,
         file1_path: str,
         file2_path: str,
@@ -410,11 +1549,19 @@ class DeepDiffMCP:
         ignore_numeric_type_changes: bool = True,  # Default True for file comparisons
         ignore_string_case: bool = False,
         significant_digits: Optional[int] = None,
+        key_columns: Optional[List[str]] = None,
+        columnar: bool = False,
+        chunksize: Optional[int] = None,
+        max_memory_mb: Optional[float] = None,
+        output_path: Optional[str] = None,
+        include_paths: Optional[List[str]] = None,
+        output_format: str = "full",
+        budget: Optional[Dict[str, float]] = None,
         ctx: Optional[Context] = None,
     ) -> Dict:
         """
-        Compare two files (CSV, Excel, or JSON) and return their differences.
-        
+        Compare two files (CSV, Excel, JSON or NDJSON) and return their differences.
+
         Args:
             file1_path: Path to the first file
             file2_path: Path to the second file
@@ -426,51 +1573,554 @@ class DeepDiffMCP:
             ignore_numeric_type_changes: Whether to ignore numeric type changes (default: True for files)
             ignore_string_case: Whether to ignore string case
             significant_digits: Number of significant digits to consider for float comparison
+            key_columns: Columns forming a primary key. When given, rows are
+                matched by key instead of by position, so inserted or reordered
+                rows are reported once as added or removed
+            columnar: Whether to compare the files column by column with
+                vectorized pandas operations. Much faster on large tables;
+                cells that are empty in both files are considered equal
+            chunksize: Compare CSV files in aligned chunks of at most this many
+                rows, keeping only one chunk of each file in memory
+            max_memory_mb: Memory ceiling for a chunked comparison; chunks are
+                made smaller as needed to stay below it
+            output_path: Write the differences of a chunked comparison to this
+                NDJSON file as they are found and return only a summary
+            include_paths: Only compare these paths, e.g. ["root['config']"].
+                For JSON and NDJSON files only these paths are loaded. Not
+                supported by chunked comparisons.
+            output_format: "full", "tree_summary", "paths_only", "json_patch"
+                or "compact" (see compare). Added JSON object keys are only
+                expressed in a json_patch from compare; here they are listed
+                as unsupported.
+            budget: Limits for this call, tightening the server's (see compare)
             ctx: MCP context
-            
+
         Returns:
-            Dictionary containing the differences
+            Dictionary containing the differences, or a summary with the
+            output path and counts when output_path is given
         """
-        from .file_utils import load_data_from_file
-        
+        chunked = bool(chunksize or max_memory_mb or output_path)
         if ctx:
-            ctx.info(f"Loading data from {file1_path}...")
-            
+            await ctx.info(f"Loading and comparing {file1_path} and {file2_path}...")
+
+        options = dict(
+            ignore_order=ignore_order,
+            report_repetition=report_repetition,
+            exclude_paths=exclude_paths,
+            exclude_regex_paths=exclude_regex_paths,
+            ignore_string_type_changes=ignore_string_type_changes,
+            ignore_numeric_type_changes=ignore_numeric_type_changes,
+            ignore_string_case=ignore_string_case,
+            significant_digits=significant_digits,
+            key_columns=key_columns,
+            columnar=columnar,
+            chunksize=chunksize,
+            max_memory_mb=max_memory_mb,
+            include_paths=include_paths,
+            output_format=output_format,
+        )
+        # Unchanged files (same path, mtime and size) are never re-parsed.
+        # Calls writing an output file are not cached.
+        signatures = (file_signature(file1_path), file_signature(file2_path))
+        key_parts = None
+        if output_path is None and None not in signatures:
+            key_parts = (signatures, sorted(options.items()))
+
+        limits = Budget.from_dict(budget)
         try:
-            t1 = load_data_from_file(file1_path)
-        except Exception as e:
+            result = await self._run_cached(
+                "compare_files",
+                operations.compare_files,
+                budget=limits,
+                key_parts=key_parts,
+                file1_path=file1_path,
+                file2_path=file2_path,
+                output_path=output_path,
+                # Only chunked comparisons report progress, after each chunk
+                on_progress=ctx.report_progress if ctx and chunked else None,
+                **options,
+            )
+        except ValueError as e:
             if ctx:
-                ctx.error(f"Error loading {file1_path}: {str(e)}")
-            raise ValueError(f"Error loading {file1_path}: {str(e)}")
-            
+                await ctx.error(str(e))
+            raise
+
         if ctx:
-            ctx.info(f"Loading data from {file2_path}...")
-            
-        try:
-            t2 = load_data_from_file(file2_path)
-        except Exception as e:
-            if ctx:
-                ctx.error(f"Error loading {file2_path}: {str(e)}")
-            raise ValueError(f"Error loading {file2_path}: {str(e)}")
-        
+            await ctx.info("Comparison completed")
+
+        return result
+
+    async def compare_many(
+        self,
+        baseline: Any = None,
+        candidates: Optional[List[Any]] = None,
+        pairs: Optional[List[List[Any]]] = None,
+        ignore_order: bool = False,
+        report_repetition: bool = False,
+        exclude_paths: Optional[List[str]] = None,
+        exclude_regex_paths: Optional[List[str]] = None,
+        exclude_types: Optional[List[str]] = None,
+        ignore_string_type_changes: bool = False,
+        ignore_numeric_type_changes: bool = False,
+        ignore_string_case: bool = False,
+        significant_digits: Optional[int] = None,
+        budget: Optional[Dict[str, float]] = None,
+        ctx: Optional[Context] = None,
+    ) -> Dict:
+        """
+        Compare one baseline against many candidates, or many pairs, in one call.
+
+        The comparisons are split into batches that run in parallel on the
+        server's workers. Within a batch the baseline's hashes are computed
+        once and shared. A failing comparison is reported as an error entry
+        and does not fail the others.
+
+        Args:
+            baseline: Object every candidate is compared against
+                (or {"$ref": handle} from put_object)
+            candidates: Objects to compare with the baseline; each may be a
+                {"$ref": handle}
+            pairs: [t1, t2] pairs to compare, as an alternative to
+                baseline and candidates
+            ignore_order: Whether to ignore order in iterables
+            report_repetition: Whether to report repetitions when ignore_order=True
+            exclude_paths: Paths to exclude from comparison
+            exclude_regex_paths: Regex paths to exclude from comparison
+            exclude_types: Types to exclude from comparison
+            ignore_string_type_changes: Whether to ignore string type changes
+            ignore_numeric_type_changes: Whether to ignore numeric type changes
+            ignore_string_case: Whether to ignore string case
+            significant_digits: Number of significant digits to consider for
+                float comparison
+            budget: Limits for this call, tightening the server's (see compare)
+            ctx: MCP context
+
+        Returns:
+            Dictionary with "results": one entry per candidate or pair, in
+            order, holding its "index" and either its "diff" or an "error"
+        """
+        if (pairs is None) == (candidates is None):
+            raise ValueError("Provide either baseline and candidates, or pairs")
+
+        items = pairs if pairs is not None else candidates
+        results: List[Optional[Dict]] = [None] * len(items)
+        indices = []
+        resolved = []
+        for index, item in enumerate(items):
+            try:
+                if pairs is not None and isinstance(item, (list, tuple)):
+                    item = [self.objects.resolve(value) for value in item]
+                else:
+                    item = self.objects.resolve(item)
+            except ValueError as e:
+                results[index] = {"index": index, "error": f"ValueError: {str(e)}"}
+                continue
+            indices.append(index)
+            resolved.append(item)
+
         if ctx:
-            ctx.info("Comparing files...")
-            
-        return self.compare(
-            t1=t1,
-            t2=t2,
+            await ctx.info(f"Comparing {len(items)} items...")
+
+        options = dict(
             ignore_order=ignore_order,
             report_repetition=report_repetition,
             exclude_paths=exclude_paths,
             exclude_regex_paths=exclude_regex_paths,
+            exclude_types=exclude_types,
             ignore_string_type_changes=ignore_string_type_changes,
             ignore_numeric_type_changes=ignore_numeric_type_changes,
             ignore_string_case=ignore_string_case,
             significant_digits=significant_digits,
-            ctx=ctx,
         )
+        limits = Budget.from_dict(budget)
+        batch_count = min(self.executor.max_concurrency, len(resolved))
+        batches = []
+        for batch in range(batch_count):
+            start = len(resolved) * batch // batch_count
+            end = len(resolved) * (batch + 1) // batch_count
+            if pairs is not None:
+                batches.append(
+                    self._run(
+                        "compare_many",
+                        operations.compare_pairs,
+                        budget=limits,
+                        pairs=resolved[start:end],
+                        indices=indices[start:end],
+                        **options,
+                    )
+                )
+            else:
+                batches.append(
+                    self._run(
+                        "compare_many",
+                        operations.compare_batch,
+                        budget=limits,
+                        baseline=baseline,
+                        candidates=resolved[start:end],
+                        indices=indices[start:end],
+                        **options,
+                    )
+                )
+
+        for batch_results in await asyncio.gather(*batches):
+            for entry in batch_results:
+                results[entry["index"]] = entry
+
+        if ctx:
+            errors = sum(1 for entry in results if "error" in entry)
+            await ctx.info(f"Compared {len(items)} items ({errors} errors)")
 
+        return {"results": results}
 
-def create_server(name: str = "DeepDiff MCP") -> DeepDiffMCP:
-    """Create a new DeepDiff MCP server."""
-    return DeepDiffMCP(name)
\ No newline at end of file
+    async def find_nearest(
+        self,
+        query: Any,
+        corpus: Any,
+        k: int = 5,
+        max_distance: Optional[float] = None,
+        prune: bool = True,
+        max_candidates: Optional[int] = None,
+        ignore_order: bool = False,
+        report_repetition: bool = False,
+        exclude_paths: Optional[List[str]] = None,
+        exclude_regex_paths: Optional[List[str]] = None,
+        exclude_types: Optional[List[str]] = None,
+        ignore_string_type_changes: bool = False,
+        ignore_numeric_type_changes: bool = False,
+        ignore_string_case: bool = False,
+        significant_digits: Optional[int] = None,
+        budget: Optional[Dict[str, float]] = None,
+        ctx: Optional[Context] = None,
+    ) -> Dict:
+        """
+        Rank a corpus of objects by deep distance to a query and return the top k.
+
+        With prune=True, items with the same DeepHash as the query are matched
+        at distance 0 without a comparison, and the other items are narrowed
+        down to the most similar ones (MinHash/LSH over their leaf paths and
+        values) before the deep distance is computed. Pruning is a heuristic:
+        set prune=False to compute the exact distance of every item.
+
+        Args:
+            query: Object to find the nearest matches of
+                (or {"$ref": handle} from put_object)
+            corpus: List of objects to search; the list and each item may be a
+                {"$ref": handle}
+            k: Number of matches to return
+            max_distance: Only return matches at or below this distance
+            prune: Whether to prune the corpus before computing distances
+            max_candidates: Maximum number of items whose distance is computed
+                when pruning (default: 4 * k, at least 32)
+            ignore_order: Whether to ignore order in iterables
+            report_repetition: Whether to report repetitions when ignore_order=True
+            exclude_paths: Paths to exclude from comparison
+            exclude_regex_paths: Regex paths to exclude from comparison
+            exclude_types: Types to exclude from comparison
+            ignore_string_type_changes: Whether to ignore string type changes
+            ignore_numeric_type_changes: Whether to ignore numeric type changes
+            ignore_string_case: Whether to ignore string case
+            significant_digits: Number of significant digits to consider for
+                float comparison
+            budget: Limits for this call, tightening the server's (see compare)
+            ctx: MCP context
+
+        Returns:
+            Dictionary with "matches" (up to k entries with "index" and
+            "distance", nearest first), "scored" (number of items whose
+            distance was computed), "corpus_size" and "errors"
+        """
+        if k < 1:
+            raise ValueError("k must be at least 1")
+
+        query = self.objects.resolve(query)
+        corpus = self.objects.resolve(corpus)
+        if not isinstance(corpus, list):
+            raise ValueError("corpus must be a list")
+        corpus = [self.objects.resolve(item) for item in corpus]
+
+        options = dict(
+            ignore_order=ignore_order,
+            report_repetition=report_repetition,
+            exclude_paths=exclude_paths,
+            exclude_regex_paths=exclude_regex_paths,
+            exclude_types=exclude_types,
+            ignore_string_type_changes=ignore_string_type_changes,
+            ignore_numeric_type_changes=ignore_numeric_type_changes,
+            ignore_string_case=ignore_string_case,
+            significant_digits=significant_digits,
+        )
+
+        if ctx:
+            await ctx.info(f"Ranking {len(corpus)} items...")
+
+        limits = Budget.from_dict(budget)
+        matches = []
+        errors = []
+        candidates = list(range(len(corpus)))
+        if prune:
+            from .similarity import rank_candidates
+
+            ranked = await self._run(
+                "find_nearest",
+                rank_candidates,
+                budget=limits,
+                query=query,
+                corpus=corpus,
+                max_candidates=max_candidates or max(4 * k, 32),
+                **options,
+            )
+            matches = [
+                {"index": index, "distance": 0.0} for index in ranked["identical"]
+            ]
+            errors = [
+                {"index": index, "error": error} for index, error in ranked["errors"]
+            ]
+            candidates = ranked["candidates"] if len(matches) < k else []
+
+        batch_count = min(self.executor.max_concurrency, len(candidates))
+        batches = []
+        for batch in range(batch_count):
+            start = len(candidates) * batch // batch_count
+            end = len(candidates) * (batch + 1) // batch_count
+            batches.append(
+                self._run(
+                    "find_nearest",
+                    operations.distance_batch,
+                    budget=limits,
+                    t1=query,
+                    candidates=[corpus[index] for index in candidates[start:end]],
+                    indices=candidates[start:end],
+                    **options,
+                )
+            )
+        for batch_results in await asyncio.gather(*batches):
+            for entry in batch_results:
+                (errors if "error" in entry else matches).append(entry)
+
+        if max_distance is not None:
+            matches = [entry for entry in matches if entry["distance"] <= max_distance]
+        matches.sort(key=lambda entry: (entry["distance"], entry["index"]))
+
+        if ctx:
+            await ctx.info(f"Computed the distance of {len(candidates)} items")
+
+        return {
+            "matches": matches[:k],
+            "scored": len(candidates),
+            "corpus_size": len(corpus),
+            "errors": errors,
+        }
+
+    async def put_object(
+        self,
+        obj: Any,
+        ttl_seconds: Optional[float] = None,
+        ctx: Optional[Context] = None,
+    ) -> Dict:
+        """
+        Store an object on the server so it only has to be sent once.
+
+        Pass the returned handle as {"$ref": handle} in place of an object to
+        compare, get_deep_distance, search, grep, hash_object, create_delta,
+        apply_delta and extract_path. Objects are addressed by content, expire
+        after ttl_seconds without use and may be evicted when the store is full.
+
+        Args:
+            obj: Object to store
+            ttl_seconds: Seconds to keep the object after its last use; must
+                be positive (default: the server's object TTL)
+            ctx: MCP context
+
+        Returns:
+            Dictionary with the object's handle and size in bytes
+        """
+        # Pickling a large object to hash it takes a while
+        result = await asyncio.to_thread(self.objects.put, obj, ttl_seconds)
+
+        if ctx:
+            await ctx.info(
+                f"Stored object {result['handle']} ({result['size_bytes']} bytes)"
+            )
+
+        return result
+
+    async def drop_object(
+        self,
+        handle: str,
+        ctx: Optional[Context] = None,
+    ) -> Dict:
+        """
+        Remove an object stored with put_object.
+
+        Args:
+            handle: Handle returned by put_object
+            ctx: MCP context
+
+        Returns:
+            Dictionary telling whether the object was stored
+        """
+        return {"dropped": self.objects.drop(handle)}
+
+    def _gauges(self) -> Gauges:
+        """Get the current executor, cache and object store levels."""
+        running = {tool: self.executor.running(tool) for tool in self.executor.tools()}
+        cache = self.cache.stats()
+        objects = self.objects.stats()
+        return {
+            "deepdiff_mcp_running_calls": (
+                "Tool calls running in the worker pool.",
+                [({"tool": tool}, count) for tool, count in running.items()],
+            ),
+            "deepdiff_mcp_queued_calls": (
+                "Tool calls waiting for a worker pool slot.",
+                [
+                    ({"tool": tool}, self.executor.pending(tool) - count)
+                    for tool, count in running.items()
+                ],
+            ),
+            "deepdiff_mcp_result_cache_entries": (
+                "Results in the result cache.", [({}, cache["entries"])]
+            ),
+            "deepdiff_mcp_result_cache_bytes": (
+                "Size of the results in the result cache.", [({}, cache["bytes"])]
+            ),
+            "deepdiff_mcp_stored_objects": (
+                "Objects stored with put_object.", [({}, objects["objects"])]
+            ),
+            "deepdiff_mcp_stored_object_bytes": (
+                "Size of the objects stored with put_object.", [({}, objects["bytes"])]
+            ),
+        }
+
+    async def _metrics_endpoint(self, request: Request) -> PlainTextResponse:
+        """Serve the metrics in the Prometheus text format."""
+        return PlainTextResponse(
+            self.metrics.to_prometheus(self._gauges()),
+            media_type="text/plain; version=0.0.4",
+        )
+
+    async def server_stats(
+        self,
+        include_profiles: bool = False,
+        ctx: Optional[Context] = None,
+    ) -> Dict:
+        """
+        Get the server's metrics: calls, latencies, payload sizes and cache hits.
+
+        Latencies are split into phases: deserialize (argument validation),
+        cache (result cache key), queue (waiting for a worker), load (file
+        parsing), execute (DeepDiff itself), handler (the rest of the tool)
+        and serialize (encoding the result).
+
+        Args:
+            include_profiles: Whether to include the profiles of the slowest
+                calls (when the server profiles calls)
+            ctx: MCP context
+
+        Returns:
+            Dictionary with the metrics of each tool under "tools", the
+            "executor", "cache" and "objects" levels, and the "slowest"
+            profiled calls when asked for
+        """
+        stats = self.metrics.snapshot(include_profiles=include_profiles)
+        stats["executor"] = {
+            "kind": self.executor.kind,
+            "workers": self.executor.workers,
+            "running": {
+                tool: self.executor.running(tool) for tool in self.executor.tools()
+            },
+            "pending": {
+                tool: self.executor.pending(tool) for tool in self.executor.tools()
+            },
+        }
+        stats["cache"] = self.cache.stats()
+        stats["objects"] = self.objects.stats()
+        return stats
+
+
+def create_server(
+    name: str = "DeepDiff MCP",
+    workers: Optional[int] = None,
+    executor: str = "thread",
+    max_concurrency: Optional[int] = None,
+    max_queue: Optional[int] = None,
+    cache_size: int = DEFAULT_CACHE_SIZE,
+    cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+    file_cache_size: int = DEFAULT_FILE_CACHE_SIZE,
+    file_cache_max_bytes: int = DEFAULT_FILE_CACHE_MAX_BYTES,
+    file_cache_dir: Optional[str] = None,
+    object_store_max_bytes: int = DEFAULT_STORE_MAX_BYTES,
+    object_ttl: Optional[float] = DEFAULT_OBJECT_TTL,
+    budget: Optional[Budget] = None,
+    tool_budgets: Optional[Dict[str, Budget]] = None,
+    metrics_path: Optional[str] = "/metrics",
+    profile_slowest: int = 0,
+    warm_up: bool = True,
+    shared_dir: Optional[str] = None,
+) -> DeepDiffMCP:
+    """
+    Create a new DeepDiff MCP server.
+
+    Args:
+        name: Name of the MCP server
+        workers: Number of pool workers (default: number of CPUs)
+        executor: Pool type used for tool bodies, "thread" or "process"
+        max_concurrency: Maximum number of running calls per tool
+        max_queue: Maximum number of queued calls per tool (default: unbounded)
+        cache_size: Maximum number of cached results; 0 disables the cache
+        cache_max_bytes: Maximum total size of the cached results, in bytes
+        file_cache_size: Maximum number of parsed files kept in memory by
+            each worker process; 0 disables the in-memory parsed file cache
+        file_cache_max_bytes: Maximum total size of the parsed files kept in
+            memory by each worker process, in bytes
+        file_cache_dir: Optional directory where parsed files are persisted
+            across restarts
+        object_store_max_bytes: Maximum total size of the objects stored with
+            put_object, in bytes
+        object_ttl: Seconds a stored object is kept after its last use;
+            None keeps objects until they are dropped or evicted
+        budget: Limits applied to every tool call (default: unlimited)
+        tool_budgets: Limits applied to the calls of some tools, by tool name
+        metrics_path: Path of the Prometheus metrics endpoint on the HTTP and
+            SSE transports; None disables the endpoint
+        profile_slowest: Profile tool calls with cProfile and keep the
+            profiles of this many slowest ones; 0 disables profiling
+        warm_up: Whether to import the modules the tools need in the
+            background once the first client has connected
+        shared_dir: Directory where the result cache and the object store are
+            kept in SQLite databases, shared by every server using it (see
+            shared.py); by default they are kept in memory
+
+    Returns:
+        DeepDiffMCP server instance
+    """
+    if shared_dir is not None:
+        cache, objects = shared_backends(
+            shared_dir,
+            cache_size=cache_size,
+            cache_max_bytes=cache_max_bytes,
+            object_store_max_bytes=object_store_max_bytes,
+            object_ttl=object_ttl,
+        )
+    else:
+        cache = ResultCache(max_entries=cache_size, max_bytes=cache_max_bytes)
+        objects = ObjectStore(max_bytes=object_store_max_bytes, default_ttl=object_ttl)
+    return DeepDiffMCP(
+        name,
+        executor=ToolExecutor(
+            workers=workers,
+            kind=executor,
+            max_concurrency=max_concurrency,
+            max_queue=max_queue,
+            initializer=configure_file_cache,
+            initargs=(file_cache_size, file_cache_max_bytes, file_cache_dir),
+            budget=budget,
+            tool_budgets=tool_budgets,
+            profile=profile_slowest > 0,
+        ),
+        cache=cache,
+        objects=objects,
+        metrics=ServerMetrics(profile_slowest=profile_slowest),
+        metrics_path=metrics_path,
+        warm_up=warm_up,
+    )
@@ -0,0 +1,590 @@
+"""
+Sharded comparison of very large top-level containers.
+
+DeepDiff walks both objects on one core. When they are a dict with many keys
+or a long list, the comparison splits into parts the worker pool runs in
+parallel (with the process executor; threads share one interpreter lock):
+
+- dicts: the keys are split into shards, and each shard diffs the sub-dicts
+  of its keys. Their paths are already those of the whole objects. Keys that
+  DeepDiff's options make equal (ignore_string_case) stay in the same shard,
+  and every shard keeps the share of common keys of the whole dicts, so that
+  threshold_to_diff_deeper decides as it would for them.
+- lists compared in order: DeepDiff pairs records by position, so each shard
+  diffs the same index range of both lists, and its paths are shifted by the
+  range's start. Lists DeepDiff compares with difflib (all items strings,
+  numbers and the like) are not sharded.
+- lists with ignore_order: an item may match any item of the other list, so
+  the shards only hash their range of items. Items whose hash is on both
+  sides are equal; the remaining items are diffed in one call, at their
+  original positions, with the pairing decision DeepDiff makes for the whole
+  lists.
+
+A shard's deep distance is returned as its diff length and object sizes, so
+the distance of the whole objects is put together with DeepDiff's formula.
+
+Options whose effect depends on the whole objects (path exclusions, max_diffs
+and max_time_ms, report_repetition with ignore_order, the json_patch output
+format) are not sharded: planning returns None and the caller runs the plain
+comparison.
+"""
+import inspect
+import math
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from deepdiff import DeepDiff
+from deepdiff.deephash import DeepHash
+from deepdiff.helper import basic_types
+
+from .formats import check_output_format, format_diff
+from .operations import build_diff, compare, get_deep_distance
+
+# Top-level items a shard must have at least; below that, the cost of sending
+# the parts to the workers outweighs the parallelism
+MIN_SHARD_ITEMS = 10_000
+
+_DEFAULTS = {
+    name: parameter.default
+    for name, parameter in inspect.signature(DeepDiff).parameters.items()
+}
+_ROOT_INDEX = re.compile(r"^root\[(\d+)\]")
+
+
+class ShardPlan:
+    """
+    One round of a sharded call: the shard calls to run in the worker pool,
+    and what to make of their results.
+    """
+
+    def __init__(
+        self,
+        func: Callable[..., Any],
+        calls: List[Dict[str, Any]],
+        finish: Callable[[List[Any]], Any],
+    ):
+        """
+        Initialize the plan.
+
+        Args:
+            func: Module-level function run by every shard
+            calls: Keyword arguments of each shard's call
+            finish: Function called with the shards' results, in order; it
+                returns the result of the whole call, or the ShardPlan of the
+                next round
+        """
+        self.func = func
+        self.calls = calls
+        self.finish = finish
+
+
+class _Filler:
+    """
+    Placeholder in a residual ignore_order diff. Fillers with the same number
+    are equal, and unequal to anything else.
+    """
+
+    def __init__(self, number: int = 0):
+        self.number = number
+
+
+def _all_basic(items: List[Any]) -> bool:
+    return all(isinstance(item, basic_types) for item in items)
+
+
+def _bounds(count: int, shards: int) -> List[Tuple[int, int]]:
+    return [(count * i // shards, count * (i + 1) // shards) for i in range(shards)]
+
+
+def _shard_count(items: int, shards: int, min_shard_items: int) -> int:
+    if shards < 1:
+        raise ValueError("shards must be at least 1")
+    return min(shards, items // max(min_shard_items, 1))
+
+
+def _strategy(t1: Any, t2: Any, options: Dict[str, Any]) -> Optional[str]:
+    """Pick how to shard a comparison, or None if it cannot be sharded."""
+    if options.get("max_diffs") is not None or options.get("max_time_ms") is not None:
+        return None
+    if options.get("exclude_paths") or options.get("exclude_regex_paths"):
+        return None
+    if type(t1) is dict and type(t2) is dict:
+        return "keys"
+    if type(t1) is list and type(t2) is list:
+        if options.get("ignore_order"):
+            return None if options.get("report_repetition") else "hash"
+        # Lists of basic values are aligned by difflib, over the whole lists
+        if _all_basic(t1) and _all_basic(t2):
+            return None
+        return "range"
+    return None
+
+
+def _split_keys(
+    t1: Dict, t2: Dict, shards: int, min_shard_items: int, options: Dict[str, Any]
+) -> Optional[List[Tuple[Dict, Dict]]]:
+    """Split two dicts into sub-dicts DeepDiff compares as it would the whole."""
+    fold = None
+    if (
+        options.get("ignore_string_type_changes")
+        or options.get("ignore_numeric_type_changes")
+        or options.get("ignore_string_case")
+    ):
+        # DeepDiff matches such keys by a cleaned form; only str keys are
+        # handled here, as in JSON objects
+        if not all(isinstance(key, str) for key in (*t1, *t2)):
+            return None
+        if options.get("ignore_string_case"):
+            fold = str.lower
+
+    groups1: Dict[Any, List[Any]] = {}
+    groups2: Dict[Any, List[Any]] = {}
+    for obj, groups in ((t1, groups1), (t2, groups2)):
+        for key in obj:
+            groups.setdefault(fold(key) if fold else key, []).append(key)
+    common = [key for key in groups1 if key in groups2]
+    different = [key for key in groups1 if key not in groups2]
+    different.extend(key for key in groups2 if key not in groups1)
+
+    union = len(common) + len(different)
+    shards = _shard_count(union, shards, min_shard_items)
+    if shards < 2:
+        return None
+    # With too few common keys, DeepDiff reports the whole root as changed
+    threshold = options.get(
+        "threshold_to_diff_deeper", _DEFAULTS["threshold_to_diff_deeper"]
+    )
+    if threshold and len(common) / union < threshold:
+        return None
+
+    parts = []
+    for (start, end), (other_start, other_end) in zip(
+        _bounds(len(common), shards), _bounds(len(different), shards)
+    ):
+        keys = common[start:end] + different[other_start:other_end]
+        if threshold and len(keys) > 1 and (end - start) / len(keys) < threshold:
+            return None
+        parts.append(
+            (
+                {key: t1[key] for group in keys for key in groups1.get(group, ())},
+                {key: t2[key] for group in keys for key in groups2.get(group, ())},
+            )
+        )
+    return parts
+
+
+def _split_range(
+    t1: List, t2: List, shards: int, min_shard_items: int
+) -> Optional[List[Tuple[List, List, int]]]:
+    """Split two lists compared in order into the same index ranges."""
+    shards = _shard_count(max(len(t1), len(t2)), shards, min_shard_items)
+    if shards < 2:
+        return None
+    parts = []
+    for start, end in _bounds(max(len(t1), len(t2)), shards):
+        part1, part2 = t1[start:end], t2[start:end]
+        # Such a shard would be aligned by difflib, unlike the whole lists
+        if _all_basic(part1) and _all_basic(part2):
+            return None
+        parts.append((part1, part2, start))
+    return parts
+
+
+def _move_paths(diff: Dict, index: Callable[[int], int]) -> Dict:
+    """Rewrite the leading root[i] of every path of a diff as root[index(i)]."""
+
+    def move(path: str) -> str:
+        match = _ROOT_INDEX.match(path)
+        if match is None:
+            return path
+        return f"root[{index(int(match.group(1)))}]{path[match.end():]}"
+
+    result: Dict[str, Any] = {}
+    for report, items in diff.items():
+        if isinstance(items, dict):
+            moved = result[report] = {}
+            for path, value in items.items():
+                if isinstance(value, dict) and "new_path" in value:
+                    value = dict(value, new_path=move(value["new_path"]))
+                moved[move(path)] = value
+        elif _is_path_collection(items):
+            # dictionary_item_added and the like are SetOrdered of paths
+            result[report] = type(items)(move(path) for path in items)
+        else:
+            result[report] = items
+    return result
+
+
+def _is_path_collection(items: Any) -> bool:
+    return isinstance(items, Iterable) and not isinstance(items, (str, bytes))
+
+
+def _merge_diffs(parts: List[Dict]) -> Dict:
+    """Merge diffs of disjoint parts, keeping the type of every report."""
+    merged: Dict[str, Any] = {}
+    for part in parts:
+        for report, items in part.items():
+            if report not in merged:
+                merged[report] = (
+                    type(items)(items)
+                    if isinstance(items, dict) or _is_path_collection(items)
+                    else items
+                )
+            elif isinstance(items, dict):
+                merged[report].update(items)
+            elif isinstance(merged[report], list):
+                merged[report].extend(items)
+            elif _is_path_collection(items):
+                merged[report] = type(merged[report])([*merged[report], *items])
+            else:
+                merged[report] = items
+    return merged
+
+
+def _object_size(diff: DeepDiff, obj: Any) -> int:
+    """Count the items making up an object, as DeepDiff's distance does."""
+    hashes: Dict[Any, Any] = {}
+    DeepHash(
+        obj, hashes=hashes, parent="root", apply_hash=True, **diff.deephash_parameters
+    )
+    return DeepHash.get_key(
+        hashes,
+        key=obj,
+        extract_index=1,
+        ignore_numeric_type_changes=diff.ignore_numeric_type_changes,
+    )
+
+
+def _measure(t1: Any, t2: Any, **options: Any) -> Tuple[int, int, int]:
+    """
+    Get the diff length and the sizes of two objects, their deep distance
+    being the length over the sum of the sizes.
+
+    DeepDiff measures its diff before it turns an item removed and one added
+    at the same path into a changed value, so the length is taken from the
+    distance it reports rather than from the final diff.
+    """
+    diff = build_diff(t1, t2, get_deep_distance=True, **options)
+    size1, size2 = _object_size(diff, t1), _object_size(diff, t2)
+    return round(diff.get("deep_distance", 0.0) * (size1 + size2)), size1, size2
+
+
+def _distance(diff_length: int, size1: int, size2: int) -> float:
+    return diff_length / (size1 + size2) if diff_length else 0.0
+
+
+def compare_shard(
+    t1: Any, t2: Any, offset: int = 0, prune: bool = False, **options: Any
+) -> Dict:
+    """
+    Compare one shard of two containers.
+
+    Args:
+        t1: Part of the first object
+        t2: Part of the second object
+        offset: Index of the parts' first items in lists, added to the paths
+        prune: Whether to share identical subtrees first (see compare)
+        **options: build_diff options
+
+    Returns:
+        The shard's diff dictionary, with the paths of the whole objects
+    """
+    diff = compare(t1, t2, prune=prune, **options)
+    if offset:
+        diff = _move_paths(diff, lambda index: index + offset)
+    return diff
+
+
+def distance_shard(t1: Any, t2: Any, **options: Any) -> Tuple[int, int, int]:
+    """
+    Measure one shard of two containers for their deep distance.
+
+    Returns:
+        The length of the shard's diff and the sizes of both parts
+    """
+    return _measure(t1, t2, **options)
+
+
+def hash_shard(
+    t1: List, t2: List, start: int, **options: Any
+) -> Tuple[List[Optional[Tuple[str, int]]], List[Optional[Tuple[str, int]]]]:
+    """
+    Hash the items of one index range of two lists, as DeepDiff's ignore_order
+    comparison does.
+
+    Args:
+        t1: Items of the first list
+        t2: Items of the second list
+        start: Index of the first items in the lists
+        **options: build_diff options
+
+    Returns:
+        The (hash, size) of every item of both ranges; None for an item
+        DeepDiff leaves out, such as one of an excluded type
+    """
+    parameters = build_diff([], [], **options).deephash_parameters
+    lookup = {"ignore_numeric_type_changes": parameters["ignore_numeric_type_changes"]}
+    hashes: Dict[Any, Any] = {}
+    results = []
+    for items in (t1, t2):
+        entries: List[Optional[Tuple[str, int]]] = []
+        for index, item in enumerate(items, start):
+            DeepHash(
+                item,
+                hashes=hashes,
+                parent=f"root[{index}]",
+                apply_hash=True,
+                **parameters,
+            )
+            item_hash = DeepHash.get_key(hashes, key=item, default=None, **lookup)
+            if item_hash is None:
+                entries.append(None)
+            else:
+                size = DeepHash.get_key(hashes, key=item, extract_index=1, **lookup)
+                entries.append((item_hash, size))
+        results.append(entries)
+    return results[0], results[1]
+
+
+def compare_residual(t1: List, t2: List, indexes: List[int], **options: Any) -> Dict:
+    """
+    Compare the items left over by hash_shard.
+
+    Args:
+        t1: Items of the first list, or _Filler placeholders
+        t2: Items of the second list, or _Filler placeholders
+        indexes: Index in the whole lists of each position holding an item
+        **options: build_diff options
+
+    Returns:
+        The diff dictionary, with the paths of the whole lists
+    """
+    return _move_paths(compare(t1, t2, **options), indexes.__getitem__)
+
+
+def distance_residual(t1: List, t2: List, **options: Any) -> int:
+    """Get the diff length of the items left over by hash_shard."""
+    return _measure(t1, t2, **options)[0]
+
+
+def _plan_residual(
+    t1: List,
+    t2: List,
+    hashes: List[Tuple[List, List]],
+    func: Callable[..., Any],
+    finish: Callable[[Any, int, int], Any],
+    whole: ShardPlan,
+    options: Dict[str, Any],
+) -> Any:
+    """Plan the diff of the items whose hash is only on one side."""
+    hashes1 = [entry for part in hashes for entry in part[0]]
+    hashes2 = [entry for part in hashes for entry in part[1]]
+    unique1 = {entry[0] for entry in hashes1 if entry is not None}
+    unique2 = {entry[0] for entry in hashes2 if entry is not None}
+    removed = unique1 - unique2
+    added = unique2 - unique1
+    size1 = 1 + sum(entry[1] for entry in hashes1 if entry is not None)
+    size2 = 1 + sum(entry[1] for entry in hashes2 if entry is not None)
+    if not removed and not added:
+        return finish(None, size1, size2)
+
+    # DeepDiff only pairs removed and added items when they make up a small
+    # enough share of the items. The residual lists get as many distinct
+    # matched fillers as make DeepDiff decide as it does for the whole lists;
+    # the cutoff applies unchanged to the lists nested in the items.
+    changed = len(added) + len(removed)
+    cutoff = options.get(
+        "cutoff_intersection_for_pairs", _DEFAULTS["cutoff_intersection_for_pairs"]
+    )
+    if changed / (len(unique1) + len(unique2) + 1) <= cutoff:
+        # Every residual list has changed items, filler 0 and the extra ones
+        extra = max(0, math.ceil((changed / cutoff - changed - 3) / 2))
+    elif changed / (changed + 3) > cutoff:
+        extra = 0
+    else:
+        # Nearly all items changed: residual lists cannot keep the decision
+        return whole
+
+    # The items keep their relative positions, and the same position on both
+    # sides, so that DeepDiff reports an item removed and one added at the
+    # same index as a changed value, as it does for the whole lists
+    indexes1 = [i for i, entry in enumerate(hashes1) if entry and entry[0] in removed]
+    indexes2 = [i for i, entry in enumerate(hashes2) if entry and entry[0] in added]
+    indexes = sorted(set(indexes1) | set(indexes2))
+    positions = {index: position for position, index in enumerate(indexes)}
+    # Filler 0 ends both sides, so that the gaps' fillers are always matched
+    fillers = [_Filler(number) for number in range(extra + 1)]
+    residual1 = [fillers[0]] * len(indexes) + fillers
+    residual2 = [fillers[0]] * len(indexes) + fillers
+    for index in indexes1:
+        residual1[positions[index]] = t1[index]
+    for index in indexes2:
+        residual2[positions[index]] = t2[index]
+
+    call = dict(options, t1=residual1, t2=residual2)
+    if func is compare_residual:
+        call["indexes"] = indexes
+    return ShardPlan(func, [call], lambda results: finish(results[0], size1, size2))
+
+
+def _plan_hashes(
+    t1: List,
+    t2: List,
+    shards: int,
+    min_shard_items: int,
+    func: Callable[..., Any],
+    finish: Callable[[Any, int, int], Any],
+    whole: ShardPlan,
+    options: Dict[str, Any],
+) -> Optional[ShardPlan]:
+    shards = _shard_count(max(len(t1), len(t2)), shards, min_shard_items)
+    if shards < 2:
+        return None
+    calls = [
+        dict(options, t1=t1[start:end], t2=t2[start:end], start=start)
+        for start, end in _bounds(max(len(t1), len(t2)), shards)
+    ]
+    return ShardPlan(
+        hash_shard,
+        calls,
+        lambda hashes: _plan_residual(t1, t2, hashes, func, finish, whole, options),
+    )
+
+
+def plan_compare(
+    t1: Any,
+    t2: Any,
+    shards: int,
+    prune: bool = False,
+    output_format: str = "full",
+    min_shard_items: int = MIN_SHARD_ITEMS,
+    **options: Any,
+) -> Optional[ShardPlan]:
+    """
+    Plan a sharded operations.compare call.
+
+    Args:
+        t1: First object to compare
+        t2: Second object to compare
+        shards: Maximum number of shards
+        prune: Whether to share identical subtrees first (see compare)
+        output_format: One of formats.OUTPUT_FORMATS
+        min_shard_items: Top-level items a shard must have at least
+        **options: build_diff options
+
+    Returns:
+        The first round of the call, or None if it should run unsharded
+
+    Raises:
+        ValueError: If shards is below 1 or the output format is unknown
+    """
+    check_output_format(output_format)
+    strategy = _strategy(t1, t2, options)
+    if strategy is None or output_format == "json_patch":
+        return None
+
+    def finish(parts: List[Dict]) -> Dict:
+        return format_diff(_merge_diffs(parts), output_format)
+
+    if strategy == "keys":
+        parts = _split_keys(t1, t2, shards, min_shard_items, options)
+        if parts is None:
+            return None
+        calls = [
+            dict(options, t1=part1, t2=part2, prune=prune) for part1, part2 in parts
+        ]
+        return ShardPlan(compare_shard, calls, finish)
+
+    if strategy == "range":
+        ranges = _split_range(t1, t2, shards, min_shard_items)
+        if ranges is None:
+            return None
+        calls = [
+            dict(options, t1=part1, t2=part2, offset=offset, prune=prune)
+            for part1, part2, offset in ranges
+        ]
+        return ShardPlan(compare_shard, calls, finish)
+
+    return _plan_hashes(
+        t1,
+        t2,
+        shards,
+        min_shard_items,
+        compare_residual,
+        lambda diff, size1, size2: finish([diff or {}]),
+        ShardPlan(
+            compare,
+            [dict(options, t1=t1, t2=t2, prune=prune, output_format=output_format)],
+            lambda results: results[0],
+        ),
+        options,
+    )
+
+
+def plan_distance(
+    t1: Any,
+    t2: Any,
+    shards: int,
+    min_shard_items: int = MIN_SHARD_ITEMS,
+    **options: Any,
+) -> Optional[ShardPlan]:
+    """
+    Plan a sharded operations.get_deep_distance call.
+
+    The distance is DeepDiff's: the length of the diff over the sizes of both
+    objects. Shards add up their diff lengths and sizes; every shard counts
+    its own container, where the whole objects count one each.
+
+    Args:
+        t1: First object
+        t2: Second object
+        shards: Maximum number of shards
+        min_shard_items: Top-level items a shard must have at least
+        **options: build_diff options
+
+    Returns:
+        The first round of the call, or None if it should run unsharded
+
+    Raises:
+        ValueError: If shards is below 1
+    """
+    strategy = _strategy(t1, t2, options)
+    if strategy is None:
+        return None
+
+    def finish(parts: List[Tuple[int, int, int]]) -> float:
+        containers = len(parts) - 1
+        return _distance(
+            sum(part[0] for part in parts),
+            sum(part[1] for part in parts) - containers,
+            sum(part[2] for part in parts) - containers,
+        )
+
+    if strategy == "keys":
+        parts = _split_keys(t1, t2, shards, min_shard_items, options)
+        if parts is None:
+            return None
+        calls = [dict(options, t1=part1, t2=part2) for part1, part2 in parts]
+        return ShardPlan(distance_shard, calls, finish)
+
+    if strategy == "range":
+        ranges = _split_range(t1, t2, shards, min_shard_items)
+        if ranges is None:
+            return None
+        calls = [dict(options, t1=part1, t2=part2) for part1, part2, _ in ranges]
+        return ShardPlan(distance_shard, calls, finish)
+
+    return _plan_hashes(
+        t1,
+        t2,
+        shards,
+        min_shard_items,
+        distance_residual,
+        lambda length, size1, size2: _distance(length or 0, size1, size2),
+        ShardPlan(
+            get_deep_distance,
+            [dict(options, t1=t1, t2=t2)],
+            lambda results: results[0],
+        ),
+        options,
+    )
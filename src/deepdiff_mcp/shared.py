@@ -0,0 +1,400 @@
+"""
+Result cache and object store shared by several server processes.
+
+With ``--processes``, every HTTP worker is a separate process, and an object
+uploaded with put_object on one of them must be found by the others. These
+variants of ResultCache and ObjectStore keep their entries in SQLite
+databases, which every worker opens; entries are stored pickled, and the
+eviction order and TTLs are kept in the database as well.
+"""
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from .cache import DEFAULT_CACHE_MAX_BYTES, DEFAULT_CACHE_SIZE, ResultCache
+from .store import DEFAULT_OBJECT_TTL, DEFAULT_STORE_MAX_BYTES, ObjectStore, _pickle
+
+RESULTS_FILE = "results.sqlite"
+OBJECTS_FILE = "objects.sqlite"
+
+# Seconds a process waits for another one holding the database lock
+_BUSY_TIMEOUT = 30.0
+
+
+class _Database:
+    """A SQLite database opened once per thread."""
+
+    def __init__(self, path: str, schema: str):
+        self.path = path
+        self.schema = schema
+        self._local = threading.local()
+        # Create the tables now, so that errors surface in the constructor
+        self.connection()
+
+    def connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # Autocommit mode: transactions are opened explicitly
+            connection = sqlite3.connect(
+                self.path, timeout=_BUSY_TIMEOUT, isolation_level=None
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(self.schema)
+            self._local.connection = connection
+        return connection
+
+
+class SharedResultCache(ResultCache):
+    """ResultCache kept in a SQLite database, for several processes."""
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS results (
+            key TEXT PRIMARY KEY,
+            data BLOB NOT NULL,
+            size INTEGER NOT NULL,
+            used REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS results_used ON results (used);
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = DEFAULT_CACHE_SIZE,
+        max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+    ):
+        """
+        Initialize the cache.
+
+        Hit, miss and eviction counters are kept by each process.
+
+        Args:
+            path: Database file; processes using the same file share results
+            max_entries: Maximum number of cached results; 0 disables caching
+            max_bytes: Maximum total size of the cached results, in bytes
+        """
+        super().__init__(max_entries=max_entries, max_bytes=max_bytes)
+        self._db = _Database(path, self._SCHEMA)
+
+    def __len__(self) -> int:
+        connection = self._db.connection()
+        return connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def get(self, key: Optional[str], default: Any = None) -> Any:
+        """
+        Get a cached result.
+
+        Args:
+            key: Key built with make_cache_key
+            default: Value returned on a miss
+
+        Returns:
+            The cached result, or default
+        """
+        if key is None or not self.enabled:
+            return default
+        connection = self._db.connection()
+        row = connection.execute(
+            "SELECT data FROM results WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            return default
+        connection.execute(
+            "UPDATE results SET used = ? WHERE key = ?", (time.time(), key)
+        )
+        with self._lock:
+            self.hits += 1
+        return pickle.loads(row[0])
+
+    def put(self, key: Optional[str], value: Any) -> bool:
+        """
+        Cache a result, evicting the least recently used ones as needed.
+
+        Args:
+            key: Key built with make_cache_key
+            value: Result to cache
+
+        Returns:
+            True if the result was cached
+        """
+        if key is None or not self.enabled:
+            return False
+        try:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return False
+        if len(data) > self.max_bytes:
+            return False
+
+        connection = self._db.connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                "INSERT OR REPLACE INTO results (key, data, size, used) "
+                "VALUES (?, ?, ?, ?)",
+                (key, data, len(data), time.time()),
+            )
+            evicted = _evict(
+                connection, "results", "key", self.max_bytes, self.max_entries
+            )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        with self._lock:
+            self.evictions += evicted
+        return True
+
+    def clear(self) -> None:
+        """Remove all cached results, for every process."""
+        self._db.connection().execute("DELETE FROM results")
+
+    def stats(self) -> Dict[str, int]:
+        """Get hit, miss and eviction counters and the current size."""
+        entries, size = (
+            self._db.connection()
+            .execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results")
+            .fetchone()
+        )
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": entries,
+                "bytes": size,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
+
+
+class SharedObjectStore(ObjectStore):
+    """ObjectStore kept in a SQLite database, for several processes."""
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS objects (
+            handle TEXT PRIMARY KEY,
+            data BLOB NOT NULL,
+            size INTEGER NOT NULL,
+            ttl REAL,
+            expires_at REAL,
+            used REAL NOT NULL,
+            revision INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS objects_used ON objects (used);
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = DEFAULT_STORE_MAX_BYTES,
+        default_ttl: Optional[float] = DEFAULT_OBJECT_TTL,
+    ):
+        """
+        Initialize the store.
+
+        Unlike ObjectStore, get() unpickles a new copy of the object every
+        time, so changes to it are not stored, and a large object such as a
+        search index costs a full unpickle on every call that uses it.
+
+        Args:
+            path: Database file; processes using the same file share objects
+            max_bytes: Maximum total (pickled) size of the stored objects
+            default_ttl: Seconds an object is kept after it was stored or last
+                used, unless put() is given another TTL. None keeps objects
+                until they are dropped or evicted.
+        """
+        super().__init__(max_bytes=max_bytes, default_ttl=default_ttl)
+        self._db = _Database(path, self._SCHEMA)
+
+    def __len__(self) -> int:
+        connection = self._db.connection()
+        return connection.execute("SELECT COUNT(*) FROM objects").fetchone()[0]
+
+    def __contains__(self, handle: str) -> bool:
+        connection = self._db.connection()
+        self._expire_rows(connection, time.time())
+        row = connection.execute("SELECT 1 FROM objects WHERE handle = ?", (handle,))
+        return row.fetchone() is not None
+
+    def _expire_rows(self, connection: sqlite3.Connection, now: float) -> None:
+        cursor = connection.execute(
+            "DELETE FROM objects WHERE expires_at IS NOT NULL AND expires_at <= ?",
+            (now,),
+        )
+        with self._lock:
+            self.expirations += max(cursor.rowcount, 0)
+
+    def _store(
+        self,
+        obj: Any,
+        ttl: Optional[float],
+        handle: Optional[str],
+        revision: Optional[int] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Store an object, only over the given revision if there is one."""
+        data = _pickle(obj)
+        if len(data) > self.max_bytes:
+            raise ValueError(
+                f"Object is too large for the store "
+                f"({len(data)} > {self.max_bytes} bytes)"
+            )
+        if handle is None:
+            handle = hashlib.blake2b(data, digest_size=20).hexdigest()
+        ttl = self.default_ttl if ttl is None else ttl
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+
+        # The revision is checked and replaced in one transaction, so of two
+        # processes replacing the same revision only one succeeds
+        connection = self._db.connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            self._expire_rows(connection, now)
+            row = connection.execute(
+                "SELECT revision FROM objects WHERE handle = ?", (handle,)
+            ).fetchone()
+            current = row[0] if row is not None else None
+            stored = revision is None or current == revision
+            evicted = 0
+            if stored:
+                connection.execute(
+                    "INSERT OR REPLACE INTO objects "
+                    "(handle, data, size, ttl, expires_at, used, revision) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (handle, data, len(data), ttl, expires_at, now, (current or 0) + 1),
+                )
+                evicted = _evict(connection, "objects", "handle", self.max_bytes)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        with self._lock:
+            self.evictions += evicted
+
+        if not stored:
+            return None
+        return {"handle": handle, "size_bytes": len(data)}
+
+    def get_revision(self, handle: str) -> Tuple[Any, int]:
+        """
+        Get a stored object with its revision, to replace() it, and refresh its TTL.
+
+        Args:
+            handle: Handle returned by put()
+
+        Returns:
+            (a copy of the stored object, its revision)
+
+        Raises:
+            KeyError: If the handle is unknown or the object expired
+        """
+        now = time.time()
+        connection = self._db.connection()
+        self._expire_rows(connection, now)
+        row = connection.execute(
+            "SELECT data, ttl, revision FROM objects WHERE handle = ?", (handle,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(handle)
+        data, ttl, revision = row
+        connection.execute(
+            "UPDATE objects SET expires_at = ?, used = ? WHERE handle = ?",
+            (now + ttl if ttl is not None else None, now, handle),
+        )
+        return pickle.loads(data), revision
+
+    def drop(self, handle: str) -> bool:
+        """
+        Remove a stored object.
+
+        Args:
+            handle: Handle returned by put()
+
+        Returns:
+            True if the object was stored
+        """
+        cursor = self._db.connection().execute(
+            "DELETE FROM objects WHERE handle = ?", (handle,)
+        )
+        return cursor.rowcount > 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the number and size of stored objects and eviction counters."""
+        connection = self._db.connection()
+        self._expire_rows(connection, time.time())
+        objects, size = connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM objects"
+        ).fetchone()
+        with self._lock:
+            return {
+                "objects": objects,
+                "bytes": size,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+def _evict(
+    connection: sqlite3.Connection,
+    table: str,
+    key_column: str,
+    max_bytes: int,
+    max_entries: Optional[int] = None,
+) -> int:
+    """Delete the least recently used rows until a table is within its limits."""
+    entries, size = connection.execute(
+        f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {table}"
+    ).fetchone()
+    evicted = []
+    rows = connection.execute(f"SELECT {key_column}, size FROM {table} ORDER BY used")
+    for key, row_size in rows:
+        if size <= max_bytes and (max_entries is None or entries <= max_entries):
+            break
+        evicted.append((key,))
+        entries -= 1
+        size -= row_size
+    connection.executemany(f"DELETE FROM {table} WHERE {key_column} = ?", evicted)
+    return len(evicted)
+
+
+def shared_backends(
+    directory: str,
+    cache_size: int = DEFAULT_CACHE_SIZE,
+    cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+    object_store_max_bytes: int = DEFAULT_STORE_MAX_BYTES,
+    object_ttl: Optional[float] = DEFAULT_OBJECT_TTL,
+) -> Tuple[SharedResultCache, SharedObjectStore]:
+    """
+    Open the result cache and object store kept in a directory.
+
+    Args:
+        directory: Directory holding the databases; it is created if needed
+        cache_size: Maximum number of cached results; 0 disables the cache
+        cache_max_bytes: Maximum total size of the cached results, in bytes
+        object_store_max_bytes: Maximum total size of the stored objects
+        object_ttl: Seconds a stored object is kept after its last use
+
+    Returns:
+        The result cache and the object store
+    """
+    os.makedirs(directory, exist_ok=True)
+    cache = SharedResultCache(
+        os.path.join(directory, RESULTS_FILE),
+        max_entries=cache_size,
+        max_bytes=cache_max_bytes,
+    )
+    objects = SharedObjectStore(
+        os.path.join(directory, OBJECTS_FILE),
+        max_bytes=object_store_max_bytes,
+        default_ttl=object_ttl,
+    )
+    return cache, objects
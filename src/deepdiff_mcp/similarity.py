@@ -0,0 +1,167 @@
+"""
+Candidate pruning for nearest-match search.
+
+Running a full DeepDiff against every item of a large corpus is expensive.
+The functions in this module cheaply narrow the corpus down first: items with
+the same DeepHash as the query are exact matches, and the remaining items are
+ranked by the MinHash estimate of the Jaccard similarity of their leaves
+(path and value pairs), with LSH banding to pick the likely neighbours.
+"""
+import zlib
+from typing import Any, Dict, Iterator, List, Set, Tuple
+
+import numpy as np
+from deepdiff.deephash import DeepHash
+
+from .budget import BudgetExceededError
+from .operations import build_hash_options
+
+DEFAULT_NUM_PERM = 64
+DEFAULT_BANDS = 16
+
+_MAX_HASH = np.iinfo(np.uint64).max
+
+
+def iter_leaves(
+    obj: Any, path: str = "root", ignore_order: bool = False
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Iterate over the leaves of a nested object.
+
+    Args:
+        obj: Object to walk
+        path: Path of obj
+        ignore_order: Whether to leave list positions out of the paths
+
+    Yields:
+        (path, value) for every value that is not a dict, list, tuple or set
+    """
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            yield from iter_leaves(value, f"{path}[{key!r}]", ignore_order)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        ordered = isinstance(obj, (list, tuple)) and not ignore_order
+        for position, value in enumerate(obj):
+            child_path = f"{path}[{position if ordered else ''}]"
+            yield from iter_leaves(value, child_path, ignore_order)
+    else:
+        yield path, obj
+
+
+def leaf_tokens(obj: Any, ignore_order: bool = False) -> Set[str]:
+    """Get the set of "path=type:value" tokens describing an object's leaves."""
+    return {
+        f"{path}={type(value).__name__}:{value!r}"
+        for path, value in iter_leaves(obj, ignore_order=ignore_order)
+    }
+
+
+class MinHasher:
+    """MinHash signatures over sets of string tokens."""
+
+    def __init__(self, num_perm: int = DEFAULT_NUM_PERM, seed: int = 1):
+        """
+        Initialize the hasher.
+
+        Args:
+            num_perm: Number of hash functions (signature length)
+            seed: Seed of the hash functions; signatures are only comparable
+                between hashers with the same num_perm and seed
+        """
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._seeds = rng.integers(
+            0, _MAX_HASH, size=num_perm, dtype=np.uint64, endpoint=True
+        )
+
+    def signature(self, tokens: Set[str]) -> np.ndarray:
+        """
+        Compute the MinHash signature of a set of tokens.
+
+        Args:
+            tokens: Set of tokens
+
+        Returns:
+            Array of num_perm minimum hash values
+        """
+        if not tokens:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        base = np.fromiter(
+            (zlib.crc32(token.encode("utf-8", "surrogatepass")) for token in tokens),
+            dtype=np.uint64,
+            count=len(tokens),
+        )
+        # One hash function per seed: the splitmix64 finalizer applied to the
+        # token hash xor the seed (uint64 arithmetic wraps around)
+        hashed = base[:, None] ^ self._seeds[None, :]
+        hashed = (hashed ^ (hashed >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        hashed = (hashed ^ (hashed >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        hashed ^= hashed >> np.uint64(31)
+        return hashed.min(axis=0)
+
+
+def estimate_similarity(signature1: np.ndarray, signature2: np.ndarray) -> float:
+    """Estimate the Jaccard similarity of two sets from their signatures."""
+    return float(np.mean(signature1 == signature2))
+
+
+def _band_keys(signature: np.ndarray, bands: int) -> List[bytes]:
+    return [band.tobytes() for band in np.array_split(signature, bands)]
+
+
+def rank_candidates(
+    query: Any,
+    corpus: List[Any],
+    max_candidates: int,
+    num_perm: int = DEFAULT_NUM_PERM,
+    bands: int = DEFAULT_BANDS,
+    **options: Any,
+) -> Dict[str, List]:
+    """
+    Find exact matches and the most promising candidates for a query.
+
+    Args:
+        query: Object to find the nearest matches of
+        corpus: Objects to search
+        max_candidates: Maximum number of candidates to keep for a full
+            comparison, besides the exact matches
+        num_perm: MinHash signature length
+        bands: Number of LSH bands the signature is split into
+        **options: DeepDiff options, used to decide exact matches and whether
+            list order matters
+
+    Returns:
+        Dictionary with "identical" (indices of items with the same DeepHash
+        as the query, so at distance 0), "candidates" (indices of the other
+        kept items, most similar first) and "errors" ((index, message) pairs
+        for items that could not be hashed)
+    """
+    hash_options = build_hash_options(**options)
+    ignore_order = options.get("ignore_order", False)
+    query_hash = DeepHash(query, **hash_options)[query]
+
+    hasher = MinHasher(num_perm=num_perm)
+    query_signature = hasher.signature(leaf_tokens(query, ignore_order))
+    query_bands = _band_keys(query_signature, bands)
+
+    identical = []
+    errors = []
+    # (shares an LSH band with the query, estimated similarity, index)
+    scored = []
+    for index, item in enumerate(corpus):
+        try:
+            if DeepHash(item, **hash_options)[item] == query_hash:
+                identical.append(index)
+                continue
+            signature = hasher.signature(leaf_tokens(item, ignore_order))
+        except BudgetExceededError:
+            raise
+        except Exception as e:
+            errors.append((index, f"{type(e).__name__}: {str(e)}"))
+            continue
+        in_band = any(a == b for a, b in zip(query_bands, _band_keys(signature, bands)))
+        scored.append((in_band, estimate_similarity(query_signature, signature), index))
+
+    scored.sort(key=lambda entry: (entry[0], entry[1]), reverse=True)
+    candidates = [index for _, _, index in scored[:max_candidates]]
+    return {"identical": identical, "candidates": candidates, "errors": errors}
@@ -0,0 +1,286 @@
+"""
+Server-side object store for DeepDiff MCP.
+
+Large payloads can be uploaded once with the put_object tool and then passed
+to other tools as ``{"$ref": handle}`` instead of being serialized inline on
+every call. Objects are stored under a content hash, expire after a TTL and
+are evicted least recently used first when the store exceeds its size limit.
+"""
+import hashlib
+import pickle
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_STORE_MAX_BYTES = 1024 * 1024 * 1024
+DEFAULT_OBJECT_TTL = 3600.0
+
+REF_KEY = "$ref"
+
+
+def is_ref(value: Any) -> bool:
+    """Tell whether a tool argument is an object store reference."""
+    return isinstance(value, dict) and len(value) == 1 and REF_KEY in value
+
+
+def _pickle(obj: Any) -> bytes:
+    try:
+        return pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception as e:
+        raise ValueError(f"Object cannot be stored: {str(e)}")
+
+
+def content_handle(obj: Any) -> str:
+    """
+    Get the handle an object has, or would have, in the store.
+
+    Raises:
+        ValueError: If the object cannot be pickled
+    """
+    return hashlib.blake2b(_pickle(obj), digest_size=20).hexdigest()
+
+
+def new_handle() -> str:
+    """
+    Get a random handle, for objects that are replaced under the same handle.
+
+    Unlike content handles, it is not shared by equal objects stored by
+    other clients.
+    """
+    return secrets.token_hex(20)
+
+
+class ObjectStore:
+    """Content-addressed object store with TTL and size-bounded eviction."""
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_STORE_MAX_BYTES,
+        default_ttl: Optional[float] = DEFAULT_OBJECT_TTL,
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            max_bytes: Maximum total (pickled) size of the stored objects
+            default_ttl: Seconds an object is kept after it was stored or last
+                used, unless put() is given another TTL. None keeps objects
+                until they are dropped or evicted.
+        """
+        if max_bytes < 0:
+            raise ValueError("max_bytes must not be negative")
+        if default_ttl is not None and default_ttl <= 0:
+            raise ValueError("default_ttl must be positive")
+
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.evictions = 0
+        self.expirations = 0
+        # handle -> (object, size, ttl, expires_at)
+        self._entries: "OrderedDict[str, Tuple[Any, int, Any, Any]]" = OrderedDict()
+        # handle -> revision, changed every time an object is stored
+        self._revisions: Dict[str, int] = {}
+        self._last_revision = 0
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, handle: str) -> bool:
+        with self._lock:
+            self._expire(time.monotonic())
+            return handle in self._entries
+
+    def _remove(self, handle: str) -> None:
+        _, size, _, _ = self._entries.pop(handle)
+        del self._revisions[handle]
+        self._bytes -= size
+
+    def _expire(self, now: float) -> None:
+        expired = [
+            handle
+            for handle, (_, _, _, expires_at) in self._entries.items()
+            if expires_at is not None and expires_at <= now
+        ]
+        for handle in expired:
+            self._remove(handle)
+            self.expirations += 1
+
+    def put(
+        self, obj: Any, ttl: Optional[float] = None, handle: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Store an object.
+
+        Storing an object that is already stored refreshes its TTL.
+
+        Args:
+            obj: Object to store
+            ttl: Seconds to keep the object after it was last used
+                (default: the store's default TTL)
+            handle: Handle to store the object under (see new_handle),
+                replacing the object stored under it; default: the content
+                hash
+
+        Returns:
+            Dictionary with the object's handle and size in bytes
+
+        Raises:
+            ValueError: If the object cannot be pickled or is larger than
+                the store, or ttl is not positive
+        """
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive")
+        return self._store(obj, ttl, handle)
+
+    def replace(
+        self, handle: str, obj: Any, revision: int, ttl: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Store an object under a handle, unless it changed since it was read.
+
+        Args:
+            handle: Handle of the object to replace
+            obj: Object to store in its place
+            revision: Revision get_revision() returned with the object that
+                obj was made from
+            ttl: Seconds to keep the object after it was last used
+                (default: the store's default TTL)
+
+        Returns:
+            Dictionary with the object's handle and size in bytes, or None
+            if another object was stored under the handle since, or it
+            expired; nothing is stored then
+
+        Raises:
+            ValueError: If the object cannot be pickled or is larger than
+                the store, or ttl is not positive
+        """
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive")
+        return self._store(obj, ttl, handle, revision)
+
+    def _store(
+        self,
+        obj: Any,
+        ttl: Optional[float],
+        handle: Optional[str],
+        revision: Optional[int] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Store an object, only over the given revision if there is one."""
+        data = _pickle(obj)
+        if len(data) > self.max_bytes:
+            raise ValueError(
+                f"Object is too large for the store "
+                f"({len(data)} > {self.max_bytes} bytes)"
+            )
+        if handle is None:
+            handle = hashlib.blake2b(data, digest_size=20).hexdigest()
+        ttl = self.default_ttl if ttl is None else ttl
+        now = time.monotonic()
+
+        with self._lock:
+            self._expire(now)
+            if revision is not None and self._revisions.get(handle) != revision:
+                return None
+            if handle in self._entries:
+                self._remove(handle)
+            expires_at = now + ttl if ttl is not None else None
+            self._entries[handle] = (obj, len(data), ttl, expires_at)
+            self._last_revision += 1
+            self._revisions[handle] = self._last_revision
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+        return {"handle": handle, "size_bytes": len(data)}
+
+    def get(self, handle: str) -> Any:
+        """
+        Get a stored object and refresh its TTL.
+
+        Args:
+            handle: Handle returned by put()
+
+        Returns:
+            The stored object
+
+        Raises:
+            KeyError: If the handle is unknown or the object expired
+        """
+        return self.get_revision(handle)[0]
+
+    def get_revision(self, handle: str) -> Tuple[Any, int]:
+        """
+        Get a stored object with its revision, to replace() it, and refresh its TTL.
+
+        Args:
+            handle: Handle returned by put()
+
+        Returns:
+            (the stored object, its revision)
+
+        Raises:
+            KeyError: If the handle is unknown or the object expired
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            obj, size, ttl, _ = self._entries[handle]
+            expires_at = now + ttl if ttl is not None else None
+            self._entries[handle] = (obj, size, ttl, expires_at)
+            self._entries.move_to_end(handle)
+            return obj, self._revisions[handle]
+
+    def drop(self, handle: str) -> bool:
+        """
+        Remove a stored object.
+
+        Args:
+            handle: Handle returned by put()
+
+        Returns:
+            True if the object was stored
+        """
+        with self._lock:
+            if handle not in self._entries:
+                return False
+            self._remove(handle)
+            return True
+
+    def resolve(self, value: Any) -> Any:
+        """
+        Replace an object store reference with the stored object.
+
+        Args:
+            value: A tool argument, possibly ``{"$ref": handle}``
+
+        Returns:
+            The stored object for references, the value itself otherwise
+
+        Raises:
+            ValueError: If the reference is unknown or expired
+        """
+        if not is_ref(value):
+            return value
+        try:
+            return self.get(value[REF_KEY])
+        except (KeyError, TypeError):
+            raise ValueError(f"Unknown or expired object handle: {value[REF_KEY]}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the number and size of stored objects and eviction counters."""
+        with self._lock:
+            self._expire(time.monotonic())
+            return {
+                "objects": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
@@ -0,0 +1,337 @@
+"""
+Multi-process HTTP serving for DeepDiff MCP.
+
+DeepDiff is pure Python, so one server process diffs on one core at a time
+whatever its worker pool. The Supervisor runs several server processes on the
+same port: every worker binds its own socket with SO_REUSEPORT and the kernel
+spreads connections over them. Workers serve the streamable HTTP transport
+statelessly, since consecutive requests of a client may reach different
+workers, and share their result cache and object store through SQLite (see
+shared.py).
+
+Long comparisons fragment the heap, and a worker's memory rarely goes back
+down. A worker whose resident memory passes a high-water mark asks to be
+replaced: the supervisor starts a new worker, and once it listens, stops the
+old one gracefully, letting it finish the requests it is serving.
+"""
+import multiprocessing
+import os
+import queue
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .budget import _resident_bytes
+
+DEFAULT_GRACEFUL_TIMEOUT = 60.0
+MEMORY_CHECK_INTERVAL = 5.0
+
+
+def reuse_port_socket(host: str, port: int) -> socket.socket:
+    """
+    Bind a TCP socket that other processes can bind to the same address.
+
+    Raises:
+        ValueError: If the platform does not support SO_REUSEPORT
+    """
+    if not hasattr(socket, "SO_REUSEPORT"):
+        raise ValueError("Serving with several processes requires SO_REUSEPORT")
+    family, kind, proto, _, address = socket.getaddrinfo(
+        host, port, type=socket.SOCK_STREAM
+    )[0]
+    sock = socket.socket(family, kind, proto)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind(address)
+    return sock
+
+
+def watch_memory(
+    max_bytes: int,
+    on_exceeded: Any,
+    interval: float = MEMORY_CHECK_INTERVAL,
+    stop: Optional[threading.Event] = None,
+) -> None:
+    """
+    Check this process' resident memory until it passes a high-water mark.
+
+    Args:
+        max_bytes: High-water mark, in bytes
+        on_exceeded: Function called once the mark is passed
+        interval: Seconds between checks
+        stop: Optional event ending the checks early
+    """
+    stop = stop or threading.Event()
+    while not stop.wait(interval):
+        resident = _resident_bytes()
+        if resident is not None and resident > max_bytes:
+            on_exceeded()
+            return
+
+
+def _serve_worker(
+    slot: int,
+    server_options: Dict[str, Any],
+    host: str,
+    port: int,
+    path: str,
+    max_memory_bytes: Optional[int],
+    graceful_timeout: float,
+    events: Any,
+) -> None:
+    """Run one server process; events receives its ("ready"|"recycle", slot, pid)."""
+    from .server import create_server
+
+    pid = os.getpid()
+    sock = reuse_port_socket(host, port)
+    server = create_server(**server_options)
+    # A worker only takes connections once the tools' modules are imported
+    for future in server.executor.warm_up():
+        future.result()
+    sock.listen()
+    events.put(("ready", slot, pid))
+
+    if max_memory_bytes is not None:
+        threading.Thread(
+            target=watch_memory,
+            args=(max_memory_bytes, lambda: events.put(("recycle", slot, pid))),
+            name="deepdiff-mcp-memory",
+            daemon=True,
+        ).start()
+
+    server.run(
+        transport="http",
+        path=path,
+        sockets=[sock],
+        stateless_http=True,
+        show_banner=False,
+        uvicorn_config={"timeout_graceful_shutdown": graceful_timeout},
+    )
+
+
+class Supervisor:
+    """Run and replace a fixed number of HTTP server processes."""
+
+    def __init__(
+        self,
+        processes: int,
+        server_options: Optional[Dict[str, Any]] = None,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        path: str = "/mcp",
+        shared_dir: Optional[str] = None,
+        max_worker_memory_mb: Optional[float] = None,
+        graceful_timeout: float = DEFAULT_GRACEFUL_TIMEOUT,
+    ):
+        """
+        Initialize the supervisor.
+
+        Args:
+            processes: Number of server processes
+            server_options: Keyword arguments for create_server in every
+                worker; shared_dir is set by the supervisor
+            host: Host to bind to
+            port: Port to bind to
+            path: Path of the MCP endpoint
+            shared_dir: Directory of the result cache and object store
+                shared by the workers (default: a temporary directory removed
+                when the supervisor stops)
+            max_worker_memory_mb: Resident memory, in MB, above which a
+                worker is replaced (default: never)
+            graceful_timeout: Seconds a stopping worker may take to finish
+                the requests it is serving
+
+        Raises:
+            ValueError: If an argument is out of range or the platform does
+                not support SO_REUSEPORT
+        """
+        if processes < 1:
+            raise ValueError("processes must be at least 1")
+        if max_worker_memory_mb is not None and max_worker_memory_mb <= 0:
+            raise ValueError("max_worker_memory_mb must be positive")
+        if graceful_timeout < 0:
+            raise ValueError("graceful_timeout must not be negative")
+        if not hasattr(socket, "SO_REUSEPORT"):
+            raise ValueError("Serving with several processes requires SO_REUSEPORT")
+
+        self.processes = processes
+        self.server_options = dict(server_options or {})
+        self.host = host
+        self.port = port
+        self.path = path
+        self.shared_dir = shared_dir
+        self.max_worker_memory_mb = max_worker_memory_mb
+        self.graceful_timeout = graceful_timeout
+        self.restarts = 0
+        # Set once every worker listens
+        self.ready = threading.Event()
+        self._context = multiprocessing.get_context("spawn")
+        self._events: Any = None
+        self._workers: Dict[int, Any] = {}
+        # Replacements that are starting, by slot
+        self._starting: Dict[int, Any] = {}
+        # Workers being stopped, with the time they get killed at
+        self._stopping: List[Tuple[Any, float]] = []
+        self._stop = threading.Event()
+        self._temporary_dir: Optional[str] = None
+
+    def _start_worker(self, slot: int) -> Any:
+        max_memory_bytes = (
+            int(self.max_worker_memory_mb * 1024 * 1024)
+            if self.max_worker_memory_mb is not None
+            else None
+        )
+        process = self._context.Process(
+            target=_serve_worker,
+            args=(
+                slot,
+                self.server_options,
+                self.host,
+                self.port,
+                self.path,
+                max_memory_bytes,
+                self.graceful_timeout,
+                self._events,
+            ),
+            name=f"deepdiff-mcp-{slot}",
+        )
+        process.start()
+        return process
+
+    def _retire(self, process: Any) -> None:
+        """Ask a worker to finish its requests and exit."""
+        process.terminate()
+        self._stopping.append((process, time.monotonic() + self.graceful_timeout + 5))
+
+    def workers(self) -> Dict[int, int]:
+        """Get the process id of the worker serving each slot."""
+        return {slot: process.pid for slot, process in self._workers.items()}
+
+    def recycle(self, slot: int) -> None:
+        """
+        Replace a worker, as when it passes the memory high-water mark: start
+        a new one, then stop the old one once the new one is ready.
+
+        Args:
+            slot: Slot of the worker, from 0 to processes - 1
+        """
+        self._events.put(("recycle", slot, self._workers[slot].pid))
+
+    def _handle(self, event: str, slot: int, pid: int) -> None:
+        if event == "recycle":
+            current = self._workers.get(slot)
+            running = current is not None and current.pid == pid
+            if running and slot not in self._starting:
+                print(f"Replacing worker {slot} (pid {pid})", file=sys.stderr)
+                self._starting[slot] = self._start_worker(slot)
+        elif event == "ready":
+            replacement = self._starting.get(slot)
+            if replacement is not None and replacement.pid == pid:
+                del self._starting[slot]
+                self._retire(self._workers[slot])
+                self._workers[slot] = replacement
+                self.restarts += 1
+
+    def _check_processes(self) -> None:
+        now = time.monotonic()
+        for process, kill_at in list(self._stopping):
+            if not process.is_alive():
+                process.join()
+                self._stopping.remove((process, kill_at))
+            elif now >= kill_at:
+                process.kill()
+
+        for slot, process in list(self._starting.items()):
+            if not process.is_alive():
+                raise RuntimeError(
+                    f"Worker {slot} exited with code {process.exitcode} while starting"
+                )
+        for slot, process in list(self._workers.items()):
+            if not process.is_alive():
+                print(
+                    f"Worker {slot} (pid {process.pid}) exited with code "
+                    f"{process.exitcode}, restarting it",
+                    file=sys.stderr,
+                )
+                process.join()
+                self._workers[slot] = self._start_worker(slot)
+                self.restarts += 1
+
+    def _wait_until_ready(self) -> None:
+        """Wait for the first workers, failing if one of them cannot start."""
+        ready = set()
+        while len(ready) < self.processes and not self._stop.is_set():
+            try:
+                event, slot, pid = self._events.get(timeout=1)
+            except queue.Empty:
+                for slot, process in self._workers.items():
+                    if not process.is_alive():
+                        raise RuntimeError(
+                            f"Worker {slot} exited with code {process.exitcode} "
+                            "while starting"
+                        )
+                continue
+            if event == "ready":
+                ready.add(slot)
+            else:
+                self._handle(event, slot, pid)
+
+    def run(self) -> None:
+        """
+        Start the workers and keep them running until stop() is called or
+        the process receives SIGINT or SIGTERM.
+
+        Raises:
+            RuntimeError: If a worker fails to start
+        """
+        if self.shared_dir is None:
+            self._temporary_dir = tempfile.mkdtemp(prefix="deepdiff-mcp-")
+        self.server_options["shared_dir"] = self.shared_dir or self._temporary_dir
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signum, lambda *_: self._stop.set())
+
+        self._events = self._context.Queue()
+        try:
+            for slot in range(self.processes):
+                self._workers[slot] = self._start_worker(slot)
+            self._wait_until_ready()
+            self.ready.set()
+            while True:
+                try:
+                    self._handle(*self._events.get(timeout=1))
+                except queue.Empty:
+                    pass
+                # Workers exit on their own on SIGINT from a terminal
+                if self._stop.is_set():
+                    break
+                self._check_processes()
+        finally:
+            self._shutdown()
+
+    def stop(self) -> None:
+        """Stop the workers; run() returns once they have exited."""
+        self._stop.set()
+
+    def _shutdown(self) -> None:
+        self.ready.clear()
+        for process in list(self._workers.values()) + list(self._starting.values()):
+            if process.is_alive():
+                self._retire(process)
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        for process, _ in self._stopping:
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                process.kill()
+                process.join()
+        self._workers.clear()
+        self._starting.clear()
+        self._stopping.clear()
+        if self._temporary_dir is not None:
+            shutil.rmtree(self._temporary_dir, ignore_errors=True)
+            self._temporary_dir = None
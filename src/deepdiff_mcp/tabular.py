@@ -0,0 +1,489 @@
+"""
+Comparison engines for tabular data (CSV, Excel and record-oriented JSON).
+
+Diffing two lists of records with DeepDiff aligns rows by position, so a single
+inserted row shows up as a change on every row after it, and ``ignore_order``
+is close to quadratic on large exports. The engines in this module align rows
+on their content instead and report the result in DeepDiff's own shape.
+"""
+import numbers
+import re
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
+
+from .operations import build_diff, rebase_diff
+
+
+def index_records(
+    records: Sequence[Dict],
+    key_columns: Sequence[str],
+    label: str = "data",
+) -> Dict[Tuple[Hashable, ...], int]:
+    """
+    Index records by their primary key.
+
+    Args:
+        records: List of row dictionaries
+        key_columns: Columns forming the primary key
+        label: Name of the data set used in error messages
+
+    Returns:
+        Dictionary mapping each key tuple to the position of its row
+
+    Raises:
+        ValueError: If a key column is missing or a key is duplicated
+    """
+    index = {}
+    for position, record in enumerate(records):
+        try:
+            key = tuple(record[column] for column in key_columns)
+        except KeyError as e:
+            raise ValueError(f"Key column {e} not found in {label}")
+        except TypeError:
+            raise ValueError(f"{label} must be a list of records")
+        if key in index:
+            raise ValueError(f"Duplicate key {key} in {label}")
+        index[key] = position
+    return index
+
+
+def _exclusion_filter(
+    exclude_paths: Optional[List[str]],
+    exclude_regex_paths: Optional[List[str]],
+):
+    """Build a predicate telling whether a reported path is excluded."""
+    exact = tuple(exclude_paths or ())
+    regexes = [re.compile(pattern) for pattern in exclude_regex_paths or ()]
+    if not exact and not regexes:
+        return None
+
+    def is_excluded(path: str) -> bool:
+        for excluded in exact:
+            if path == excluded or path.startswith(excluded + "["):
+                return True
+        return any(regex.search(path) for regex in regexes)
+
+    return is_excluded
+
+
+def _filter_diff(diff: Dict, is_excluded) -> Dict:
+    """Drop excluded paths from a diff dictionary."""
+    filtered = {}
+    for report, items in diff.items():
+        if isinstance(items, dict):
+            items = {
+                path: value for path, value in items.items() if not is_excluded(path)
+            }
+        else:
+            items = [path for path in items if not is_excluded(path)]
+        if items:
+            filtered[report] = items
+    return filtered
+
+
+def diff_records_by_key(
+    records1: Sequence[Dict],
+    records2: Sequence[Dict],
+    key_columns: Sequence[str],
+    exclude_paths: Optional[List[str]] = None,
+    exclude_regex_paths: Optional[List[str]] = None,
+    ignore_order: bool = False,
+    report_repetition: bool = False,
+    **options: Any,
+) -> Dict:
+    """
+    Compare two lists of records aligned on a primary key.
+
+    Both sides are indexed by key (a hash join). Rows whose key exists on one
+    side only are reported as ``iterable_item_removed`` or
+    ``iterable_item_added``. Rows present on both sides are skipped when their
+    content is equal and diffed with DeepDiff otherwise. Paths use the row
+    position in the first data set (the second for added rows), exactly as
+    DeepDiff reports them for lists, e.g. ``root[3]['age']``.
+
+    Args:
+        records1: Rows of the first data set
+        records2: Rows of the second data set
+        key_columns: Columns forming the primary key
+        exclude_paths: Paths to exclude from the result
+        exclude_regex_paths: Regex paths to exclude from the result
+        ignore_order: Ignored; rows are always aligned by key
+        report_repetition: Ignored; keys are unique
+        **options: Other DeepDiff options applied to each changed row
+
+    Returns:
+        Dictionary containing the differences
+
+    Raises:
+        ValueError: If no key columns are given, a key column is missing or
+            a key is duplicated
+    """
+    if not key_columns:
+        raise ValueError("key_columns must contain at least one column")
+
+    index1 = index_records(records1, key_columns, "the first data set")
+    index2 = index_records(records2, key_columns, "the second data set")
+
+    result: Dict[str, Any] = {}
+    removed = {}
+    for key, position1 in index1.items():
+        position2 = index2.get(key)
+        if position2 is None:
+            removed[f"root[{position1}]"] = records1[position1]
+            continue
+        row1 = records1[position1]
+        row2 = records2[position2]
+        if row1 == row2:
+            continue
+        row_diff = build_diff(row1, row2, **options).to_dict()
+        if row_diff:
+            rebase_diff(row_diff, f"root[{position1}]", into=result)
+
+    added = {
+        f"root[{position2}]": records2[position2]
+        for key, position2 in index2.items()
+        if key not in index1
+    }
+    if added:
+        result["iterable_item_added"] = added
+    if removed:
+        result["iterable_item_removed"] = removed
+
+    is_excluded = _exclusion_filter(exclude_paths, exclude_regex_paths)
+    if is_excluded is not None:
+        result = _filter_diff(result, is_excluded)
+    return result
+
+
+def _key_index(df: pd.DataFrame, key_columns: Sequence[str], label: str) -> pd.Index:
+    """Build a unique index from the key columns of a DataFrame."""
+    missing = [column for column in key_columns if column not in df.columns]
+    if missing:
+        raise ValueError(f"Key column {missing[0]!r} not found in {label}")
+    if len(key_columns) == 1:
+        index = pd.Index(df[key_columns[0]])
+    else:
+        index = pd.MultiIndex.from_frame(df[list(key_columns)])
+    if index.has_duplicates:
+        raise ValueError(f"Duplicate key {index[index.duplicated()][0]} in {label}")
+    return index
+
+
+def _is_plain_numeric(series: pd.Series) -> bool:
+    return is_numeric_dtype(series.dtype) and not is_bool_dtype(series.dtype)
+
+
+def _column_diff_mask(
+    values1: pd.Series,
+    values2: pd.Series,
+    significant_digits: Optional[int],
+    ignore_string_case: bool,
+) -> np.ndarray:
+    """
+    Compare two aligned columns with vectorized operations.
+
+    Cells that are missing on both sides are considered equal.
+
+    Returns:
+        Boolean array that is True where the cells differ
+    """
+    if _is_plain_numeric(values1) and _is_plain_numeric(values2):
+        if values1.dtype.kind in "iu" and values2.dtype.kind in "iu":
+            return values1.to_numpy() != values2.to_numpy()
+        array1 = values1.to_numpy(dtype="float64", na_value=np.nan)
+        array2 = values2.to_numpy(dtype="float64", na_value=np.nan)
+        if significant_digits is not None:
+            array1 = np.round(array1, significant_digits)
+            array2 = np.round(array2, significant_digits)
+        both_missing = np.isnan(array1) & np.isnan(array2)
+        return ~((array1 == array2) | both_missing)
+
+    if ignore_string_case:
+        values1 = _lower_strings(values1)
+        values2 = _lower_strings(values2)
+    both_missing = values1.isna().to_numpy() & values2.isna().to_numpy()
+    equal = (values1.astype(object) == values2.astype(object)).to_numpy(dtype=bool)
+    return ~(equal | both_missing)
+
+
+def _lower_strings(values: pd.Series) -> pd.Series:
+    """Lowercase the string cells of a column, leaving other cells untouched."""
+    values = values.astype(object)
+    try:
+        lowered = values.str.lower()
+    except AttributeError:
+        # The column does not hold any strings
+        return values
+    return lowered.where(lowered.notna(), values)
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, numbers.Number) and not isinstance(value, bool)
+
+
+def _report_cell(
+    result: Dict,
+    path: str,
+    old_value: Any,
+    new_value: Any,
+    ignore_numeric_type_changes: bool,
+) -> None:
+    """Add a changed cell to a diff in DeepDiff's format."""
+    if type(old_value) is not type(new_value) and not (
+        ignore_numeric_type_changes and _is_number(old_value) and _is_number(new_value)
+    ):
+        result.setdefault("type_changes", {})[path] = {
+            "old_type": type(old_value),
+            "new_type": type(new_value),
+            "old_value": old_value,
+            "new_value": new_value,
+        }
+    else:
+        result.setdefault("values_changed", {})[path] = {
+            "new_value": new_value,
+            "old_value": old_value,
+        }
+
+
+def _rows_to_dict(df: pd.DataFrame, positions: np.ndarray) -> Dict[str, Dict]:
+    """Materialize the rows at the given positions, keyed by their path."""
+    records = df.iloc[positions].to_dict(orient="records")
+    return {f"root[{position}]": record for position, record in zip(positions, records)}
+
+
+def diff_dataframes(
+    df1: pd.DataFrame,
+    df2: pd.DataFrame,
+    key_columns: Optional[Sequence[str]] = None,
+    significant_digits: Optional[int] = None,
+    ignore_string_case: bool = False,
+    ignore_numeric_type_changes: bool = False,
+    exclude_paths: Optional[List[str]] = None,
+    exclude_regex_paths: Optional[List[str]] = None,
+    **options: Any,
+) -> Dict:
+    """
+    Compare two DataFrames column by column with vectorized operations.
+
+    Rows are aligned by position, or by key when key_columns is given. Each
+    common column is compared as a whole with NumPy/pandas operations and only
+    the cells that differ are converted to Python objects. The result has the
+    same shape and paths as a DeepDiff of the two record lists, except that
+    cells missing on both sides (NaN) are considered equal.
+
+    Args:
+        df1: First DataFrame
+        df2: Second DataFrame
+        key_columns: Columns forming a primary key used to align rows
+        significant_digits: Number of decimal digits numeric cells are
+            rounded to before comparing
+        ignore_string_case: Whether to ignore string case
+        ignore_numeric_type_changes: Whether to report int/float differences
+            as value changes instead of type changes
+        exclude_paths: Paths to exclude from the result
+        exclude_regex_paths: Regex paths to exclude from the result
+        **options: Other DeepDiff options; ignored by this engine
+
+    Returns:
+        Dictionary containing the differences
+
+    Raises:
+        ValueError: If a key column is missing or a key is duplicated
+    """
+    result: Dict[str, Any] = {}
+
+    if key_columns:
+        index1 = _key_index(df1, key_columns, "the first data set")
+        index2 = _key_index(df2, key_columns, "the second data set")
+        in_both = index1.isin(index2)
+        positions1 = np.flatnonzero(in_both)
+        positions2 = index2.get_indexer(index1[positions1])
+        removed = np.flatnonzero(~in_both)
+        added = np.flatnonzero(~index2.isin(index1))
+    else:
+        common = min(len(df1), len(df2))
+        positions1 = positions2 = np.arange(common)
+        removed = np.arange(common, len(df1))
+        added = np.arange(common, len(df2))
+
+    columns2 = set(df2.columns)
+    columns1 = set(df1.columns)
+    for column in df1.columns:
+        if column not in columns2:
+            result.setdefault("dictionary_item_removed", []).extend(
+                f"root[{position}][{column!r}]" for position in positions1
+            )
+            continue
+        values1 = df1[column].iloc[positions1].reset_index(drop=True)
+        values2 = df2[column].iloc[positions2].reset_index(drop=True)
+        if not ignore_numeric_type_changes and values1.dtype != values2.dtype and (
+            _is_plain_numeric(values1) and _is_plain_numeric(values2)
+        ):
+            changed = np.flatnonzero(~(values1.isna() & values2.isna()).to_numpy())
+        else:
+            changed = np.flatnonzero(
+                _column_diff_mask(
+                    values1, values2, significant_digits, ignore_string_case
+                )
+            )
+        if not len(changed):
+            continue
+        old_values = values1.iloc[changed].tolist()
+        new_values = values2.iloc[changed].tolist()
+        for offset, old_value, new_value in zip(changed, old_values, new_values):
+            _report_cell(
+                result,
+                f"root[{positions1[offset]}][{column!r}]",
+                old_value,
+                new_value,
+                ignore_numeric_type_changes,
+            )
+
+    for column in df2.columns:
+        if column not in columns1:
+            result.setdefault("dictionary_item_added", []).extend(
+                f"root[{position}][{column!r}]" for position in positions1
+            )
+
+    if len(added):
+        result["iterable_item_added"] = _rows_to_dict(df2, added)
+    if len(removed):
+        result["iterable_item_removed"] = _rows_to_dict(df1, removed)
+
+    is_excluded = _exclusion_filter(exclude_paths, exclude_regex_paths)
+    if is_excluded is not None:
+        result = _filter_diff(result, is_excluded)
+    return result
+
+
+DEFAULT_CHUNKSIZE = 10_000
+
+_ROW_PATH = re.compile(r"^root\[(\d+)\]")
+
+
+def shift_row_paths(diff: Dict, offset: int) -> Dict:
+    """
+    Shift the leading row position of every path in a diff.
+
+    Args:
+        diff: Diff of a chunk whose first row has position 0
+        offset: Position of the chunk's first row in the whole file
+
+    Returns:
+        Diff whose paths use positions in the whole file
+    """
+    if not offset:
+        return diff
+
+    def shift(path: str) -> str:
+        return _ROW_PATH.sub(
+            lambda m: f"root[{int(m.group(1)) + offset}]", path, count=1
+        )
+
+    shifted = {}
+    for report, items in diff.items():
+        if isinstance(items, dict):
+            shifted[report] = {shift(path): value for path, value in items.items()}
+        else:
+            shifted[report] = [shift(path) for path in items]
+    return shifted
+
+
+def _read_chunk(reader: Any, rows: int) -> Optional[pd.DataFrame]:
+    """Read the next chunk, or None when the reader is exhausted."""
+    try:
+        chunk = reader.get_chunk(rows)
+    except StopIteration:
+        return None
+    return chunk.reset_index(drop=True)
+
+
+def iter_chunk_diffs(
+    file1_path: str,
+    file2_path: str,
+    chunksize: Optional[int] = None,
+    max_memory_mb: Optional[float] = None,
+    columnar: bool = False,
+    **options: Any,
+) -> Iterator[Tuple[int, Dict]]:
+    """
+    Compare two CSV files chunk by chunk.
+
+    Both files are read in aligned chunks of rows, so rows are matched by
+    position exactly as in a full comparison, and only one chunk of each file
+    is held in memory at a time.
+
+    Args:
+        file1_path: Path to the first CSV file
+        file2_path: Path to the second CSV file
+        chunksize: Maximum number of rows per chunk (default: 10,000)
+        max_memory_mb: Memory ceiling for the chunks being compared. The chunk
+            size is lowered as needed, based on the memory used per row so far.
+        columnar: Whether to compare chunks with the vectorized engine
+        **options: DeepDiff options
+
+    Yields:
+        (rows read so far, diff of the chunk with paths relative to the file)
+
+    Raises:
+        ValueError: If a file is not a CSV file or the options need all rows
+            at once (ignore_order, key_columns)
+    """
+    from .file_utils import open_csv_reader
+
+    if options.pop("ignore_order", False):
+        raise ValueError("ignore_order is not supported for chunked comparisons")
+    if options.pop("key_columns", None):
+        raise ValueError("key_columns is not supported for chunked comparisons")
+    options.pop("report_repetition", None)
+
+    chunksize = chunksize or DEFAULT_CHUNKSIZE
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+    budget = max_memory_mb * 1024 * 1024 if max_memory_mb else None
+
+    reader1 = open_csv_reader(file1_path)
+    try:
+        reader2 = open_csv_reader(file2_path)
+    except Exception:
+        reader1.close()
+        raise
+    rows = chunksize
+    offset = 0
+    try:
+        while True:
+            chunk1 = _read_chunk(reader1, rows)
+            chunk2 = _read_chunk(reader2, rows)
+            if chunk1 is None and chunk2 is None:
+                return
+            if chunk1 is None:
+                chunk1 = chunk2.iloc[0:0]
+            if chunk2 is None:
+                chunk2 = chunk1.iloc[0:0]
+
+            if columnar:
+                diff = diff_dataframes(chunk1, chunk2, **options)
+            else:
+                diff = build_diff(
+                    chunk1.to_dict(orient="records"),
+                    chunk2.to_dict(orient="records"),
+                    **options,
+                ).to_dict()
+            read = max(len(chunk1), len(chunk2))
+            yield offset + read, shift_row_paths(diff, offset)
+            offset += read
+
+            if budget is not None and read:
+                used = (
+                    chunk1.memory_usage(deep=True).sum()
+                    + chunk2.memory_usage(deep=True).sum()
+                )
+                # Leave room for the records and diff built from each chunk
+                per_row = max(1.0, 3 * used / read)
+                rows = max(1, min(chunksize, int(budget // per_row)))
+    finally:
+        reader1.close()
+        reader2.close()
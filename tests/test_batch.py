@@ -0,0 +1,44 @@
+"""
+Tests for the DeepDiff MCP batch tools.
+"""
+import pytest
+
+from deepdiff_mcp import create_server
+
+
+@pytest.mark.asyncio
+async def test_compare_many_runs_batches_in_parallel():
+    """Test comparing a baseline against candidates across workers."""
+    server = create_server("Test Server", workers=2)
+    handle = (await server.put_object({"a": 1, "b": 3}))["handle"]
+    try:
+        result = await server.compare_many(
+            baseline={"a": 1, "b": 2},
+            candidates=[
+                {"a": 1, "b": 2},
+                {"a": 1, "b": 3},
+                {"$ref": handle},
+                {"$ref": "missing"},
+                7,
+            ],
+        )
+        pairs = await server.compare_many(pairs=[[1, 1], [1, 2], [1]])
+        with pytest.raises(ValueError):
+            await server.compare_many(baseline={})
+    finally:
+        server.executor.shutdown()
+
+    changed = {"values_changed": {"root['b']": {"new_value": 3, "old_value": 2}}}
+    entries = result["results"]
+    assert [entry["index"] for entry in entries] == [0, 1, 2, 3, 4]
+    assert entries[0]["diff"] == {}
+    assert entries[1]["diff"] == changed
+    assert entries[2]["diff"] == changed
+    assert "Unknown or expired" in entries[3]["error"]
+    assert "type_changes" in entries[4]["diff"]
+
+    assert [entry.get("diff") for entry in pairs["results"][:2]] == [
+        {},
+        {"values_changed": {"root": {"new_value": 2, "old_value": 1}}},
+    ]
+    assert "error" in pairs["results"][2]
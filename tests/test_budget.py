@@ -0,0 +1,93 @@
+"""
+Tests for the DeepDiff MCP call budgets.
+"""
+import threading
+import time
+
+import pytest
+
+from deepdiff_mcp import Budget, BudgetExceededError, ToolExecutor
+from deepdiff_mcp.budget import parse_tool_budget, run_with_budget
+from deepdiff_mcp.cli import parse_args
+from deepdiff_mcp.operations import compare, equal, hash_object
+
+
+def _records(count, offset=0):
+    return [{"id": i, "values": [i, i + offset]} for i in range(count)]
+
+
+def test_budget_merge_and_parsing():
+    budget = Budget(timeout=10, max_nodes=100)
+    merged = budget.merge(Budget(timeout=5, max_memory_mb=64))
+    assert merged == Budget(timeout=5, max_memory_mb=64, max_nodes=100)
+    assert Budget().merge(None) == Budget()
+    assert not Budget().enabled
+
+    assert Budget.from_dict({"timeout": 2}) == Budget(timeout=2)
+    with pytest.raises(ValueError, match="Unknown budget limits: nodes"):
+        Budget.from_dict({"nodes": 2})
+    with pytest.raises(ValueError, match="timeout must be positive"):
+        Budget(timeout=0)
+
+    assert parse_tool_budget("compare:timeout=30,max_nodes=1000") == (
+        "compare",
+        Budget(timeout=30, max_nodes=1000),
+    )
+    for spec in ("compare", "compare:timeout", "compare:timeout=soon"):
+        with pytest.raises(ValueError):
+            parse_tool_budget(spec)
+
+    parsed = parse_args(["--timeout", "5", "--tool-budget", "equal:max_nodes=10"])
+    assert parsed.timeout == 5
+    assert parsed.tool_budget == [("equal", Budget(max_nodes=10))]
+
+
+@pytest.mark.parametrize("ignore_order", [False, True])
+def test_max_nodes_stops_comparisons(ignore_order):
+    t1, t2 = _records(500), _records(500, offset=1)
+    with pytest.raises(BudgetExceededError, match="max_nodes"):
+        run_with_budget(Budget(max_nodes=1000), None, compare, t1, t2,
+                        ignore_order=ignore_order)
+    with pytest.raises(BudgetExceededError, match="max_nodes"):
+        run_with_budget(Budget(max_nodes=1000), None, hash_object, t1)
+    # equal stops at the first difference, so make it the last one
+    last_changed = _records(499) + _records(500, offset=1)[-1:]
+    with pytest.raises(BudgetExceededError, match="max_nodes"):
+        run_with_budget(Budget(max_nodes=1000), None, equal, t1, last_changed,
+                        ignore_order=ignore_order)
+
+    # A large enough budget does not change the result
+    assert run_with_budget(Budget(max_nodes=10 ** 7), None, compare, t1, t2,
+                           ignore_order=ignore_order) == compare(
+        t1, t2, ignore_order=ignore_order
+    )
+
+
+def test_cancelled_event_stops_comparison():
+    cancelled = threading.Event()
+    cancelled.set()
+    with pytest.raises(BudgetExceededError, match="cancelled"):
+        run_with_budget(Budget(), cancelled, compare, _records(500), _records(500, 1),
+                        ignore_order=True)
+
+
+@pytest.mark.asyncio
+async def test_executor_timeout_stops_the_worker():
+    """Test that a timed out comparison fails and stops running in its worker."""
+    executor = ToolExecutor(workers=1, tool_budgets={"compare": Budget(timeout=0.2)})
+    assert executor.budget_for("compare", Budget(timeout=1)) == Budget(timeout=0.2)
+    assert executor.budget_for("equal") == Budget()
+
+    t1, t2 = _records(3000), _records(3000, offset=1)
+    start = time.monotonic()
+    with pytest.raises(BudgetExceededError, match="timeout"):
+        await executor.run("compare", compare, t1, t2, ignore_order=True)
+    assert time.monotonic() - start < 1
+
+    # The worker gave up as well, so the next call does not wait for it
+    start = time.monotonic()
+    assert await executor.run("other", compare, 1, 2) == {
+        "values_changed": {"root": {"new_value": 2, "old_value": 1}}
+    }
+    assert time.monotonic() - start < 1
+    executor.shutdown()
@@ -0,0 +1,83 @@
+"""
+Tests for the DeepDiff MCP result cache.
+"""
+import os
+
+import pandas as pd
+import pytest
+
+from deepdiff_mcp import ResultCache, create_server
+from deepdiff_mcp.cache import make_cache_key
+
+
+def test_make_cache_key_is_stable_and_type_aware():
+    """Test that keys depend on content, including types."""
+    key = make_cache_key("compare", {"a": [1, 2]})
+    assert key == make_cache_key("compare", {"a": [1, 2]})
+    assert make_cache_key("compare", [1, 2]) != make_cache_key("compare", (1, 2))
+    assert make_cache_key("compare", 1) != make_cache_key("compare", 1.0)
+    assert make_cache_key("compare", lambda: None) is None
+
+
+def test_result_cache_evicts_by_entries_and_bytes():
+    """Test LRU eviction and the hit/miss/eviction counters."""
+    cache = ResultCache(max_entries=2, max_bytes=10_000)
+    cache.put("a", {"x": 1})
+    cache.put("b", {"x": 2})
+    assert cache.get("a") == {"x": 1}
+    cache.put("c", {"x": 3})
+
+    assert cache.get("b") is None
+    assert cache.get("c") == {"x": 3}
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["evictions"] == 1
+
+    assert not cache.put("big", "x" * 20_000)
+    assert len(cache) == 2
+
+
+def test_result_cache_returns_copies():
+    """Test that modifying a cached result does not change the cache."""
+    cache = ResultCache()
+    cache.put("a", {"x": [1]})
+    cache.get("a")["x"].append(2)
+
+    assert cache.get("a") == {"x": [1]}
+
+
+@pytest.mark.asyncio
+async def test_server_caches_compare_results():
+    """Test that repeated calls are served from the cache."""
+    server = create_server("Test Server", workers=1)
+    first = await server.compare({"a": 1}, {"a": 2})
+    second = await server.compare({"a": 1}, {"a": 2})
+    await server.get_deep_distance({"a": 1}, {"a": 2})
+    server.executor.shutdown()
+
+    assert first == second
+    assert server.cache.stats()["hits"] == 1
+    assert server.cache.stats()["misses"] == 2
+
+
+@pytest.mark.asyncio
+async def test_server_cache_tracks_file_changes(tmp_path):
+    """Test that compare_files results are invalidated when a file changes."""
+    file1_path = str(tmp_path / "test1.csv")
+    file2_path = str(tmp_path / "test2.csv")
+    pd.DataFrame({"id": [1], "age": [25]}).to_csv(file1_path, index=False)
+    pd.DataFrame({"id": [1], "age": [25]}).to_csv(file2_path, index=False)
+
+    server = create_server("Test Server", workers=1)
+    assert await server.compare_files(file1_path, file2_path) == {}
+    assert await server.compare_files(file1_path, file2_path) == {}
+    assert server.cache.stats()["hits"] == 1
+
+    pd.DataFrame({"id": [1], "age": [26]}).to_csv(file2_path, index=False)
+    os.utime(file2_path, ns=(0, 10**9))
+    diff = await server.compare_files(file1_path, file2_path)
+    server.executor.shutdown()
+
+    assert diff == {
+        "values_changed": {"root[0]['age']": {"new_value": 26, "old_value": 25}}
+    }
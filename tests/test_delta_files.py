@@ -0,0 +1,115 @@
+"""
+Tests for the DeepDiff MCP delta patch files.
+"""
+import copy
+import json
+import random
+
+import pandas as pd
+import pytest
+
+from deepdiff_mcp.delta_files import apply_delta_file, dump_delta, dump_file_delta
+from deepdiff_mcp.file_utils import load_data_from_file, load_json_file
+
+
+def _random_value(rng, depth=0):
+    roll = rng.random()
+    if depth < 2 and roll < 0.3:
+        return {
+            rng.choice("abcd"): _random_value(rng, depth + 1)
+            for _ in range(rng.randint(0, 3))
+        }
+    if depth < 2 and roll < 0.5:
+        return [_random_value(rng, depth + 1) for _ in range(rng.randint(0, 3))]
+    return rng.choice([0, 1, 2.5, "x", "y", None, True])
+
+
+def _edit(rng, document):
+    document = copy.deepcopy(document)
+    for _ in range(rng.randint(0, 3)):
+        roll = rng.random()
+        if isinstance(document, dict):
+            if roll < 0.3 and document:
+                del document[rng.choice(sorted(document))]
+            elif roll < 0.6:
+                document[f"new{rng.randint(0, 9)}"] = _random_value(rng)
+            elif document:
+                document[rng.choice(sorted(document))] = _random_value(rng)
+        elif roll < 0.3 and document:
+            document.pop(rng.randrange(len(document)))
+        elif roll < 0.6:
+            document.insert(rng.randint(0, len(document)), _random_value(rng))
+        elif document:
+            position = rng.randrange(len(document))
+            record = document[position] if isinstance(document[position], dict) else {}
+            document[position] = {**record, "q": _random_value(rng)}
+    return document
+
+
+@pytest.mark.parametrize("extension", [".json", ".ndjson"])
+def test_apply_delta_file_matches_delta(tmp_path, extension):
+    """Test that streamed patching gives the same document as Delta."""
+    rng = random.Random(11)
+    streamed = 0
+    for _ in range(100):
+        if extension == ".json" and rng.random() < 0.5:
+            t1 = {f"k{i}": _random_value(rng) for i in range(rng.randint(0, 6))}
+        else:
+            t1 = [_random_value(rng) for _ in range(rng.randint(0, 6))]
+        t2 = _edit(rng, t1)
+        source = str(tmp_path / f"source{extension}")
+        with open(source, "w") as f:
+            if extension == ".ndjson":
+                f.write("\n".join(json.dumps(record) for record in t1))
+            else:
+                json.dump(t1, f)
+
+        delta_path = str(tmp_path / "delta.bin")
+        dump_delta(t1, t2, delta_path)
+        output = str(tmp_path / f"output{extension}")
+        result = apply_delta_file(source, delta_path, output)
+
+        streamed += result["streamed"]
+        assert load_json_file(output, use_cache=False) == t2
+
+    # Only deltas replacing the whole (empty) document need it loaded
+    assert streamed >= 90
+
+
+def test_apply_delta_file_in_place_and_whole_document(tmp_path):
+    """Test patching a CSV file in place and deltas that need the whole document."""
+    file1 = str(tmp_path / "a.csv")
+    file2 = str(tmp_path / "b.csv")
+    pd.DataFrame({"id": [1, 2, 3], "v": ["a", "b", "c"]}).to_csv(file1, index=False)
+    frame = pd.DataFrame({"id": [1, 2, 3, 4], "v": ["a", "B", "c", "d"]})
+    frame.to_csv(file2, index=False)
+    delta_path = str(tmp_path / "delta.bin")
+
+    summary = dump_file_delta(file1, file2, delta_path)
+    assert summary["changes"] == {"values_changed": 1, "iterable_item_added": 1}
+    result = apply_delta_file(file1, delta_path, file1)
+    assert result["items"] == 4
+    assert load_data_from_file(file1) == load_data_from_file(file2)
+
+    source = str(tmp_path / "list.json")
+    with open(source, "w") as f:
+        json.dump([1, 2, 3], f)
+    dump_delta(
+        [1, 2, 3], [3, 2, 1, 5], delta_path, ignore_order=True, report_repetition=True
+    )
+    result = apply_delta_file(source, delta_path, str(tmp_path / "out.json"))
+    assert not result["streamed"]
+    assert sorted(load_json_file(str(tmp_path / "out.json"))) == [1, 2, 3, 5]
+
+
+def test_apply_delta_file_rejects_invalid_delta(tmp_path):
+    """Test that a file that is not a delta is reported as such."""
+    source = str(tmp_path / "list.json")
+    delta_path = str(tmp_path / "delta.bin")
+    with open(source, "w") as f:
+        json.dump([1], f)
+    with open(delta_path, "wb") as f:
+        f.write(b"not a delta")
+
+    with pytest.raises(ValueError, match="Invalid delta file"):
+        apply_delta_file(source, delta_path, str(tmp_path / "out.json"))
@@ -0,0 +1,100 @@
+"""
+Tests for the DeepDiff MCP execution layer.
+"""
+import asyncio
+import time
+
+import pytest
+
+from deepdiff_mcp import ExecutorBusyError, ToolExecutor, create_server
+
+
+def _slow_identity(value, delay=0.2):
+    time.sleep(delay)
+    return value
+
+
+@pytest.mark.asyncio
+async def test_thread_executor_does_not_block_event_loop():
+    """Test that tool bodies run off the event loop."""
+    executor = ToolExecutor(workers=2)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        for _ in range(5):
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    result, _ = await asyncio.gather(
+        executor.run("slow", _slow_identity, 42), ticker()
+    )
+    executor.shutdown()
+
+    assert result == 42
+    assert ticks == 5
+
+
+@pytest.mark.asyncio
+async def test_executor_rejects_when_queue_is_full():
+    """Test that calls beyond max_concurrency + max_queue are rejected."""
+    executor = ToolExecutor(workers=1, max_concurrency=1, max_queue=1)
+
+    first = asyncio.ensure_future(executor.run("slow", _slow_identity, 1))
+    second = asyncio.ensure_future(executor.run("slow", _slow_identity, 2))
+    await asyncio.sleep(0)
+    assert executor.pending("slow") == 2
+
+    with pytest.raises(ExecutorBusyError):
+        await executor.run("slow", _slow_identity, 3)
+
+    # Other tools have their own limits
+    assert await executor.run("other", _slow_identity, 4, delay=0) == 4
+
+    assert await asyncio.gather(first, second) == [1, 2]
+    assert executor.pending() == 0
+    executor.shutdown()
+
+
+def test_executor_rejects_unknown_kind():
+    """Test that only thread and process pools are supported."""
+    with pytest.raises(ValueError):
+        ToolExecutor(kind="fiber")
+
+
+@pytest.mark.asyncio
+async def test_process_executor_compare():
+    """Test running a tool in a process pool."""
+    server = create_server("Test Server", workers=1, executor="process")
+    try:
+        diff = await server.compare({"a": 1, "b": 2}, {"a": 1, "b": 3})
+    finally:
+        server.executor.shutdown()
+
+    assert diff["values_changed"]["root['b']"] == {"old_value": 2, "new_value": 3}
+
+
+def _count_to(n, progress):
+    for i in range(1, n + 1):
+        progress(i, n)
+    return n
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("kind", ["thread", "process"])
+async def test_executor_relays_progress(kind):
+    """Test that progress reported by a tool body reaches the event loop."""
+    executor = ToolExecutor(workers=1, kind=kind)
+    updates = []
+
+    async def on_progress(progress, total):
+        updates.append((progress, total))
+
+    try:
+        result = await executor.run("count", _count_to, 3, on_progress=on_progress)
+    finally:
+        executor.shutdown()
+
+    assert result == 3
+    assert updates == [(1, 3), (2, 3), (3, 3)]
+
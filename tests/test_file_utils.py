@@ -0,0 +1,130 @@
+"""
+Tests for the DeepDiff MCP file utilities.
+"""
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from deepdiff_mcp import file_utils
+from deepdiff_mcp.file_utils import ParsedFileCache
+from deepdiff_mcp.operations import compare_files
+
+
+def _counting_loader(calls):
+    def load_csv(file_path):
+        calls.append(file_path)
+        return pd.read_csv(file_path)
+
+    return load_csv
+
+
+def test_parsed_file_cache_reuses_unchanged_files(tmp_path):
+    """Test that a file is parsed again only after it changes."""
+    file_path = str(tmp_path / "golden.csv")
+    pd.DataFrame({"id": [1, 2]}).to_csv(file_path, index=False)
+    cache = ParsedFileCache()
+    calls = []
+    loader = _counting_loader(calls)
+
+    first = cache.load(file_path, loader)
+    second = cache.load(file_path, loader)
+    assert first.equals(second)
+    assert len(calls) == 1
+
+    pd.DataFrame({"id": [1, 2, 3]}).to_csv(file_path, index=False)
+    os.utime(file_path, ns=(0, 10**9))
+    assert len(cache.load(file_path, loader)) == 3
+    assert len(calls) == 2
+    assert cache.stats()["hits"] == 1
+
+
+def test_parsed_file_cache_persists_to_disk(tmp_path):
+    """Test that persisted files survive a new cache instance."""
+    file_path = str(tmp_path / "golden.csv")
+    cache_dir = str(tmp_path / "cache")
+    pd.DataFrame({"id": [1, 2]}).to_csv(file_path, index=False)
+    calls = []
+    loader = _counting_loader(calls)
+
+    ParsedFileCache(cache_dir=cache_dir).load(file_path, loader)
+    restarted = ParsedFileCache(cache_dir=cache_dir)
+    df = restarted.load(file_path, loader)
+
+    assert df["id"].tolist() == [1, 2]
+    assert len(calls) == 1
+    assert restarted.stats()["disk_hits"] == 1
+
+
+def test_parsed_file_cache_prunes_disk(tmp_path):
+    """Test that persisted files are evicted over the disk limit."""
+    cache_dir = str(tmp_path / "cache")
+    cache = ParsedFileCache(max_entries=0, cache_dir=cache_dir, max_disk_bytes=1)
+    for name in ("a.csv", "b.csv"):
+        file_path = str(tmp_path / name)
+        pd.DataFrame({"id": [1]}).to_csv(file_path, index=False)
+        cache.load(file_path, pd.read_csv)
+
+    assert cache.stats()["disk_evictions"] == 2
+    assert not [name for name in os.listdir(cache_dir) if name.endswith(".pkl")]
+
+
+def test_load_data_from_file_uses_process_cache(tmp_path):
+    """Test that load_data_from_file goes through the configured cache."""
+    file_path = str(tmp_path / "golden.csv")
+    pd.DataFrame({"id": [1, 2]}).to_csv(file_path, index=False)
+    cache = file_utils.configure_file_cache()
+    try:
+        file_utils.load_data_from_file(file_path)
+        assert file_utils.load_data_from_file(file_path) == [{"id": 1}, {"id": 2}]
+        assert cache.stats()["hits"] == 1
+    finally:
+        file_utils.configure_file_cache()
+
+
+def _write_json(file_path, data):
+    with open(file_path, "w") as f:
+        json.dump(data, f)
+    return str(file_path)
+
+
+def test_load_json_file_extracts_paths(tmp_path):
+    """Test that a path is loaded on its own from JSON and NDJSON files."""
+    data = {"a": {"b.c": [1, {"item": None}]}, "item": [{"x": 1}, {"x": 2}]}
+    json_path = _write_json(tmp_path / "data.json", data)
+    ndjson_path = str(tmp_path / "data.ndjson")
+    with open(ndjson_path, "w") as f:
+        f.write("\n".join(json.dumps(record) for record in [{"x": 1}, data]) + "\n\n")
+
+    assert file_utils.load_json_file(json_path) == data
+    assert file_utils.load_json_file(json_path, "root['a']['b.c'][1]") == {"item": None}
+    assert file_utils.load_json_file(json_path, "root['item'][1]['x']") == 2
+    assert file_utils.load_json_file(ndjson_path) == [{"x": 1}, data]
+    assert file_utils.load_json_file(ndjson_path, "root[1]['item'][0]") == {"x": 1}
+    assert list(file_utils.iter_json_records(ndjson_path)) == [{"x": 1}, data]
+    for path in ("root['missing']", "root['item'][5]"):
+        with pytest.raises(KeyError):
+            file_utils.load_json_file(json_path, path, use_cache=False)
+
+
+def test_compare_files_include_paths_loads_only_paths(tmp_path, monkeypatch):
+    """Test that include_paths compares JSON files without loading them whole."""
+    file1 = _write_json(
+        tmp_path / "a.json", {"config": {"x": 1, "y": 2}, "data": [1, 2]}
+    )
+    file2 = _write_json(tmp_path / "b.json", {"config": {"x": 2, "y": 3}, "data": [3]})
+
+    def parse_whole_file(file_path):
+        raise AssertionError("whole file parsed")
+
+    monkeypatch.setattr(file_utils, "_parse_json_file", parse_whole_file)
+    result = compare_files(
+        file1,
+        file2,
+        include_paths=["root['config']"],
+        exclude_paths=["root['config']['y']"],
+    )
+    assert result == {
+        "values_changed": {"root['config']['x']": {"new_value": 2, "old_value": 1}}
+    }
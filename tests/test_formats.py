@@ -0,0 +1,142 @@
+"""
+Tests for the DeepDiff MCP output formats.
+"""
+import copy
+import json
+import random
+
+import pytest
+
+from deepdiff_mcp.formats import compact, dumps_json, format_diff, tree_summary
+from deepdiff_mcp.operations import compare, compare_files
+
+
+def _apply_patch(obj, patch):
+    """Minimal RFC 6902 applier for add, remove and replace."""
+    obj = copy.deepcopy(obj)
+    for operation in patch:
+        tokens = [
+            token.replace("~1", "/").replace("~0", "~")
+            for token in operation["path"].split("/")[1:]
+        ]
+        parent = obj
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+        last = tokens[-1]
+        if isinstance(parent, list):
+            last = int(last)
+        if operation["op"] == "remove":
+            del parent[last]
+        elif operation["op"] == "add" and isinstance(parent, list):
+            parent.insert(last, operation["value"])
+        else:
+            parent[last] = operation["value"]
+    return obj
+
+
+def _random_pair(rng):
+    t1 = {
+        "items": [{"id": i, "tags": ["a", "b"]} for i in range(10)],
+        "config": {"a/b": 1, "x~y": 2, "nested": {"keep": True}},
+    }
+    t2 = copy.deepcopy(t1)
+    for _ in range(6):
+        roll = rng.random()
+        if roll < 0.25:
+            position = rng.randrange(len(t2["items"]) + 1)
+            t2["items"].insert(position, {"id": rng.random()})
+        elif roll < 0.5 and t2["items"]:
+            t2["items"].pop(rng.randrange(len(t2["items"])))
+        elif roll < 0.75 and t2["items"]:
+            rng.choice(t2["items"])["id"] = "changed"
+        else:
+            t2["config"][rng.choice(["new", "a/b", "x~y"])] = rng.random()
+            t2["config"].pop("nested", None)
+    return t1, t2
+
+
+def test_json_patch_transforms_t1_into_t2():
+    rng = random.Random(7)
+    for _ in range(50):
+        t1, t2 = _random_pair(rng)
+        result = compare(t1, t2, output_format="json_patch")
+        assert "unsupported" not in result
+        assert _apply_patch(t1, result["patch"]) == t2
+
+
+def test_json_patch_with_ignore_order_matches_t2_up_to_order():
+    t1 = {"items": [{"id": i, "tags": [i, "x"]} for i in range(6)], "n": 1}
+    t2 = {
+        "items": [
+            {"id": 4, "tags": ["x", 4, "new"]},
+            {"id": 0, "tags": [0, "x"], "added": {"a": 1}},
+            {"id": 9},
+            {"id": 2, "tags": ["x"]},
+            {"id": 5, "tags": [5, "x"]},
+        ],
+        "m": 2,
+    }
+    result = compare(t1, t2, ignore_order=True, output_format="json_patch")
+
+    assert "unsupported" not in result
+    assert compare(_apply_patch(t1, result["patch"]), t2, ignore_order=True) == {}
+    result = compare(
+        [1, 2, 2], [2, 1, 3], ignore_order=True, output_format="json_patch"
+    )
+    assert result == {"patch": [{"op": "add", "path": "/2", "value": 3}]}
+
+
+def test_json_patch_reports_unsupported_changes():
+    result = compare([1, 2, 2], [2, 1], ignore_order=True, report_repetition=True,
+                     output_format="json_patch")
+    assert result["unsupported"]
+
+
+def test_tree_summary_and_paths_only():
+    t1 = {"a": {"x": 1, "y": 2}, "b": [1, 2]}
+    t2 = {"a": {"x": 2}, "b": [1, 2, 3], "c": 1}
+    summary = compare(t1, t2, output_format="tree_summary")
+    assert summary["total"] == 4
+    assert summary["reports"]["values_changed"] == 1
+    assert summary["subtrees"] == {"root['a']": 2, "root['b']": 1, "root['c']": 1}
+
+    paths = compare(t1, t2, output_format="paths_only")
+    assert paths["values_changed"] == ["root['a']['x']"]
+    assert paths["dictionary_item_added"] == ["root['c']"]
+    assert tree_summary({"values_changed": {"root": {"new_value": 2}}})["subtrees"] == {
+        "root": 1
+    }
+
+
+def test_compact_shares_path_segments():
+    diff = compare({"a": [1, 2], "1": 0}, {"a": [3, 4], "1": 1})
+    result = compact(diff)
+    segments = result["segments"]
+    decoded = {
+        "root" + "".join(f"[{segments[i]!r}]" for i in path): value
+        for path, value in result["values_changed"]
+    }
+    assert decoded == diff["values_changed"]
+    # "a" is stored once; the string key "1" and the position 1 are kept apart
+    assert segments.count("a") == 1
+    assert "1" in segments and 1 in segments
+
+
+def test_compare_files_output_format(tmp_path):
+    file1 = tmp_path / "a.json"
+    file2 = tmp_path / "b.json"
+    file1.write_text(json.dumps({"a": 1, "b": [1, 2]}))
+    file2.write_text(json.dumps({"a": 2, "b": [1]}))
+    summary = compare_files(str(file1), str(file2), output_format="tree_summary")
+    assert summary["total"] == 2
+    with pytest.raises(ValueError, match="Unsupported output format"):
+        compare_files(str(file1), str(file2), output_format="xml")
+
+
+def test_unknown_format_and_dumps_json():
+    with pytest.raises(ValueError, match="Unsupported output format"):
+        format_diff({}, "xml")
+    assert json.loads(dumps_json({1: {3, 4} and "set", "t": type})) == {
+        "1": "set",
+        "t": str(type),
+    }
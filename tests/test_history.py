@@ -0,0 +1,117 @@
+"""
+Tests for the DeepDiff MCP delta histories.
+"""
+import asyncio
+import copy
+import random
+
+import pytest
+
+from deepdiff_mcp import create_server
+from deepdiff_mcp.history import DeltaHistory, apply_deltas, squash_deltas
+from deepdiff_mcp.operations import apply_delta, create_delta
+
+
+def _versions(rng, count):
+    versions = [{"items": [{"id": i, "value": i} for i in range(20)], "meta": {}}]
+    for number in range(count):
+        version = copy.deepcopy(versions[-1])
+        roll = rng.random()
+        if roll < 0.3:
+            version["items"].append({"id": 100 + number})
+        elif roll < 0.5 and version["items"]:
+            version["items"].pop(rng.randrange(len(version["items"])))
+        elif version["items"]:
+            # Also changes items added by earlier versions
+            rng.choice(version["items"])["value"] = rng.random()
+        version["meta"][f"v{number % 3}"] = number
+        versions.append(version)
+    return versions
+
+
+def test_apply_and_squash_deltas_match_one_by_one():
+    """Test that chain replay and squashing match applying each delta."""
+    versions = _versions(random.Random(3), 30)
+    original = copy.deepcopy(versions[0])
+    deltas = [create_delta(old, new) for old, new in zip(versions, versions[1:])]
+
+    assert apply_deltas(versions[0], deltas) == versions[-1]
+    assert apply_deltas(versions[0], deltas[:10]) == versions[10]
+    assert apply_delta(versions[0], squash_deltas(versions[0], deltas)) == versions[-1]
+    assert versions[0] == original
+
+
+def test_delta_history_rebuilds_every_version():
+    """Test that every version is rebuilt from the nearest keyframe."""
+    versions = _versions(random.Random(5), 25)
+    history = DeltaHistory(versions[0], keyframe_interval=4)
+    for old, new in zip(versions, versions[1:]):
+        history.append(create_delta(old, new))
+
+    assert sorted(history.keyframes) == [0, 4, 8, 12, 16, 20, 24]
+    for number, version in enumerate(versions):
+        assert history.get(number) == version
+    assert history.get(-1) == versions[-1]
+    with pytest.raises(ValueError):
+        history.get(26)
+
+
+@pytest.mark.asyncio
+async def test_server_histories_keep_their_handles():
+    """Test that equal histories have their own handles and survive failures."""
+    versions = _versions(random.Random(7), 6)
+    server = create_server("Test Server", object_store_max_bytes=100_000)
+    try:
+        first = await server.create_history(versions[0], keyframe_interval=2)
+        second = await server.create_history(versions[0], keyframe_interval=2)
+        for version in versions[1:]:
+            appended = await server.append_history(first["history"], obj=version)
+        with pytest.raises(AttributeError):
+            await server.append_history(second["history"], delta={"values_changed": 5})
+        with pytest.raises(ValueError, match="too large"):
+            await server.append_history(second["history"], obj={"big": "x" * 200_000})
+        rebuilt = [
+            await server.get_version(first["history"], number)
+            for number in range(len(versions))
+        ]
+        untouched = await server.get_version(second["history"])
+    finally:
+        server.executor.shutdown()
+
+    assert first["history"] != second["history"]
+    assert appended == {
+        "history": first["history"],
+        "version": 6,
+        "delta": appended["delta"],
+    }
+    assert rebuilt == versions
+    assert untouched == versions[0]
+
+
+@pytest.mark.asyncio
+async def test_appends_from_several_processes_are_kept(tmp_path):
+    """Test that servers sharing an object store do not lose each other's appends."""
+    servers = [
+        create_server("Test Server", workers=1, shared_dir=str(tmp_path))
+        for _ in range(2)
+    ]
+    try:
+        created = await servers[0].create_history({"n": 0})
+        history = created["history"]
+        await asyncio.gather(
+            *(
+                servers[number % 2].append_history(history, obj={"n": number})
+                for number in range(1, 9)
+            )
+        )
+        latest = await servers[1].get_version(history)
+        versions = [
+            await servers[0].get_version(history, number) for number in range(9)
+        ]
+    finally:
+        for server in servers:
+            server.executor.shutdown()
+
+    assert len(versions) == 9
+    assert versions[-1] == latest
+    assert sorted(version["n"] for version in versions) == list(range(9))
@@ -0,0 +1,58 @@
+"""
+Tests for the DeepDiff MCP deferred imports.
+"""
+import subprocess
+import sys
+
+import pytest
+from fastmcp import Client
+
+from deepdiff_mcp import create_server
+from deepdiff_mcp.lazy import LazyModule, warm_up
+
+
+def test_server_starts_without_heavy_imports():
+    code = (
+        "import sys\n"
+        "from deepdiff_mcp.cli import parse_args\n"
+        "from deepdiff_mcp import create_server\n"
+        "create_server()\n"
+        "heavy = ('deepdiff', 'pandas', 'numpy', 'openpyxl',\n"
+        "         'deepdiff_mcp.operations')\n"
+        "print(','.join(name for name in heavy if name in sys.modules))\n"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert completed.stdout.strip() == ""
+
+
+def test_lazy_module_and_warm_up():
+    module = LazyModule("json")
+    assert module.dumps([1]) == "[1]"
+    with pytest.raises(AttributeError):
+        module.missing
+
+    durations = warm_up(("json", "deepdiff_mcp.missing_module"))
+    assert list(durations) == ["json"]
+
+
+@pytest.mark.asyncio
+async def test_warm_up_after_handshake():
+    server = create_server("Test Server")
+    submitted = []
+    server.executor.warm_up = lambda: submitted.append(True)
+    async with Client(server.mcp) as client:
+        await client.list_tools()
+    async with Client(server.mcp) as client:
+        await client.list_tools()
+    server.executor.shutdown()
+    assert submitted == [True]
+
+
+def test_executor_warm_up():
+    server = create_server("Test Server", workers=2)
+    futures = server.executor.warm_up()
+    assert len(futures) == 1
+    assert "deepdiff_mcp.operations" in futures[0].result()
+    server.executor.shutdown()
@@ -0,0 +1,74 @@
+"""
+Tests for incremental Merkle hash trees.
+"""
+import copy
+
+import pytest
+
+from deepdiff_mcp import create_server
+from deepdiff_mcp.merkle import MerkleTree, hash_tree
+
+
+def _snapshot():
+    return {
+        f"service{i}": {"port": 8000 + i, "hosts": [f"host{j}" for j in range(5)]}
+        for i in range(50)
+    }
+
+
+def test_incremental_tree_matches_full_rebuild():
+    """Test that reusing a previous tree gives the same hashes as a rebuild."""
+    first = hash_tree(_snapshot())
+    changed = _snapshot()
+    changed["service3"]["hosts"][2] = "replaced"
+    changed["service7"]["debug"] = True
+    del changed["service9"]
+
+    incremental = hash_tree(changed, previous=first["tree"])
+    full = hash_tree(changed)
+
+    assert incremental["hash"] == full["hash"]
+    assert incremental["tree"].hashes() == full["tree"].hashes()
+    assert incremental["rehashed_nodes"] < 10 < full["rehashed_nodes"]
+    assert incremental["changed_paths"] == [
+        "root['service3']['hosts'][2]",
+        "root['service7']['debug']",
+        "root['service9']",
+    ]
+
+
+def test_tree_exclusions_and_type_changes():
+    """Test excluded paths and containers that only change type."""
+    tree, _ = MerkleTree.build([1, 2, 3], exclude_paths=["root[1]"])
+    assert set(tree.hashes()) == {"root", "root[0]", "root[2]"}
+    assert tree.hash == MerkleTree.build([1, 5, 3], exclude_paths=["root[1]"])[0].hash
+
+    as_list, _ = MerkleTree.build({"a": [1, 2]})
+    as_tuple, _ = MerkleTree.build({"a": (1, 2)})
+    assert as_list.changed_paths(as_tuple) == ["root['a']"]
+
+    # 1 == True, but the nested value changed type
+    first = hash_tree({"x": {"y": 1}})
+    changed = hash_tree({"x": {"y": True}}, previous=first["tree"])
+    assert changed["hash"] == hash_tree({"x": {"y": True}})["hash"]
+    assert changed["changed_paths"] == ["root['x']['y']"]
+
+
+@pytest.mark.asyncio
+async def test_hash_object_stores_trees():
+    """Test that hash_object chains tree handles between calls."""
+    server = create_server("Test Server", workers=1)
+    try:
+        first = await server.hash_object(_snapshot(), tree=True)
+        changed = copy.deepcopy(_snapshot())
+        changed["service1"]["port"] = 1
+        second = await server.hash_object(changed, previous_tree=first["tree"])
+
+        with pytest.raises(ValueError):
+            await server.hash_object(changed, previous_tree="missing")
+    finally:
+        server.executor.shutdown()
+
+    assert second["tree"] != first["tree"]
+    assert second["changed_paths"] == ["root['service1']['port']"]
+    assert "hashes" not in second
@@ -0,0 +1,83 @@
+"""
+Tests for the DeepDiff MCP metrics.
+"""
+import json
+
+import pytest
+from fastmcp import Client
+
+from deepdiff_mcp import create_server
+from deepdiff_mcp.formats import dumps_json
+from deepdiff_mcp.metrics import Histogram, ServerMetrics, run_timed, worker_phase
+from deepdiff_mcp.operations import compare_files
+
+
+def test_histogram_summary():
+    histogram = Histogram(buckets=(1, 10, 100))
+    for value in (0.5, 2, 3, 50, 500):
+        histogram.observe(value)
+    assert histogram.counts == [1, 2, 1, 1]
+    summary = histogram.to_dict()
+    assert summary["count"] == 5 and summary["sum"] == 555.5
+    # Quantiles are bucket upper bounds, capped by the largest value
+    assert summary["p50"] == 10
+    assert summary["p99"] == 500
+
+
+def test_run_timed_reports_load_phase(tmp_path):
+    file1 = tmp_path / "a.json"
+    file2 = tmp_path / "b.json"
+    file1.write_text(json.dumps({"a": 1}))
+    file2.write_text(json.dumps({"a": 2}))
+
+    result, phases, profile = run_timed(False, compare_files, str(file1), str(file2))
+    assert result["values_changed"]
+    assert set(phases) == {"load"}
+    assert profile is None
+
+    # Outside run_timed, phases are not recorded
+    with worker_phase("load"):
+        pass
+
+    _, _, profile = run_timed(True, sum, [1, 2])
+    assert "function calls" in profile
+
+
+def test_server_metrics_keeps_slowest_profiles():
+    metrics = ServerMetrics(profile_slowest=2)
+    for seconds in (0.3, 0.1, 0.5, 0.2):
+        metrics.record_call("compare", "ok", seconds, {}, profile=f"profile {seconds}")
+    assert [entry["seconds"] for entry in metrics.slowest()] == [0.5, 0.3]
+    with pytest.raises(ValueError):
+        ServerMetrics(profile_slowest=-1)
+
+
+@pytest.mark.asyncio
+async def test_tool_calls_are_recorded():
+    """Test calls, phases, payloads and cache hits through an MCP client."""
+    server = create_server("Test Server", profile_slowest=1)
+    arguments = {"t1": {"a": [1, 2, 3]}, "t2": {"a": [1, 2, 4]}}
+    async with Client(server.mcp) as client:
+        for _ in range(2):
+            await client.call_tool("compare", arguments)
+        result = await client.call_tool("server_stats", {"include_profiles": True})
+    stats = result.data
+    server.executor.shutdown()
+
+    compare_stats = stats["tools"]["compare"]
+    assert compare_stats["calls"] == {"ok": 2}
+    assert compare_stats["cache"] == {"miss": 1, "hit": 1}
+    assert {"deserialize", "cache", "queue", "execute", "handler", "serialize"} <= set(
+        compare_stats["phases"]
+    )
+    assert compare_stats["phases"]["execute"]["count"] == 1
+    request_bytes = len(dumps_json(arguments))
+    assert compare_stats["payload_bytes"]["request"]["max"] == request_bytes
+    assert stats["slowest"][0]["tool"] == "compare"
+    assert stats["executor"]["pending"] == {"compare": 0}
+
+    text = server.metrics.to_prometheus(server._gauges())
+    assert 'deepdiff_mcp_tool_calls_total{tool="compare",status="ok"} 2' in text
+    assert 'deepdiff_mcp_cache_lookups_total{tool="compare",result="hit"} 1' in text
+    assert 'deepdiff_mcp_tool_duration_seconds_count{tool="compare"} 2' in text
+    assert 'deepdiff_mcp_queued_calls{tool="compare"} 0' in text
@@ -0,0 +1,194 @@
+"""
+Tests for the DeepDiff MCP tool bodies.
+"""
+import copy
+import json
+import random
+
+import pandas as pd
+import pytest
+
+from deepdiff_mcp.merkle import hash_tree
+from deepdiff_mcp.operations import (
+    compare,
+    equal,
+    extract_path_file,
+    grep,
+    grep_file,
+    hash_file,
+    prune_identical,
+    search,
+    search_file,
+)
+
+
+def _random_value(rng, depth=0):
+    roll = rng.random()
+    if depth < 3 and roll < 0.3:
+        return {
+            rng.choice("abcdef"): _random_value(rng, depth + 1)
+            for _ in range(rng.randint(0, 4))
+        }
+    if depth < 3 and roll < 0.55:
+        return [_random_value(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+    return rng.choice([0, 1, 1.0, True, None, 2.5, 2.50001, "x", "X", float("nan")])
+
+
+def _mutate(rng, value):
+    if isinstance(value, dict) and value and rng.random() < 0.7:
+        key = rng.choice(sorted(value))
+        value[key] = _mutate(rng, value[key])
+        return value
+    if isinstance(value, list) and value and rng.random() < 0.7:
+        position = rng.randrange(len(value))
+        value[position] = _mutate(rng, value[position])
+        return value
+    return _random_value(rng, 2)
+
+
+def test_prune_identical_shares_equal_subtrees():
+    """Test that only the differing branches of t2 are rebuilt."""
+    t1 = {"same": {"deep": [1, 2]}, "changed": {"keep": [3], "value": 1}, "flag": 1}
+    t2 = {"same": {"deep": [1, 2]}, "changed": {"keep": [3], "value": 2}, "flag": True}
+
+    pruned = prune_identical(t1, t2)
+
+    assert pruned == t2
+    assert pruned["same"] is t1["same"]
+    assert pruned["changed"]["keep"] is t1["changed"]["keep"]
+    assert pruned["flag"] is t2["flag"]
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"ignore_order": True, "report_repetition": True},
+        {"significant_digits": 2},
+        {"ignore_numeric_type_changes": True},
+        {"ignore_string_case": True},
+        {"exclude_paths": ["root['a']"]},
+        {"exclude_types": ["int"]},
+    ],
+)
+def test_pruned_compare_matches_full_compare(options):
+    """Test that pruning never changes the reported differences."""
+    rng = random.Random(11)
+    for _ in range(300):
+        t1 = {
+            "a": _random_value(rng),
+            "b": _random_value(rng),
+            "c": [_random_value(rng), {"d": _random_value(rng)}],
+        }
+        t2 = _mutate(rng, copy.deepcopy(t1))
+        pruned = compare(t1, t2, prune=True, **options)
+        assert repr(pruned) == repr(compare(t1, t2, **options))
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"ignore_order": True, "report_repetition": True},
+        {"ignore_order": True},
+        {"significant_digits": 2},
+        {"ignore_numeric_type_changes": True},
+        {"ignore_string_case": True},
+        {"exclude_types": ["int"]},
+    ],
+)
+def test_equal_matches_compare(options):
+    """Test that equal agrees with compare and reports a real difference."""
+    rng = random.Random(5)
+    for _ in range(300):
+        t1 = {"a": _random_value(rng), "b": [_random_value(rng), _random_value(rng)]}
+        t2 = copy.deepcopy(t1)
+        if rng.random() < 0.7:
+            t2 = _mutate(rng, t2)
+        diff = compare(t1, t2, **options)
+        result = equal(t1, t2, **options)
+        assert result["equal"] is (not diff)
+        if diff:
+            assert result["difference"]["path"] in diff[result["difference"]["report"]]
+
+
+@pytest.mark.parametrize(
+    "options", [{}, {"ignore_order": True, "report_repetition": True}]
+)
+def test_max_diffs_truncates_compare(options):
+    """Test that max_diffs keeps at most that many of the differences."""
+    rng = random.Random(3)
+    for _ in range(100):
+        t1 = {"a": _random_value(rng), "b": [_random_value(rng) for _ in range(4)]}
+        t2 = _mutate(rng, _mutate(rng, copy.deepcopy(t1)))
+        full = compare(t1, t2, **options)
+        count = sum(len(items) for items in full.values())
+        for max_diffs in range(count + 2):
+            limited = compare(t1, t2, max_diffs=max_diffs, **options)
+            truncated = limited.pop("truncated", False)
+            kept = sum(len(items) for items in limited.values())
+            assert kept <= max_diffs
+            assert truncated is (kept < count)
+            if max_diffs:
+                assert kept
+
+
+def test_max_time_ms_stops_the_comparison():
+    t1 = {"items": [{"id": i, "values": list(range(5))} for i in range(2000)]}
+    t2 = copy.deepcopy(t1)
+    t2["items"][-1]["id"] = -1
+
+    assert compare(t1, t2, max_time_ms=0) == {"truncated": True}
+    truncated = {"equal": None, "method": "diff", "truncated": True}
+    assert equal(t1, t2, max_time_ms=0) == truncated
+    assert equal(t1, t2)["difference"]["path"] == "root['items'][1999]['id']"
+    assert equal(t1, copy.deepcopy(t1))["method"] == "identical"
+
+
+@pytest.mark.parametrize("document", ["list", "dict"])
+def test_file_variants_match_in_memory_tools(tmp_path, document):
+    """Test that streamed file searches and hashes match the in-memory tools."""
+    rng = random.Random(7)
+    records = [_random_value(rng) for _ in range(30)] + ["x", {"a": "X"}, [1]]
+    obj = records
+    if document == "dict":
+        obj = {f"k{i}": value for i, value in enumerate(records)}
+    file_path = str(tmp_path / "data.json")
+    with open(file_path, "w") as f:
+        json.dump(obj, f)
+    with open(file_path) as f:
+        obj = json.load(f)
+
+    for item in ("x", "a", 1, "[1", "k1", {"a": "X"}):
+        for options in ({}, {"case_sensitive": True}, {"match_string": True}):
+            expected = search(obj, item, **options)
+            assert search_file(file_path, item, **options) == expected
+            assert grep_file(file_path, item, **options) == grep(obj, item, **options)
+
+    options = {"exclude_paths": ["root['k3']", "root[3]"], "exclude_types": ["bool"]}
+    assert hash_file(file_path, **options)["hash"] == hash_tree(obj, **options)["hash"]
+
+
+def test_search_file_stops_after_max_matches(tmp_path):
+    """Test that a file search returns the first matches and flags the rest."""
+    file_path = str(tmp_path / "data.ndjson")
+    with open(file_path, "w") as f:
+        f.write("\n".join(json.dumps({"name": f"item{i}"}) for i in range(100)))
+
+    result = search_file(file_path, "item", max_matches=3)
+    assert result == {
+        "matched_values": ["root[0]['name']", "root[1]['name']", "root[2]['name']"],
+        "truncated": True,
+    }
+    assert "truncated" not in search_file(file_path, "item99", max_matches=3)
+
+
+def test_extract_path_file_reads_csv_rows(tmp_path):
+    """Test that a path is extracted from a CSV file and missing rows raise."""
+    file_path = str(tmp_path / "data.csv")
+    frame = pd.DataFrame({"id": [1, 2, 3], "name": ["a", "b", "c"]})
+    frame.to_csv(file_path, index=False)
+
+    assert extract_path_file(file_path, "root[1]['name']") == "b"
+    with pytest.raises(KeyError):
+        extract_path_file(file_path, "root[5]")
@@ -0,0 +1,157 @@
+"""
+Tests for the DeepDiff MCP search index.
+"""
+import pytest
+
+from deepdiff_mcp import create_server
+from deepdiff_mcp.operations import create_delta, search
+from deepdiff_mcp.search_index import SearchIndex, search_many
+from deepdiff_mcp.store import content_handle
+
+DOCUMENT = {
+    "Name": "Alice Smith",
+    "nested": {
+        "alice": 1,
+        "list": ["ALICE", 5, "bob", {"k": "xalicex"}],
+        "n": 5,
+        "f": 5.0,
+        "t": True,
+        "none": None,
+    },
+    5: "five",
+}
+
+
+@pytest.mark.parametrize(
+    "item", ["alice", "Alice", "ALICE", "name", "['n", 5, 1, True, "five", ""]
+)
+@pytest.mark.parametrize("case_sensitive", [False, True])
+@pytest.mark.parametrize("match_string", [False, True])
+def test_index_matches_deepsearch(item, case_sensitive, match_string):
+    """Test that index lookups return exactly what DeepSearch returns."""
+    index = SearchIndex(DOCUMENT)
+    options = {"case_sensitive": case_sensitive, "match_string": match_string}
+
+    assert index.search(item, **options) == search(DOCUMENT, item, **options)
+
+
+def test_index_update_from_delta_matches_rebuild():
+    """Test that updating from a delta gives the index of the new object."""
+    changed = {
+        "Name": "Bob",
+        "nested": {
+            "alice": 1,
+            "list": ["ALICE", "carol"],
+            "n": 6,
+            "f": 5.0,
+            "t": True,
+            "none": None,
+        },
+        "added": {"alice": "again"},
+    }
+    original = SearchIndex(DOCUMENT)
+    index, reindexed = original.updated(create_delta(DOCUMENT, changed))
+
+    assert index.obj == changed
+    assert reindexed > 0
+    # The index that was updated is left as it was
+    assert original.obj == DOCUMENT
+    for item in ["alice", "bob", "Smith", 5, "added"]:
+        assert original.search(item) == search(DOCUMENT, item)
+    for item in ["alice", "bob", "carol", 5, 6, "added"]:
+        expected = search(changed, item)
+        assert index.search(item) == SearchIndex(changed).search(item) == expected
+
+    # Removed keys shift the traversal order of the keys after them
+    before = {"a": "x", "b": "x", "c": "x", "d": "x"}
+    after = {"c": "x", "d": "xy"}
+    index, _ = SearchIndex(before).updated(create_delta(before, after))
+    assert index.search("x") == search(after, "x")
+
+
+def test_index_falls_back_for_unsupported_objects():
+    """Test that objects with tuples or sets are searched with DeepSearch."""
+    index = SearchIndex({"a": ("alice", {1, 2})})
+
+    assert not index.complete
+    assert index.search("alice") == search({"a": ("alice", {1, 2})}, "alice")
+
+
+@pytest.mark.parametrize("case_sensitive", [False, True])
+def test_search_many_matches_one_search_per_item(case_sensitive):
+    """Test multi-term and regex searches against one DeepSearch per term."""
+    terms = ["alice", "Smith", 5, "five"]
+    patterns = ["^alice$", "ali", r"\d", "(a)(l)?", "[A-Z]"]
+
+    found_terms = search_many(DOCUMENT, terms, case_sensitive=case_sensitive)
+    for item, found in zip(terms, found_terms):
+        assert found == search(DOCUMENT, item, case_sensitive=case_sensitive)
+    found_patterns = search_many(
+        DOCUMENT, patterns, case_sensitive=case_sensitive, use_regexp=True
+    )
+    for pattern, found in zip(patterns, found_patterns):
+        assert found == search(
+            DOCUMENT, pattern, case_sensitive=case_sensitive, use_regexp=True
+        )
+
+    with pytest.raises(ValueError):
+        search_many(DOCUMENT, ["("], use_regexp=True)
+
+
+@pytest.mark.asyncio
+async def test_search_tools_use_index_handles():
+    """Test building, using, invalidating and updating an index handle."""
+    server = create_server("Test Server", workers=1)
+    try:
+        stored = await server.put_object(DOCUMENT)
+        built = await server.build_search_index({"$ref": stored["handle"]})
+        assert built["source"] == stored["handle"]
+
+        by_ref = await server.search(
+            {"$ref": stored["handle"]}, "alice", index=built["index"]
+        )
+        unchecked = await server.grep(None, "alice", index=built["index"])
+        assert by_ref == unchecked == search(DOCUMENT, "alice")
+
+        # A different object is searched instead of the index
+        stale = await server.search({"other": "alice"}, "alice", index=built["index"])
+        assert stale == search({"other": "alice"}, "alice")
+
+        # Indexes of equal objects have their own handles
+        rebuilt = await server.build_search_index(DOCUMENT)
+        assert rebuilt["index"] != built["index"]
+        delta = await server.create_delta(DOCUMENT, {"Name": "Bob"})
+        updated = await server.update_search_index(rebuilt["index"], delta)
+        assert updated["index"] == rebuilt["index"]
+        assert updated["source"] == content_handle({"Name": "Bob"})
+        assert await server.search(None, "bob", index=updated["index"]) == {
+            "matched_values": ["root['Name']"]
+        }
+        assert await server.search(None, "alice", index=built["index"]) == search(
+            DOCUMENT, "alice"
+        )
+    finally:
+        server.executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_search_tools_group_results_by_term():
+    """Test that several items are reported in order, with or without an index."""
+    server = create_server("Test Server", workers=1)
+    try:
+        direct = await server.grep(
+            DOCUMENT, None, items=["^bob$", "xal"], use_regexp=True
+        )
+        built = await server.build_search_index(DOCUMENT)
+        indexed = await server.grep(
+            None, None, items=["^bob$", "xal"], use_regexp=True, index=built["index"]
+        )
+    finally:
+        server.executor.shutdown()
+
+    assert direct == indexed == {
+        "results": [
+            {"item": "^bob$", "matched_values": ["root['nested']['list'][2]"]},
+            {"item": "xal", "matched_values": ["root['nested']['list'][3]['k']"]},
+        ]
+    }
@@ -0,0 +1,162 @@
+"""
+Tests for sharded comparisons of large top-level containers.
+"""
+import random
+
+import pytest
+
+from deepdiff_mcp import create_server, operations, sharding
+
+
+def _run(plan):
+    """Run a plan's shards one after the other."""
+    while isinstance(plan, sharding.ShardPlan):
+        plan = plan.finish([plan.func(**call) for call in plan.calls])
+    return plan
+
+
+def _records(count, seed):
+    rnd = random.Random(seed)
+    return [
+        {"id": i, "name": f"item {i}", "tags": [rnd.randint(0, 3) for _ in range(3)]}
+        for i in range(count)
+    ]
+
+
+def _changed(records, seed):
+    rnd = random.Random(seed)
+    changed = [dict(record) for record in records]
+    for index in rnd.sample(range(len(changed)), 5):
+        changed[index]["name"] = "changed"
+    # Keys added to and removed from items are reported as SetOrdered paths
+    for index in rnd.sample(range(len(changed)), 2):
+        changed[index]["added"] = True
+    for index in rnd.sample(range(len(changed)), 2):
+        del changed[index]["tags"]
+    for index in sorted(rnd.sample(range(len(changed)), 3), reverse=True):
+        del changed[index]
+    changed.insert(7, {"id": -1, "name": "new", "tags": []})
+    return changed + [1.0, "x"]
+
+
+def _assert_same(t1, t2, prune=False, **options):
+    expected = operations.compare(t1, t2, **options)
+    distance = operations.get_deep_distance(t1, t2, **options)
+    for shards in (2, 3, 7):
+        plan = sharding.plan_compare(
+            t1, t2, shards, prune=prune, min_shard_items=1, **options
+        )
+        assert plan is not None
+        result = _run(plan)
+        assert result == expected
+        assert {report: type(items) for report, items in result.items()} == {
+            report: type(items) for report, items in expected.items()
+        }
+
+        plan = sharding.plan_distance(t1, t2, shards, min_shard_items=1, **options)
+        assert _run(plan) == pytest.approx(distance)
+
+
+@pytest.mark.parametrize("ignore_string_case", [False, True])
+def test_dicts_are_sharded_by_key(ignore_string_case):
+    t1 = {f"Key{record['id']}": record for record in _records(60, 1)}
+    t2 = {f"Key{record['id']}": record for record in _changed(_records(60, 1), 2)[:-2]}
+    if ignore_string_case:
+        t2 = {key.lower(): value for key, value in t2.items()}
+    _assert_same(t1, t2, ignore_string_case=ignore_string_case)
+
+
+def test_lists_are_sharded_by_range():
+    t1 = _records(60, 1) + [1, "x"]
+    t2 = _changed(_records(60, 1), 2)
+    _assert_same(t1, t2)
+    _assert_same(t1, t2, ignore_numeric_type_changes=True, prune=True)
+
+
+@pytest.mark.parametrize("seed", [2, 3])
+def test_unordered_lists_are_sharded_by_hash(seed):
+    t1 = _records(60, 1) + [1, "x", 1]
+    t2 = _changed(_records(60, 1), seed)
+    random.Random(seed).shuffle(t2)
+    _assert_same(t1, t2, ignore_order=True)
+    _assert_same(t1, t2, ignore_order=True, ignore_numeric_type_changes=True)
+    _assert_same(t1, t2, ignore_order=True, exclude_types=["str"])
+    for cutoff in (0.05, 0.9, 1.0):
+        _assert_same(t1, t2, ignore_order=True, cutoff_intersection_for_pairs=cutoff)
+
+
+def test_unordered_lists_with_unpaired_items():
+    t1 = _records(30, 1)
+    t2 = [dict(record) for record in t1[5:]] + [
+        {"other": i, "values": list(range(i))} for i in range(8)
+    ]
+    random.Random(1).shuffle(t2)
+    _assert_same(t1, t2, ignore_order=True)
+    # Nearly everything changed: too few items are left to keep DeepDiff's
+    # pairing decision, so the comparison runs whole
+    t1 = [{"a": i} for i in range(3)]
+    t2 = [{"b": i} for i in range(3)]
+    _assert_same(t1, t2, ignore_order=True)
+
+
+def test_unshardable_comparisons_run_whole():
+    records = _records(40, 1)
+    assert sharding.plan_compare(records, records, 2) is None
+    for options in ({"max_diffs": 5}, {"output_format": "json_patch"}):
+        assert (
+            sharding.plan_compare(records, records, 2, min_shard_items=1, **options)
+            is None
+        )
+    assert sharding.plan_compare(records, {}, 2, min_shard_items=1) is None
+    numbers = list(range(40))
+    assert sharding.plan_compare(numbers, numbers, 2, min_shard_items=1) is None
+    assert (
+        sharding.plan_distance(
+            records,
+            records,
+            2,
+            min_shard_items=1,
+            ignore_order=True,
+            report_repetition=True,
+        )
+        is None
+    )
+    # Dicts with too few common keys are reported as a whole changed value
+    t1 = {f"a{i}": i for i in range(10)}
+    t2 = {f"b{i}": i for i in range(10)}
+    assert sharding.plan_compare(t1, t2, 2, min_shard_items=1) is None
+    with pytest.raises(ValueError):
+        sharding.plan_compare(t1, t1, 0)
+
+
+@pytest.mark.asyncio
+async def test_server_compares_in_shards():
+    t1 = {f"key{i}": i for i in range(2 * sharding.MIN_SHARD_ITEMS)}
+    t2 = dict(t1, key5=-5, added=1)
+    del t2["key7"]
+    server = create_server("Test Server", workers=2, cache_size=0)
+    try:
+        result = await server.compare(t1, t2, shards=4)
+        distance = await server.get_deep_distance(t1, t2, shards=2)
+        with pytest.raises(ValueError):
+            await server.compare(t1, t2, shards=0)
+    finally:
+        server.executor.shutdown()
+
+    assert result == operations.compare(t1, t2)
+    assert distance == pytest.approx(operations.get_deep_distance(t1, t2))
+
+
+@pytest.mark.asyncio
+async def test_sharded_results_are_cached_apart():
+    t1 = {f"key{i}": i for i in range(2 * sharding.MIN_SHARD_ITEMS)}
+    t2 = dict(t1, key5=-5)
+    server = create_server("Test Server", workers=2)
+    try:
+        await server.compare(t1, t2, shards=2)
+        await server.compare(t1, t2)
+        await server.compare(t1, t2, shards=2)
+    finally:
+        server.executor.shutdown()
+
+    assert server.cache.stats()["hits"] == 1
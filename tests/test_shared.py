@@ -0,0 +1,62 @@
+"""
+Tests for the result cache and object store shared by server processes.
+"""
+import time
+
+import pytest
+
+from deepdiff_mcp.shared import shared_backends
+
+
+def test_results_are_shared(tmp_path):
+    cache1, _ = shared_backends(str(tmp_path), cache_size=2)
+    cache2, _ = shared_backends(str(tmp_path), cache_size=2)
+
+    cache1.put("a", {"values": [1]})
+    cache1.put("b", [2])
+    assert cache2.get("a") == {"values": [1]}
+    # "b" is now the least recently used entry
+    cache2.put("c", 3)
+    assert cache1.get("b") is None
+    assert cache1.get("a") == {"values": [1]}
+    assert len(cache1) == 2
+    assert cache2.stats()["evictions"] == 1
+    assert cache1.stats()["hits"] == 1 and cache1.stats()["misses"] == 1
+
+    cache1.clear()
+    assert cache2.get("a") is None
+
+
+def test_objects_are_shared(tmp_path):
+    _, store1 = shared_backends(str(tmp_path), object_store_max_bytes=10_000)
+    _, store2 = shared_backends(str(tmp_path), object_store_max_bytes=10_000)
+
+    handle = store1.put({"a": [1, 2]})["handle"]
+    assert handle in store2
+    assert store2.resolve({"$ref": handle}) == {"a": [1, 2]}
+    assert store2.drop(handle)
+    assert handle not in store1
+    with pytest.raises(ValueError):
+        store1.resolve({"$ref": handle})
+
+    store1.put("first", handle="history")
+    store2.put("second", handle="history")
+    assert store1.get("history") == "second"
+    # Of two processes replacing the same revision, only the first succeeds
+    value, revision = store1.get_revision("history")
+    assert store2.get_revision("history") == (value, revision)
+    assert store2.replace("history", "third", revision) is not None
+    assert store1.replace("history", "fourth", revision) is None
+    assert store1.get("history") == "third"
+
+    short = store1.put("short", ttl=0.05)["handle"]
+    time.sleep(0.1)
+    assert short not in store2
+    assert store2.stats()["expirations"] == 1
+
+    with pytest.raises(ValueError):
+        store1.put("x" * 20_000)
+    first = store1.put("a" * 6_000)["handle"]
+    store2.put("b" * 6_000)
+    assert first not in store1
+    assert store1.stats()["objects"] == 1
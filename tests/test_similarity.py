@@ -0,0 +1,57 @@
+"""
+Tests for nearest-match search.
+"""
+import random
+
+import pytest
+
+from deepdiff_mcp import create_server
+from deepdiff_mcp.similarity import MinHasher, estimate_similarity, leaf_tokens
+
+
+def test_leaf_tokens_ignore_order():
+    """Test that list positions are dropped when order is ignored."""
+    assert leaf_tokens({"a": [1, 2]}) == {"root['a'][0]=int:1", "root['a'][1]=int:2"}
+    assert leaf_tokens({"a": [1, 2]}, ignore_order=True) == leaf_tokens(
+        {"a": [2, 1]}, ignore_order=True
+    )
+
+
+def test_minhash_estimates_jaccard_similarity():
+    """Test that signature agreement tracks set overlap."""
+    hasher = MinHasher(num_perm=256)
+    tokens = {f"token{i}" for i in range(100)}
+    half = {f"token{i}" for i in range(50, 150)}
+
+    signature = hasher.signature(tokens)
+    assert estimate_similarity(signature, hasher.signature(tokens)) == 1.0
+    estimate = estimate_similarity(hasher.signature(tokens), hasher.signature(half))
+    assert abs(estimate - 1 / 3) < 0.1
+
+
+@pytest.mark.asyncio
+async def test_find_nearest_matches_exhaustive_ranking():
+    """Test that pruning keeps the nearest matches of an exhaustive ranking."""
+    rng = random.Random(7)
+    query = {f"key{i}": i for i in range(20)}
+    corpus = []
+    for _ in range(200):
+        item = dict(query)
+        for key in rng.sample(sorted(item), rng.randint(1, 20)):
+            item[key] = -1
+        corpus.append(item)
+    corpus[42] = dict(query)
+
+    server = create_server("Test Server", workers=2)
+    try:
+        pruned = await server.find_nearest(query, corpus, k=3)
+        exact = await server.find_nearest(query, corpus, k=3, prune=False)
+        limited = await server.find_nearest(query, corpus, k=3, max_distance=0.0)
+    finally:
+        server.executor.shutdown()
+
+    assert pruned["matches"][0] == {"index": 42, "distance": 0.0}
+    distances = [m["distance"] for m in exact["matches"]]
+    assert [m["distance"] for m in pruned["matches"]] == distances
+    assert pruned["scored"] < exact["scored"] == 200
+    assert limited["matches"] == [{"index": 42, "distance": 0.0}]
@@ -0,0 +1,102 @@
+"""
+Tests for the DeepDiff MCP object store.
+"""
+import time
+
+import pytest
+
+from deepdiff_mcp import ObjectStore, create_server
+from deepdiff_mcp.store import new_handle
+
+
+def test_object_store_is_content_addressed():
+    """Test that equal objects share a handle."""
+    store = ObjectStore()
+    first = store.put({"a": [1, 2]})
+    second = store.put({"a": [1, 2]})
+
+    assert first == second
+    assert len(store) == 1
+    assert store.get(first["handle"]) == {"a": [1, 2]}
+    assert store.drop(first["handle"])
+    assert not store.drop(first["handle"])
+
+    # Objects stored under their own handle replace each other
+    handle = new_handle()
+    assert store.put({"a": [1, 2]}, handle=handle)["handle"] == handle
+    store.put({"a": [1, 2, 3]}, handle=handle)
+    assert len(store) == 1
+    assert store.get(handle) == {"a": [1, 2, 3]}
+
+    # Replacing succeeds only over the revision that was read
+    obj, revision = store.get_revision(handle)
+    assert store.replace(handle, dict(obj, b=1), revision)["handle"] == handle
+    assert store.replace(handle, dict(obj, b=2), revision) is None
+    assert store.get(handle) == {"a": [1, 2, 3], "b": 1}
+    assert store.replace(new_handle(), obj, revision) is None
+
+
+def test_object_store_expires_and_evicts():
+    """Test TTL expiry and size-bounded LRU eviction."""
+    store = ObjectStore(default_ttl=0.01)
+    handle = store.put("short-lived")["handle"]
+    time.sleep(0.02)
+    assert handle not in store
+
+    small = ObjectStore(max_bytes=200, default_ttl=None)
+    first = small.put("a" * 80)["handle"]
+    second = small.put("b" * 80)["handle"]
+    small.get(first)
+    small.put("c" * 80)
+
+    assert first in small
+    assert second not in small
+    assert small.stats()["evictions"] == 1
+
+    with pytest.raises(ValueError):
+        small.put("d" * 500)
+    # A TTL that has already run out would return a dead handle
+    for ttl in (0, -1):
+        with pytest.raises(ValueError, match="ttl must be positive"):
+            small.put("e", ttl=ttl)
+    with pytest.raises(ValueError):
+        ObjectStore(default_ttl=0)
+
+
+def test_object_store_resolve():
+    """Test replacing references with stored objects."""
+    store = ObjectStore()
+    handle = store.put([1, 2, 3])["handle"]
+
+    assert store.resolve({"$ref": handle}) == [1, 2, 3]
+    assert store.resolve({"a": 1}) == {"a": 1}
+    with pytest.raises(ValueError, match="Unknown or expired"):
+        store.resolve({"$ref": "missing"})
+
+
+@pytest.mark.asyncio
+async def test_tools_accept_references():
+    """Test passing stored objects to tools by reference."""
+    server = create_server("Test Server", workers=1)
+    doc = {"a": {"b": [1, 2, 3, {"c": "found me"}]}}
+    ref = {"$ref": (await server.put_object(doc))["handle"]}
+
+    try:
+        diff = await server.compare(ref, {"a": {"b": [1, 2, 4, {"c": "found me"}]}})
+        found = await server.search(ref, "found me")
+        value = await server.extract_path(ref, "root['a']['b'][3]['c']")
+        inline_hash = await server.hash_object(doc)
+        ref_hash = await server.hash_object(ref)
+        dropped = await server.drop_object(ref["$ref"])
+        with pytest.raises(ValueError):
+            await server.grep(ref, "found")
+    finally:
+        server.executor.shutdown()
+
+    assert diff == {
+        "values_changed": {"root['a']['b'][2]": {"new_value": 4, "old_value": 3}}
+    }
+    assert found == {"matched_values": ["root['a']['b'][3]['c']"]}
+    assert value == "found me"
+    assert inline_hash == ref_hash
+    assert dropped == {"dropped": True}
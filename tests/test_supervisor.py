@@ -0,0 +1,74 @@
+"""
+Tests for the multi-process HTTP server.
+"""
+import socket
+import threading
+import time
+
+import pytest
+from fastmcp import Client
+
+from deepdiff_mcp.supervisor import Supervisor, watch_memory
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(socket, "SO_REUSEPORT"), reason="requires SO_REUSEPORT"
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait(condition, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.1)
+
+
+def test_watch_memory():
+    exceeded = []
+    watch_memory(1, lambda: exceeded.append(True), interval=0.01)
+    assert exceeded == [True]
+
+    stop = threading.Event()
+    stop.set()
+    watch_memory(1, lambda: exceeded.append(True), interval=0.01, stop=stop)
+    assert exceeded == [True]
+
+
+@pytest.mark.asyncio
+async def test_workers_share_objects_and_are_recycled():
+    port = _free_port()
+    supervisor = Supervisor(
+        2, {"name": "Test Server", "workers": 1}, port=port, graceful_timeout=5
+    )
+    thread = threading.Thread(target=supervisor.run)
+    thread.start()
+    url = f"http://127.0.0.1:{port}/mcp"
+    try:
+        assert supervisor.ready.wait(60)
+        async with Client(url) as client:
+            stored = await client.call_tool("put_object", {"obj": {"a": [1, 2, 3]}})
+        handle = stored.data["handle"]
+
+        old_pids = supervisor.workers()
+        supervisor.recycle(0)
+        _wait(lambda: supervisor.workers()[0] != old_pids[0])
+        assert supervisor.workers()[1] == old_pids[1]
+        assert supervisor.restarts == 1
+
+        # New connections may reach either worker, including the new one
+        for _ in range(4):
+            async with Client(url) as client:
+                result = await client.call_tool(
+                    "compare", {"t1": {"$ref": handle}, "t2": {"a": [1, 2, 4]}}
+                )
+            assert result.data["values_changed"]
+    finally:
+        supervisor.stop()
+        thread.join(30)
+    assert not thread.is_alive()
+    assert supervisor.workers() == {}
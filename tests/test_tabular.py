@@ -0,0 +1,195 @@
+"""
+Tests for the tabular comparison engines.
+"""
+import pandas as pd
+import pytest
+
+from deepdiff_mcp import create_server
+from deepdiff_mcp.tabular import diff_records_by_key
+
+
+def test_diff_records_by_key_aligns_rows():
+    """Test that an inserted row is reported once and not as a shift."""
+    records1 = [
+        {"id": 1, "name": "Alice", "age": 25},
+        {"id": 2, "name": "Bob", "age": 30},
+        {"id": 3, "name": "Charlie", "age": 35},
+    ]
+    records2 = [
+        {"id": 0, "name": "Zoe", "age": 20},
+        {"id": 1, "name": "Alice", "age": 25},
+        {"id": 2, "name": "Bob", "age": 31},
+    ]
+
+    diff = diff_records_by_key(records1, records2, ["id"])
+
+    assert diff == {
+        "values_changed": {"root[1]['age']": {"new_value": 31, "old_value": 30}},
+        "iterable_item_added": {"root[0]": {"id": 0, "name": "Zoe", "age": 20}},
+        "iterable_item_removed": {"root[2]": {"id": 3, "name": "Charlie", "age": 35}},
+    }
+
+
+def test_diff_records_by_key_options_and_exclusions():
+    """Test that DeepDiff options and exclusions apply to changed rows."""
+    records1 = [{"id": 1, "name": "Alice", "updated": "mon"}]
+    records2 = [{"id": 1, "name": "ALICE", "updated": "tue"}]
+
+    diff = diff_records_by_key(
+        records1,
+        records2,
+        ["id"],
+        ignore_string_case=True,
+        exclude_regex_paths=[r"\['updated'\]"],
+    )
+
+    assert diff == {}
+
+
+def test_diff_records_by_key_rejects_duplicate_keys():
+    """Test that duplicate keys are reported as errors."""
+    with pytest.raises(ValueError, match="Duplicate key"):
+        diff_records_by_key([{"id": 1}, {"id": 1}], [], ["id"])
+
+    with pytest.raises(ValueError, match="Key column"):
+        diff_records_by_key([{"id": 1}], [], ["missing"])
+
+
+@pytest.mark.asyncio
+async def test_compare_files_with_key_columns(tmp_path):
+    """Test comparing CSV files aligned on a key column."""
+    file1_path = tmp_path / "test1.csv"
+    file2_path = tmp_path / "test2.csv"
+    pd.DataFrame({"id": [1, 2, 3], "age": [25, 30, 35]}).to_csv(file1_path, index=False)
+    pd.DataFrame({"id": [3, 2, 1], "age": [35, 31, 25]}).to_csv(file2_path, index=False)
+
+    server = create_server("Test Server", workers=1)
+    diff = await server.compare_files(
+        str(file1_path), str(file2_path), key_columns=["id"]
+    )
+    server.executor.shutdown()
+
+    assert diff == {
+        "values_changed": {"root[1]['age']": {"new_value": 31, "old_value": 30}}
+    }
+
+
+def test_diff_dataframes_matches_record_diff():
+    """Test that the columnar engine reports what DeepDiff reports."""
+    from deepdiff_mcp.operations import compare
+    from deepdiff_mcp.tabular import diff_dataframes
+
+    df1 = pd.DataFrame({
+        "id": [1, 2, 3, 4],
+        "name": ["Alice", "Bob", "Charlie", "Dan"],
+        "score": [1.5, 2.25, 3.0, 4.0],
+    })
+    df2 = pd.DataFrame({
+        "id": [1, 2, 3],
+        "name": ["Alice", "Robert", "Charlie"],
+        "score": [1.5, 2.5, 3.0],
+    })
+
+    expected = compare(df1.to_dict(orient="records"), df2.to_dict(orient="records"))
+
+    assert diff_dataframes(df1, df2) == expected
+
+
+def test_diff_dataframes_options():
+    """Test vectorized significant_digits, ignore_string_case and key alignment."""
+    from deepdiff_mcp.tabular import diff_dataframes
+
+    df1 = pd.DataFrame({"id": [1, 2], "name": ["alice", "bob"], "score": [1.001, 2.0]})
+    df2 = pd.DataFrame({"id": [2, 1], "name": ["BOB", "Alice"], "score": [2.3, 1.002]})
+
+    diff = diff_dataframes(
+        df1, df2, key_columns=["id"], significant_digits=2, ignore_string_case=True
+    )
+
+    assert diff == {
+        "values_changed": {"root[1]['score']": {"new_value": 2.3, "old_value": 2.0}}
+    }
+
+
+@pytest.mark.asyncio
+async def test_compare_files_columnar(tmp_path):
+    """Test the columnar mode of compare_files."""
+    file1_path = tmp_path / "test1.csv"
+    file2_path = tmp_path / "test2.csv"
+    pd.DataFrame({"id": [1, 2], "note": ["a", None]}).to_csv(file1_path, index=False)
+    pd.DataFrame({"id": [1, 2], "note": ["b", None]}).to_csv(file2_path, index=False)
+
+    server = create_server("Test Server", workers=1)
+    diff = await server.compare_files(str(file1_path), str(file2_path), columnar=True)
+    server.executor.shutdown()
+
+    assert diff == {
+        "values_changed": {"root[0]['note']": {"new_value": "b", "old_value": "a"}}
+    }
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_compare_files_chunked_matches_full_comparison(tmp_path, columnar):
+    """Test that a chunked comparison finds the same differences."""
+    from deepdiff_mcp.operations import compare_files
+
+    file1_path = str(tmp_path / "test1.csv")
+    file2_path = str(tmp_path / "test2.csv")
+    pd.DataFrame({"id": range(10), "value": range(10)}).to_csv(file1_path, index=False)
+    pd.DataFrame(
+        {"id": range(12), "value": [0, 1, 2, 3, 4, 50, 6, 7, 80, 9, 10, 11]}
+    ).to_csv(file2_path, index=False)
+
+    expected = compare_files(file1_path, file2_path, columnar=columnar)
+    reported = []
+    chunked = compare_files(
+        file1_path,
+        file2_path,
+        columnar=columnar,
+        chunksize=3,
+        progress=lambda rows, total: reported.append(rows),
+    )
+
+    assert chunked == expected
+    assert reported == [3, 6, 9, 12]
+    with pytest.raises(ValueError, match="include_paths"):
+        compare_files(
+            file1_path, file2_path, chunksize=3, include_paths=["root[5]['value']"]
+        )
+
+
+def test_compare_files_chunked_to_ndjson(tmp_path):
+    """Test writing the differences of a chunked comparison to NDJSON."""
+    import json
+
+    from deepdiff_mcp.operations import compare_files
+
+    file1_path = str(tmp_path / "test1.csv")
+    file2_path = str(tmp_path / "test2.csv")
+    output_path = str(tmp_path / "diff.ndjson")
+    pd.DataFrame({"id": [1, 2, 3], "age": [25, 30, 35]}).to_csv(file1_path, index=False)
+    pd.DataFrame({"id": [1, 2], "age": [25, 31]}).to_csv(file2_path, index=False)
+
+    summary = compare_files(
+        file1_path, file2_path, output_path=output_path, max_memory_mb=1
+    )
+
+    assert summary == {
+        "output_path": output_path,
+        "rows_compared": 3,
+        "differences": {"values_changed": 1, "iterable_item_removed": 1},
+    }
+    with open(output_path) as f:
+        lines = [json.loads(line) for line in f]
+    assert lines == [
+        {
+            "report": "values_changed",
+            "path": "root[1]['age']",
+            "value": {"new_value": 31, "old_value": 30},
+        },
+        {
+            "report": "iterable_item_removed",
+            "path": "root[2]",
+            "value": {"id": 3, "age": 35},
+        },
+    ]